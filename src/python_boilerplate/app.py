@@ -1,11 +1,32 @@
 from __future__ import annotations
 
-from python_boilerplate.config import load_settings
+from python_boilerplate.config import Settings, load_settings
 from python_boilerplate.observability import setup_observability
-from python_boilerplate.services import WorkerService
+from python_boilerplate.services import (
+    AsyncWorkerService,
+    QueueWorkerService,
+    WorkerService,
+    create_work_queue,
+)
 
 
-def create_worker_service() -> WorkerService:
-    settings = load_settings()
+def create_worker_service(settings: Settings | None = None) -> WorkerService:
+    settings = settings or load_settings()
     runtime = setup_observability(settings, logger_name="python_boilerplate.service")
     return WorkerService(settings=settings, runtime=runtime)
+
+
+def create_async_worker_service() -> AsyncWorkerService:
+    settings = load_settings()
+    runtime = setup_observability(settings, logger_name="python_boilerplate.service")
+    return AsyncWorkerService(settings=settings, runtime=runtime)
+
+
+def create_queue_worker_service() -> QueueWorkerService:
+    settings = load_settings()
+    runtime = setup_observability(settings, logger_name="python_boilerplate.service")
+    return QueueWorkerService(
+        settings=settings,
+        runtime=runtime,
+        work_queue=create_work_queue(settings),
+    )
@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import tracemalloc
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass, replace
+from functools import partial
+from itertools import chain, product
+from pathlib import Path
+from threading import Barrier, Thread
+from time import perf_counter_ns
+from typing import TextIO
+from uuid import uuid4
+
+from opentelemetry.sdk.trace import TracerProvider, sampling
+from structlog.stdlib import BoundLogger
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability import ObservabilityRuntime
+from python_boilerplate.observability.logging import configure_logging, get_logger
+from python_boilerplate.observability.metrics import Metrics, start_iteration
+from python_boilerplate.observability.tracing import root_span
+from python_boilerplate.runtime.health import HEALTH_METRICS, parse_prometheus_text, scan_prometheus
+from python_boilerplate.services.worker import WorkerService
+
+_LOGGER_NAME = "python_boilerplate.bench"
+
+
+@dataclass(slots=True, frozen=True)
+class BenchScenario:
+    name: str
+    settings: Settings
+    bare: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class BenchResult:
+    name: str
+    iterations: int
+    ops_per_second: float
+    p50_us: float
+    p99_us: float
+
+
+def default_scenarios(settings: Settings) -> list[BenchScenario]:
+    """Return the bare call plus every combination of logs, traces and resource accounting.
+
+    ``logs`` means ``APP_LOG_LEVEL=INFO`` (iteration events are written), without it the level
+    is ``WARNING``. ``sampled`` writes logs and spans for one in 100 iterations and uses counter
+    request ids. ``allocations`` is only measured on top of everything else because
+    tracemalloc dominates every other cost.
+    """
+    base = replace(
+        settings,
+        metrics_enabled=False,
+        profiler_enabled=False,
+        traces_sample_rate=1.0,
+        iteration_resources_enabled=False,
+        iteration_allocations_enabled=False,
+        iteration_sample_every=1,
+        iteration_sample_rate=1.0,
+        iteration_request_ids="uuid4",
+    )
+    scenarios = [BenchScenario(name="bare", settings=base, bare=True)]
+    for logs, traces, resources in product((False, True), repeat=3):
+        features = [
+            name
+            for name, enabled in (("logs", logs), ("traces", traces), ("resources", resources))
+            if enabled
+        ]
+        scenarios.append(
+            BenchScenario(
+                name="+".join(features) or "metrics",
+                settings=replace(
+                    base,
+                    log_level="INFO" if logs else "WARNING",
+                    traces_enabled=traces,
+                    iteration_resources_enabled=resources,
+                ),
+            )
+        )
+    scenarios.append(
+        BenchScenario(
+            name="logs+traces+sampled",
+            settings=replace(
+                base,
+                log_level="INFO",
+                traces_enabled=True,
+                iteration_sample_every=100,
+                iteration_request_ids="counter",
+            ),
+        )
+    )
+    scenarios.append(
+        BenchScenario(
+            name="logs+traces+resources+allocations",
+            settings=replace(
+                base,
+                log_level="INFO",
+                traces_enabled=True,
+                iteration_resources_enabled=True,
+                iteration_allocations_enabled=True,
+            ),
+        )
+    )
+    return scenarios
+
+
+def run_benchmark(scenario: BenchScenario, iterations: int, warmup: int = 100) -> BenchResult:
+    """Time ``run_iteration`` with a no-op ``execute_iteration`` under one configuration.
+
+    Log lines go to ``os.devnull``, so the numbers include rendering but not the cost of the
+    real stdout pipe. Spans are recorded but not exported.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        service = WorkerService(
+            settings=scenario.settings,
+            runtime=_bench_runtime(scenario.settings, sink),
+        )
+        call: Callable[[], object] = service.run_iteration
+        if scenario.bare:
+            call = partial(service.execute_iteration, service.stop_event)
+        try:
+            return measure(scenario.name, call, iterations, warmup)
+        finally:
+            if scenario.settings.iteration_allocations_enabled and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+def run_component_benchmarks(
+    settings: Settings,
+    iterations: int,
+    warmup: int = 100,
+) -> list[BenchResult]:
+    """Time the individual pieces of ``run_iteration`` with logs and traces enabled."""
+    settings = replace(settings, log_level="INFO", traces_enabled=True, metrics_enabled=False)
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        runtime = _bench_runtime(settings, sink)
+        iteration_logger = runtime.logger.bind(job_name="service_iteration", request_id="bench")
+
+        def span() -> None:
+            with root_span(
+                runtime.tracer,
+                "service.iteration",
+                job_name="service_iteration",
+                request_id="bench",
+            ):
+                return None
+
+        components: list[tuple[str, Callable[[], object]]] = [
+            ("component:uuid4", lambda: str(uuid4())),
+            (
+                "component:logger.bind",
+                lambda: runtime.logger.bind(job_name="service_iteration", request_id="bench"),
+            ),
+            ("component:log_event", lambda: iteration_logger.info("iteration_started")),
+            ("component:root_span", span),
+            (
+                "component:iteration_timer",
+                lambda: start_iteration(runtime.metrics).observe_success(),
+            ),
+        ]
+        return [measure(name, call, iterations, warmup) for name, call in components]
+
+
+def build_exposition(series: int, health_first: bool = True) -> bytes:
+    """Return a Prometheus exposition with ``series`` labeled histogram lines.
+
+    The health metrics are written before or after the bulk, which is the best and the worst
+    case for a parser that stops early.
+    """
+    health = (
+        "# HELP app_up Whether the service is considered healthy.\n"
+        "# TYPE app_up gauge\n"
+        "app_up 1.0\n"
+        "last_progress_timestamp_seconds 1.7e+09\n"
+        "last_success_timestamp_seconds 1.7e+09\n"
+    )
+    bounds = ("0.005", "0.01", "0.025", "0.05", "0.1", "0.25", "0.5", "1.0", "+Inf")
+    lines = [
+        "# HELP http_request_duration_seconds Request latency.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for index in range(series):
+        path = f"/api/v1/items/{index // len(bounds)}"
+        if index % 97 == 0:
+            path += '?q=\\"quoted\\"'
+        lines.append(
+            f'http_request_duration_seconds_bucket{{method="GET",path="{path}",'
+            f'le="{bounds[index % len(bounds)]}"}} {index % 1000}.0'
+        )
+    bulk = "\n".join(lines) + "\n"
+    return (health + bulk if health_first else bulk + health).encode("utf-8")
+
+
+def run_parser_benchmarks(
+    series: int, iterations: int, warmup: int = 2
+) -> tuple[list[BenchResult], int]:
+    """Compare the streaming health scan with full parses of the exposition.
+
+    ``parser:baseline split parse`` is the split-based parser the health check used before
+    the scan, so the other rows can be read against it. Return the results and the size of
+    the scanned exposition in bytes.
+    """
+    early = build_exposition(series, health_first=True)
+    late = build_exposition(series, health_first=False)
+    results = [
+        measure(
+            "parser:baseline split parse",
+            lambda: _split_parse(late.decode("utf-8")),
+            iterations,
+            warmup,
+        ),
+        measure(
+            "parser:parse_prometheus_text",
+            lambda: parse_prometheus_text(late.decode("utf-8")),
+            iterations,
+            warmup,
+        ),
+        measure(
+            "parser:scan health first",
+            lambda: scan_prometheus(io.BytesIO(early), HEALTH_METRICS),
+            iterations,
+            warmup,
+        ),
+        measure(
+            "parser:scan health last",
+            lambda: scan_prometheus(io.BytesIO(late), HEALTH_METRICS),
+            iterations,
+            warmup,
+        ),
+    ]
+    return results, len(early)
+
+
+def run_metrics_benchmarks(
+    settings: Settings,
+    iterations: int,
+    warmup: int = 100,
+    threads: Sequence[int] = (1, 2, 4, 8),
+) -> list[BenchResult]:
+    """Time the metric updates of one iteration from several threads at once.
+
+    One call is ``mark_iteration_started``, ``mark_success`` and ``mark_iteration_finished``,
+    with the regular prometheus_client objects (``locked``) and with
+    ``APP_METRICS_SHARDED=true`` (``sharded``). ops/s is the total over all threads.
+    """
+    results: list[BenchResult] = []
+    for sharded in (False, True):
+        metrics = Metrics(replace(settings, metrics_enabled=False, metrics_sharded=sharded))
+
+        def call(metrics: Metrics = metrics) -> None:
+            metrics.mark_iteration_started()
+            metrics.mark_success(0.001)
+            metrics.mark_iteration_finished()
+
+        variant = "sharded" if sharded else "locked"
+        results += [
+            measure_threads(f"metrics:{variant} x{count}", call, count, iterations, warmup)
+            for count in threads
+        ]
+    return results
+
+
+def measure(
+    name: str,
+    call: Callable[[], object],
+    iterations: int,
+    warmup: int = 100,
+) -> BenchResult:
+    for _ in range(warmup):
+        call()
+    durations: list[int] = []
+    started_at = perf_counter_ns()
+    for _ in range(max(1, iterations)):
+        call_started_at = perf_counter_ns()
+        call()
+        durations.append(perf_counter_ns() - call_started_at)
+    return _result(name, durations, perf_counter_ns() - started_at)
+
+
+def measure_threads(
+    name: str,
+    call: Callable[[], object],
+    threads: int,
+    iterations: int,
+    warmup: int = 100,
+) -> BenchResult:
+    """Run ``iterations`` calls in each of ``threads`` threads, started together."""
+    barrier = Barrier(threads + 1)
+    durations: list[list[int]] = [[] for _ in range(threads)]
+
+    def worker(thread_durations: list[int]) -> None:
+        for _ in range(warmup):
+            call()
+        barrier.wait()
+        for _ in range(max(1, iterations)):
+            call_started_at = perf_counter_ns()
+            call()
+            thread_durations.append(perf_counter_ns() - call_started_at)
+
+    workers = [
+        Thread(target=worker, args=(own,), name=f"bench-{index}")
+        for index, own in enumerate(durations)
+    ]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started_at = perf_counter_ns()
+    for thread in workers:
+        thread.join()
+    return _result(name, list(chain.from_iterable(durations)), perf_counter_ns() - started_at)
+
+
+def run_benchmarks(
+    scenarios: Iterable[BenchScenario],
+    iterations: int,
+    warmup: int = 100,
+) -> list[BenchResult]:
+    return [run_benchmark(scenario, iterations, warmup) for scenario in scenarios]
+
+
+def find_regressions(
+    results: Iterable[BenchResult],
+    baseline: Mapping[str, BenchResult],
+    max_regression: float,
+) -> list[str]:
+    """Return the scenarios whose throughput dropped by more than ``max_regression``."""
+    return [
+        result.name
+        for result in results
+        if result.name in baseline
+        and result.ops_per_second < baseline[result.name].ops_per_second * (1 - max_regression)
+    ]
+
+
+def save_results(results: Sequence[BenchResult], path: Path) -> None:
+    path.write_text(
+        json.dumps([asdict(result) for result in results], indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+
+def load_results(path: Path) -> dict[str, BenchResult]:
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    return {entry["name"]: BenchResult(**entry) for entry in entries}
+
+
+def format_results(
+    results: Sequence[BenchResult],
+    baseline: Mapping[str, BenchResult] | None = None,
+) -> str:
+    lines = [f"{'scenario':<36} {'ops/s':>12} {'p50 us':>9} {'p99 us':>9} {'vs base':>8}"]
+    for result in results:
+        reference = (baseline or {}).get(result.name)
+        change = (
+            f"{result.ops_per_second / reference.ops_per_second - 1:+.1%}"
+            if reference is not None
+            else "-"
+        )
+        lines.append(
+            f"{result.name:<36} {result.ops_per_second:>12,.0f} "
+            f"{result.p50_us:>9.1f} {result.p99_us:>9.1f} {change:>8}"
+        )
+    return "\n".join(lines)
+
+
+def run_bench(
+    settings: Settings,
+    iterations: int,
+    warmup: int,
+    save: str | None = None,
+    baseline: str | None = None,
+    max_regression: float = 0.2,
+    suite: str = "iteration",
+    series: int = 50_000,
+) -> int:
+    if suite == "parser":
+        results, exposition_bytes = run_parser_benchmarks(series, iterations, warmup)
+        print(f"exposition: {series:,} series, {exposition_bytes / 1e6:.1f} MB")
+    elif suite == "metrics":
+        results = run_metrics_benchmarks(settings, iterations, warmup)
+    else:
+        results = run_benchmarks(default_scenarios(settings), iterations, warmup)
+        results += run_component_benchmarks(settings, iterations, warmup)
+    reference = load_results(Path(baseline)) if baseline else None
+    print(format_results(results, reference))
+    if save:
+        save_results(results, Path(save))
+    if reference is None:
+        return 0
+    regressions = find_regressions(results, reference, max_regression)
+    if regressions:
+        print(f"regressed by more than {max_regression:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def _bench_runtime(settings: Settings, sink: TextIO) -> ObservabilityRuntime:
+    configure_logging(settings)
+    stdlib_logger = logging.getLogger(_LOGGER_NAME)
+    stdlib_logger.handlers = [logging.StreamHandler(sink)]
+    stdlib_logger.propagate = False
+    stdlib_logger.setLevel(getattr(logging, settings.log_level, logging.INFO))
+
+    sampler = sampling.ALWAYS_ON if settings.traces_enabled else sampling.ALWAYS_OFF
+    tracer = TracerProvider(sampler=sampler).get_tracer(_LOGGER_NAME)
+    logger: BoundLogger = get_logger(settings, _LOGGER_NAME)
+    return ObservabilityRuntime(
+        logger=logger,
+        metrics=Metrics(settings),
+        tracer=tracer,
+        shutdown=lambda _timeout_seconds: None,
+    )
+
+
+def _split_parse(payload: str) -> dict[str, float]:
+    metrics: dict[str, float] = {}
+    for line in payload.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(maxsplit=1)
+        if len(parts) != 2:
+            msg = f"Invalid Prometheus metric line: {line!r}"
+            raise ValueError(msg)
+        metric_name, raw_value = parts
+        if "{" in metric_name:
+            continue
+        metrics[metric_name] = float(raw_value)
+    return metrics
+
+
+def _result(name: str, durations: list[int], elapsed_ns: int) -> BenchResult:
+    durations.sort()
+    return BenchResult(
+        name=name,
+        iterations=len(durations),
+        ops_per_second=len(durations) / (elapsed_ns / 1e9),
+        p50_us=_percentile(durations, 0.50) / 1000,
+        p99_us=_percentile(durations, 0.99) / 1000,
+    )
+
+
+def _percentile(sorted_values: Sequence[int], quantile: float) -> float:
+    index = min(len(sorted_values) - 1, int(quantile * len(sorted_values)))
+    return float(sorted_values[index])
@@ -1,17 +1,151 @@
 from __future__ import annotations
 
 import argparse
+import json
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError, URLError
 
-from python_boilerplate.app import create_worker_service
-from python_boilerplate.config import load_settings
-from python_boilerplate.runtime import check_health, emit_health_report
+from python_boilerplate.config import Settings, load_settings
+from python_boilerplate.observability.profiling import PROFILE_FORMATS, download_profile
+from python_boilerplate.runtime import (
+    check_fleet,
+    check_health,
+    emit_health_report,
+    read_targets,
+    watch_health,
+)
+
+if TYPE_CHECKING:
+    from python_boilerplate.services import WorkerService
+
+# Only the standard library, config, health and profiling clients are imported eagerly.
+# `boilerplate health` runs as a probe every few seconds, so the worker stack
+# (OpenTelemetry, structlog, prometheus_client, Sentry) is imported by the commands that need it.
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="boilerplate")
     subparsers = parser.add_subparsers(dest="command", required=True)
-    subparsers.add_parser("run", help="Run the worker service.")
-    subparsers.add_parser("health", help="Check service health via the metrics endpoint.")
+    run_parser = subparsers.add_parser("run", help="Run the worker service.")
+    run_parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of forked worker processes. Defaults to APP_WORKER_PROCESSES.",
+    )
+    iterations = run_parser.add_mutually_exclusive_group()
+    iterations.add_argument(
+        "--once",
+        action="store_const",
+        const=1,
+        dest="iterations",
+        help="Run a single iteration and exit. Same as --iterations 1.",
+    )
+    iterations.add_argument(
+        "--iterations",
+        type=int,
+        default=None,
+        help="Run N iterations and exit. Defaults to APP_MAX_ITERATIONS (0 runs forever).",
+    )
+    health_parser = subparsers.add_parser(
+        "health",
+        help="Check service health via the heartbeat file or the metrics endpoint.",
+    )
+    health_parser.add_argument(
+        "targets",
+        nargs="*",
+        help="host:port or URLs of metrics servers to check concurrently instead of this one.",
+    )
+    health_parser.add_argument(
+        "--targets-file",
+        default=None,
+        help="File with one target per line; blank lines and # comments are ignored.",
+    )
+    health_parser.add_argument("--timeout", type=float, default=2.0, help="Seconds per target.")
+    health_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep polling one target over one connection and print every state change.",
+    )
+    health_parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between polls in --watch mode.",
+    )
+    health_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=64,
+        help="Targets probed at the same time.",
+    )
+    profile_parser = subparsers.add_parser(
+        "profile",
+        help="Record a stack profile from the running service (requires APP_PROFILER_ENABLED).",
+    )
+    profile_parser.add_argument(
+        "--seconds",
+        type=float,
+        default=30.0,
+        help="Length of the profiling window. 0 returns everything sampled since startup.",
+    )
+    profile_parser.add_argument(
+        "--format",
+        choices=sorted(PROFILE_FORMATS),
+        default="folded",
+        help="folded for flamegraph.pl/inferno, speedscope for https://www.speedscope.app.",
+    )
+    profile_parser.add_argument(
+        "--output",
+        default=None,
+        help="Target file. Defaults to profile.folded or profile.speedscope.json.",
+    )
+    bench_parser = subparsers.add_parser(
+        "bench",
+        help="Measure the per-iteration overhead of the observability stack.",
+    )
+    bench_parser.add_argument(
+        "--suite",
+        choices=("iteration", "metrics", "parser"),
+        default="iteration",
+        help=(
+            "iteration: observability overhead per iteration. metrics: metric updates from "
+            "1-8 threads, locked vs sharded. parser: health metric parsing."
+        ),
+    )
+    bench_parser.add_argument(
+        "--iterations",
+        type=int,
+        default=None,
+        help="Measured calls per row. Defaults to 10000, or 20 for the parser suite.",
+    )
+    bench_parser.add_argument(
+        "--warmup",
+        type=int,
+        default=None,
+        help="Unmeasured calls per row. Defaults to 1000, or 2 for the parser suite.",
+    )
+    bench_parser.add_argument(
+        "--series",
+        type=int,
+        default=50_000,
+        help="Labeled series in the synthetic exposition of the parser suite.",
+    )
+    bench_parser.add_argument("--save", default=None, help="Write the results as JSON.")
+    bench_parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Compare against a JSON file written by --save and fail on regressions.",
+    )
+    bench_parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Tolerated drop in ops/s per scenario relative to the baseline (0.2 = 20%%).",
+    )
     return parser
 
 
@@ -21,13 +155,112 @@ def main() -> int:
     settings = load_settings()
 
     if args.command == "run":
-        return create_worker_service().run()
+        processes = settings.worker_processes if args.processes is None else args.processes
+        if args.iterations is not None:
+            if args.iterations < 1:
+                parser.error("--iterations must be at least 1")
+            settings = replace(settings, max_iterations=args.iterations)
+        if processes > 1:
+            # The supervisor restarts children that exit, so finite runs stay in one process.
+            if settings.max_iterations > 0:
+                parser.error("--once, --iterations and APP_MAX_ITERATIONS need a single process")
+            # Children skip the push, so nothing would ever reach the Pushgateway.
+            if settings.pushgateway_url:
+                parser.error("APP_PUSHGATEWAY_URL needs a single process")
+            return run_supervisor(settings, processes, target=_run_worker_service)
+        return create_worker_service(settings).run()
 
     if args.command == "health":
+        targets = list(args.targets)
+        if args.targets_file:
+            targets += read_targets(args.targets_file)
+        if args.watch:
+            if len(targets) > 1:
+                parser.error("--watch takes at most one target")
+            return watch_health(
+                settings,
+                targets[0] if targets else None,
+                interval=args.interval,
+                timeout=args.timeout,
+            )
+        if targets:
+            return emit_health_report(
+                check_fleet(settings, targets, timeout=args.timeout, concurrency=args.concurrency)
+            )
         return emit_health_report(check_health(settings))
 
+    if args.command == "bench":
+        parser_suite = args.suite == "parser"
+        return run_bench(
+            settings,
+            iterations=(
+                args.iterations if args.iterations is not None else (20 if parser_suite else 10_000)
+            ),
+            warmup=args.warmup if args.warmup is not None else (2 if parser_suite else 1_000),
+            save=args.save,
+            baseline=args.baseline,
+            max_regression=args.max_regression,
+            suite=args.suite,
+            series=args.series,
+        )
+
+    if args.command == "profile":
+        return write_profile(settings, args.seconds, args.format, args.output)
+
     return 2
 
 
+def write_profile(
+    settings: Settings,
+    seconds: float,
+    output_format: str,
+    output: str | None,
+) -> int:
+    if output is None:
+        output = "profile.speedscope.json" if output_format == "speedscope" else "profile.folded"
+    try:
+        payload = download_profile(settings, seconds, output_format)
+    except HTTPError:
+        print(json.dumps({"ok": False, "reason": "profiler_unavailable"}, separators=(",", ":")))
+        return 1
+    except URLError:
+        print(json.dumps({"ok": False, "reason": "metrics_unreachable"}, separators=(",", ":")))
+        return 1
+    Path(output).write_bytes(payload)
+    print(json.dumps({"ok": True, "output": output}, separators=(",", ":")))
+    return 0
+
+
+def create_worker_service(settings: Settings | None = None) -> WorkerService:
+    from python_boilerplate.app import create_worker_service
+
+    return create_worker_service(settings)
+
+
+def run_supervisor(settings: Settings, processes: int, target: Callable[[], int]) -> int:
+    from python_boilerplate.runtime.supervisor import run_supervisor
+
+    return run_supervisor(settings, processes, target=target)
+
+
+def run_bench(
+    settings: Settings,
+    iterations: int,
+    warmup: int,
+    save: str | None,
+    baseline: str | None,
+    max_regression: float,
+    suite: str = "iteration",
+    series: int = 50_000,
+) -> int:
+    from python_boilerplate.bench import run_bench
+
+    return run_bench(settings, iterations, warmup, save, baseline, max_regression, suite, series)
+
+
+def _run_worker_service() -> int:
+    return create_worker_service().run()
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
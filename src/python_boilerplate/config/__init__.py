@@ -1,3 +1,3 @@
-from .settings import Settings, load_settings, parse_bool
+from .settings import Settings, load_settings, parse_bool, parse_choice
 
-__all__ = ["Settings", "load_settings", "parse_bool"]
+__all__ = ["Settings", "load_settings", "parse_bool", "parse_choice"]
@@ -23,6 +23,14 @@ def parse_bool(value: str) -> bool:
     raise ValueError(msg)
 
 
+def parse_choice(value: str, choices: frozenset[str]) -> str:
+    normalized = value.strip().lower()
+    if normalized in choices:
+        return normalized
+    msg = f"Unsupported value {value!r}, expected one of: {', '.join(sorted(choices))}"
+    raise ValueError(msg)
+
+
 def parse_float(value: str) -> float:
     return float(value.strip())
 
@@ -31,6 +39,23 @@ def parse_int(value: str) -> int:
     return int(value.strip())
 
 
+def parse_float_list(value: str) -> tuple[float, ...]:
+    return tuple(float(item) for item in value.split(",") if item.strip())
+
+
+def parse_positive_float_list(value: str) -> tuple[float, ...]:
+    items = parse_float_list(value)
+    if any(item <= 0 for item in items):
+        msg = f"Unsupported value {value!r}, expected positive numbers"
+        raise ValueError(msg)
+    return items
+
+
+LOOP_SCHEDULES = frozenset({"fixed_delay", "fixed_rate", "adaptive"})
+LOOP_OVERRUN_POLICIES = frozenset({"skip", "catch_up", "coalesce"})
+REQUEST_ID_GENERATORS = frozenset({"uuid4", "counter"})
+
+
 @dataclass(slots=True, frozen=True)
 class Settings:
     service_name: str = "python-boilerplate"
@@ -41,10 +66,41 @@ class Settings:
     log_level: str = "INFO"
     debug: bool = False
     loop_interval_seconds: float = 5.0
+    loop_schedule: str = "fixed_delay"
+    loop_overrun_policy: str = "skip"
+    loop_max_interval_seconds: float = 60.0
+    loop_backoff_factor: float = 2.0
+    worker_concurrency: int = 1
+    worker_processes: int = 1
+    max_iterations: int = 0
+    pipeline_batch_size: int = 100
+    pipeline_queue_size: int = 4
+    queue_path: str = ""
+    queue_batch_size: int = 100
+    queue_visibility_timeout_seconds: float = 30.0
+    rate_limit_per_second: float = 0.0
+    rate_limit_burst: float = 1.0
+    concurrency_limit: int = 0
     metrics_enabled: bool = True
     metrics_host: str = "0.0.0.0"
     metrics_port: int = 9000
+    metrics_sharded: bool = False
+    metrics_cache_seconds: float = 0.0
+    pushgateway_url: str = ""
+    metrics_max_label_sets: int = 1000
+    metrics_label_idle_seconds: float = 0.0
+    iteration_resources_enabled: bool = False
+    iteration_allocations_enabled: bool = False
+    iteration_sample_every: int = 1
+    iteration_sample_rate: float = 1.0
+    iteration_request_ids: str = "uuid4"
+    iteration_duration_buckets: tuple[float, ...] = ()
+    latency_windows_seconds: tuple[float, ...] = ()
+    profiler_enabled: bool = False
+    profiler_hz: float = 19.0
     health_max_age_seconds: float = 60.0
+    heartbeat_path: str = ""
+    shutdown_timeout_seconds: float = 25.0
     sentry_dsn: str = ""
     traces_enabled: bool = True
     otlp_endpoint: str = ""
@@ -62,10 +118,51 @@ def load_settings() -> Settings:
         log_level=getenv("APP_LOG_LEVEL", "INFO").upper(),
         debug=parse_bool(getenv("APP_DEBUG", "false")),
         loop_interval_seconds=parse_float(getenv("APP_LOOP_INTERVAL_SECONDS", "5.0")),
+        loop_schedule=parse_choice(getenv("APP_LOOP_SCHEDULE", "fixed_delay"), LOOP_SCHEDULES),
+        loop_overrun_policy=parse_choice(
+            getenv("APP_LOOP_OVERRUN_POLICY", "skip"), LOOP_OVERRUN_POLICIES
+        ),
+        loop_max_interval_seconds=parse_float(getenv("APP_LOOP_MAX_INTERVAL_SECONDS", "60.0")),
+        loop_backoff_factor=parse_float(getenv("APP_LOOP_BACKOFF_FACTOR", "2.0")),
+        worker_concurrency=parse_int(getenv("APP_WORKER_CONCURRENCY", "1")),
+        worker_processes=parse_int(getenv("APP_WORKER_PROCESSES", "1")),
+        max_iterations=parse_int(getenv("APP_MAX_ITERATIONS", "0")),
+        pipeline_batch_size=parse_int(getenv("APP_PIPELINE_BATCH_SIZE", "100")),
+        pipeline_queue_size=parse_int(getenv("APP_PIPELINE_QUEUE_SIZE", "4")),
+        queue_path=getenv("APP_QUEUE_PATH", ""),
+        queue_batch_size=parse_int(getenv("APP_QUEUE_BATCH_SIZE", "100")),
+        queue_visibility_timeout_seconds=parse_float(
+            getenv("APP_QUEUE_VISIBILITY_TIMEOUT_SECONDS", "30.0")
+        ),
+        rate_limit_per_second=parse_float(getenv("APP_RATE_LIMIT_PER_SECOND", "0.0")),
+        rate_limit_burst=parse_float(getenv("APP_RATE_LIMIT_BURST", "1.0")),
+        concurrency_limit=parse_int(getenv("APP_CONCURRENCY_LIMIT", "0")),
         metrics_enabled=parse_bool(getenv("APP_METRICS_ENABLED", "true")),
         metrics_host=getenv("APP_METRICS_HOST", "0.0.0.0"),
         metrics_port=parse_int(getenv("APP_METRICS_PORT", "9000")),
+        metrics_sharded=parse_bool(getenv("APP_METRICS_SHARDED", "false")),
+        metrics_cache_seconds=parse_float(getenv("APP_METRICS_CACHE_SECONDS", "0.0")),
+        pushgateway_url=getenv("APP_PUSHGATEWAY_URL", ""),
+        metrics_max_label_sets=parse_int(getenv("APP_METRICS_MAX_LABEL_SETS", "1000")),
+        metrics_label_idle_seconds=parse_float(getenv("APP_METRICS_LABEL_IDLE_SECONDS", "0.0")),
+        iteration_resources_enabled=parse_bool(getenv("APP_ITERATION_RESOURCES_ENABLED", "false")),
+        iteration_allocations_enabled=parse_bool(
+            getenv("APP_ITERATION_ALLOCATIONS_ENABLED", "false")
+        ),
+        iteration_sample_every=parse_int(getenv("APP_ITERATION_SAMPLE_EVERY", "1")),
+        iteration_sample_rate=parse_float(getenv("APP_ITERATION_SAMPLE_RATE", "1.0")),
+        iteration_request_ids=parse_choice(
+            getenv("APP_ITERATION_REQUEST_IDS", "uuid4"), REQUEST_ID_GENERATORS
+        ),
+        iteration_duration_buckets=parse_float_list(getenv("APP_ITERATION_DURATION_BUCKETS", "")),
+        latency_windows_seconds=parse_positive_float_list(
+            getenv("APP_LATENCY_WINDOWS_SECONDS", "")
+        ),
+        profiler_enabled=parse_bool(getenv("APP_PROFILER_ENABLED", "false")),
+        profiler_hz=parse_float(getenv("APP_PROFILER_HZ", "19.0")),
         health_max_age_seconds=parse_float(getenv("APP_HEALTH_MAX_AGE_SECONDS", "60.0")),
+        heartbeat_path=getenv("APP_HEARTBEAT_PATH", ""),
+        shutdown_timeout_seconds=parse_float(getenv("APP_SHUTDOWN_TIMEOUT_SECONDS", "25.0")),
         sentry_dsn=getenv("SENTRY_DSN", ""),
         traces_enabled=parse_bool(getenv("APP_TRACES_ENABLED", "true")),
         otlp_endpoint=getenv("OTEL_EXPORTER_OTLP_ENDPOINT", ""),
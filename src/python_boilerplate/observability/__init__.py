@@ -1,3 +1,19 @@
-from .bootstrap import ObservabilityRuntime, setup_observability
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .bootstrap import ObservabilityRuntime, setup_observability
 
 __all__ = ["ObservabilityRuntime", "setup_observability"]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolved on first access, so light submodules such as ``observability.profiling`` can be
+    # imported without loading the OpenTelemetry SDK, structlog and prometheus_client.
+    if name in __all__:
+        from . import bootstrap
+
+        return getattr(bootstrap, name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
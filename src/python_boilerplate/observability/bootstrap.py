@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import partial
 
 from opentelemetry import trace
 from structlog.stdlib import BoundLogger
@@ -13,7 +14,9 @@ from python_boilerplate.observability.errors import (
 )
 from python_boilerplate.observability.logging import configure_logging, get_logger
 from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.observability.profiling import PROFILE_PATH, StackSampler
 from python_boilerplate.observability.tracing import configure_tracing, shutdown_tracing
+from python_boilerplate.runtime.shutdown import run_with_deadline
 
 
 @dataclass(slots=True, frozen=True)
@@ -21,7 +24,7 @@ class ObservabilityRuntime:
     logger: BoundLogger
     metrics: Metrics
     tracer: trace.Tracer
-    shutdown: Callable[[], None]
+    shutdown: Callable[[float], None]
 
 
 def setup_observability(settings: Settings, logger_name: str) -> ObservabilityRuntime:
@@ -29,16 +32,37 @@ def setup_observability(settings: Settings, logger_name: str) -> ObservabilityRu
     configure_error_tracking(settings)
     tracer = configure_tracing(settings)
     metrics = Metrics(settings)
+    profiler = None
+    if settings.profiler_enabled:
+        profiler = StackSampler(name=settings.service_name, hz=settings.profiler_hz)
+        profiler.start()
+        metrics.add_route(PROFILE_PATH, profiler.wsgi_app)
     metrics.start()
     logger = get_logger(settings, logger_name)
     return ObservabilityRuntime(
         logger=logger,
         metrics=metrics,
         tracer=tracer,
-        shutdown=_shutdown_observability,
+        shutdown=partial(
+            _shutdown_observability, profiler=profiler, metrics=metrics, logger=logger
+        ),
     )
 
 
-def _shutdown_observability() -> None:
-    shutdown_tracing()
-    flush_error_tracking()
+def _shutdown_observability(
+    timeout_seconds: float,
+    profiler: StackSampler | None = None,
+    metrics: Metrics | None = None,
+    logger: BoundLogger | None = None,
+) -> None:
+    if profiler is not None:
+        profiler.stop()
+    tasks: dict[str, Callable[[], None]] = {
+        "tracing": lambda: shutdown_tracing(timeout_seconds),
+        "errors": lambda: flush_error_tracking(timeout_seconds),
+    }
+    if metrics is not None and metrics.settings.pushgateway_url:
+        tasks["metrics_push"] = partial(metrics.push, timeout_seconds)
+    failed = run_with_deadline(tasks, timeout_seconds)
+    if "metrics_push" in failed and metrics is not None and logger is not None:
+        logger.warning("metrics_push_failed", pushgateway_url=metrics.settings.pushgateway_url)
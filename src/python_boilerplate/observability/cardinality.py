@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import TypeVar
+
+from prometheus_client import Counter
+from prometheus_client.metrics import MetricWrapperBase
+
+M = TypeVar("M", bound=MetricWrapperBase)
+
+OVERFLOW_LABEL_VALUE = "__overflow__"
+
+
+@dataclass(slots=True)
+class _Children:
+    name: str
+    last_used: dict[tuple[str, ...], float] = field(default_factory=dict)
+    next_sweep_at: float = 0.0
+
+
+@dataclass(slots=True, eq=False)
+class CardinalityGuard:
+    """Keep at most ``max_children`` label sets per metric.
+
+    New label sets beyond the cap go to one overflow child whose label values are all
+    ``__overflow__``; they are counted in ``dropped`` under the metric's family name. With
+    ``idle_seconds`` > 0, label sets that were not used for that long are removed from their
+    metric, checked at most once per ``idle_seconds`` and metric. A removed counter starts
+    again at zero if its label set returns. ``0`` disables either limit.
+    """
+
+    max_children: int = 0
+    idle_seconds: float = 0.0
+    dropped: Counter | None = None
+    clock: Callable[[], float] = monotonic
+    _children: dict[MetricWrapperBase, _Children] = field(default_factory=dict, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_children > 0 or self.idle_seconds > 0
+
+    def labels(self, metric: M, *values: str) -> M:
+        """Return the child of ``metric`` for ``values``, or its overflow child."""
+        if not self.enabled:
+            return metric.labels(*values)
+        key = tuple(str(value) for value in values)
+        now = self.clock()
+        with self._lock:
+            children = self._children.get(metric)
+            if children is None:
+                (family,) = metric.describe()
+                children = _Children(name=family.name, next_sweep_at=now)
+                self._children[metric] = children
+            if key in children.last_used:
+                children.last_used[key] = now
+                return metric.labels(*key)
+            if self.idle_seconds > 0 and now >= children.next_sweep_at:
+                self._evict_idle(metric, children, now)
+            if self.max_children <= 0 or len(children.last_used) < self.max_children:
+                children.last_used[key] = now
+                return metric.labels(*key)
+            name = children.name
+        if self.dropped is not None:
+            self.dropped.labels(metric=name).inc()
+        return metric.labels(*(OVERFLOW_LABEL_VALUE for _ in key))
+
+    def children(self, metric: MetricWrapperBase) -> int:
+        with self._lock:
+            children = self._children.get(metric)
+            return 0 if children is None else len(children.last_used)
+
+    def _evict_idle(self, metric: MetricWrapperBase, children: _Children, now: float) -> None:
+        idle_before = now - self.idle_seconds
+        for key, last_used in list(children.last_used.items()):
+            if last_used < idle_before:
+                del children.last_used[key]
+                metric.remove(*key)
+        children.next_sweep_at = now + self.idle_seconds
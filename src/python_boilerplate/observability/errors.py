@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sentry_sdk import capture_exception, flush, init
+import sys
 
 from python_boilerplate.config import Settings
 
@@ -8,7 +8,10 @@ from python_boilerplate.config import Settings
 def configure_error_tracking(settings: Settings) -> None:
     if not settings.sentry_dsn:
         return
-    init(
+    # Imported only when a DSN is configured; sentry_sdk is one of the slowest imports here.
+    import sentry_sdk
+
+    sentry_sdk.init(
         dsn=settings.sentry_dsn,
         environment=settings.environment,
         release=f"{settings.service_name}@{settings.version}",
@@ -17,8 +20,26 @@ def configure_error_tracking(settings: Settings) -> None:
 
 
 def report_exception(exc: BaseException) -> None:
-    capture_exception(exc)
+    if not _sentry_active():
+        return
+    import sentry_sdk
+
+    sentry_sdk.capture_exception(exc)
 
 
 def flush_error_tracking(timeout_seconds: float = 2.0) -> None:
-    flush(timeout=timeout_seconds)
+    if not _sentry_active():
+        return
+    import sentry_sdk
+
+    sentry_sdk.flush(timeout=timeout_seconds)
+
+
+def _sentry_active() -> bool:
+    # Sentry may also have been initialized by a host application. Nobody can have done that
+    # without importing sentry_sdk, so an unimported SDK is skipped without the slow import.
+    if "sentry_sdk" not in sys.modules:
+        return False
+    import sentry_sdk
+
+    return sentry_sdk.get_client().is_active()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import gzip
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from urllib.parse import parse_qs
+from wsgiref.types import StartResponse, WSGIApplication, WSGIEnvironment
+
+from prometheus_client import CollectorRegistry, make_wsgi_app
+from prometheus_client.exposition import choose_encoder, gzip_accepted
+
+
+@dataclass(slots=True)
+class _Rendering:
+    body: bytes
+    completed_at: float
+    gzipped: bytes | None = None
+
+
+@dataclass(slots=True, eq=False)
+class CachedExposition:
+    """Serve the exposition of ``registry``, rendered at most once per ``max_age_seconds``.
+
+    Scrapes that arrive while a render is running wait for it and reuse its output, so with
+    ``max_age_seconds=0`` concurrent scrapers still share one render. The gzip body is
+    compressed at most once per render. Filtered (``name[]``) and non-GET requests bypass the
+    cache.
+    """
+
+    registry: CollectorRegistry
+    max_age_seconds: float = 0.0
+    clock: Callable[[], float] = monotonic
+    _renderings: dict[str, _Rendering] = field(default_factory=dict, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+    _uncached: WSGIApplication = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._uncached = make_wsgi_app(self.registry)
+
+    def render(self, accept_header: str | None, compress: bool) -> tuple[str, bytes]:
+        """Return the content type and body for a scrape with ``accept_header``."""
+        encoder, content_type = choose_encoder(accept_header or "")
+        requested_at = self.clock()
+        with self._lock:
+            rendering = self._renderings.get(content_type)
+            if rendering is None or rendering.completed_at < requested_at - self.max_age_seconds:
+                body = encoder(self.registry)
+                rendering = _Rendering(body=body, completed_at=self.clock())
+                self._renderings[content_type] = rendering
+            if not compress:
+                return content_type, rendering.body
+            if rendering.gzipped is None:
+                rendering.gzipped = gzip.compress(rendering.body)
+            return content_type, rendering.gzipped
+
+    def wsgi_app(self, environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        if (
+            environ.get("REQUEST_METHOD") != "GET"
+            or environ.get("PATH_INFO") == "/favicon.ico"
+            or "name[]" in parse_qs(environ.get("QUERY_STRING", ""))
+        ):
+            return self._uncached(environ, start_response)
+        compress = gzip_accepted(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        content_type, body = self.render(environ.get("HTTP_ACCEPT"), compress)
+        headers = [("Content-Type", content_type)]
+        if compress:
+            headers.append(("Content-Encoding", "gzip"))
+        start_response("200 OK", headers)
+        return [body]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field
+from threading import Lock
+
+# Layout: magic, version, 2 padding bytes, 8 reserved bytes, sequence, then the three values.
+# The writer makes the sequence odd while it updates the values, so readers can retry
+# instead of seeing a torn update.
+_MAGIC = b"PBHB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sH2x8x")
+_SEQUENCE = struct.Struct("<Q")
+_VALUES = struct.Struct("<ddd")
+_SEQUENCE_OFFSET = _HEADER.size
+_VALUES_OFFSET = _SEQUENCE_OFFSET + _SEQUENCE.size
+HEARTBEAT_SIZE = _VALUES_OFFSET + _VALUES.size
+_READ_ATTEMPTS = 100
+
+
+@dataclass(slots=True, frozen=True)
+class HeartbeatState:
+    app_up: float
+    last_progress: float
+    last_success: float
+
+
+@dataclass(slots=True)
+class HeartbeatWriter:
+    """Publish the health gauges into a small memory-mapped file at ``path``.
+
+    Put the file on tmpfs (for example ``/dev/shm``) so updates never touch a disk. Only the
+    owner can read it, since the local health probe runs as the same user.
+    """
+
+    path: str
+    _map: mmap.mmap | None = field(default=None, init=False)
+    _sequence: int = field(default=0, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def open(self) -> None:
+        if self._map is not None:
+            return
+        descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            os.fchmod(descriptor, 0o600)
+            os.ftruncate(descriptor, HEARTBEAT_SIZE)
+            self._map = mmap.mmap(descriptor, HEARTBEAT_SIZE)
+        finally:
+            os.close(descriptor)
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION)
+        _SEQUENCE.pack_into(self._map, _SEQUENCE_OFFSET, 0)
+
+    def publish(self, app_up: float, last_progress: float, last_success: float) -> None:
+        with self._lock:
+            heartbeat = self._map
+            if heartbeat is None:
+                return
+            self._sequence += 1
+            _SEQUENCE.pack_into(heartbeat, _SEQUENCE_OFFSET, self._sequence)
+            _VALUES.pack_into(heartbeat, _VALUES_OFFSET, app_up, last_progress, last_success)
+            self._sequence += 1
+            _SEQUENCE.pack_into(heartbeat, _SEQUENCE_OFFSET, self._sequence)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+def read_heartbeat(path: str) -> HeartbeatState | None:
+    """Return the published state, or ``None`` if no heartbeat file exists at ``path``."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        if os.fstat(descriptor).st_size < HEARTBEAT_SIZE:
+            msg = f"Heartbeat file {path!r} is truncated"
+            raise ValueError(msg)
+        with mmap.mmap(descriptor, HEARTBEAT_SIZE, access=mmap.ACCESS_READ) as heartbeat:
+            magic, version = _HEADER.unpack_from(heartbeat, 0)
+            if magic != _MAGIC or version != _VERSION:
+                msg = f"Heartbeat file {path!r} has an unknown format"
+                raise ValueError(msg)
+            for _ in range(_READ_ATTEMPTS):
+                (before,) = _SEQUENCE.unpack_from(heartbeat, _SEQUENCE_OFFSET)
+                values = _VALUES.unpack_from(heartbeat, _VALUES_OFFSET)
+                (after,) = _SEQUENCE.unpack_from(heartbeat, _SEQUENCE_OFFSET)
+                if before == after and before % 2 == 0:
+                    return HeartbeatState(*values)
+    finally:
+        os.close(descriptor)
+    msg = f"Heartbeat file {path!r} did not settle"
+    raise ValueError(msg)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import socket
+from collections.abc import Iterable, Mapping
+from socketserver import ThreadingMixIn
+from threading import Thread
+from typing import IO, Any, cast
+from wsgiref.simple_server import ServerHandler, WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.types import StartResponse, WSGIApplication, WSGIEnvironment
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _KeepAliveServerHandler(ServerHandler):
+    http_version = "1.1"
+    keep_alive = False
+
+    def cleanup_headers(self) -> None:
+        super().cleanup_headers()
+        # Without a length the client reads the body until the connection closes.
+        headers = getattr(self, "headers", None)
+        self.keep_alive = headers is not None and "Content-Length" in headers
+
+
+class _SilentHandler(WSGIRequestHandler):
+    """Serve GET requests on one connection until the client closes it or stays idle."""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 60
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+    def handle(self) -> None:
+        try:
+            while self._handle_one_request():
+                pass
+        except (TimeoutError, ConnectionError):
+            return
+
+    def _handle_one_request(self) -> bool:
+        self.raw_requestline = self.rfile.readline(65537)
+        if not self.raw_requestline:
+            return False
+        if len(self.raw_requestline) > 65536:
+            self.requestline = self.request_version = self.command = ""
+            self.send_error(414)
+            return False
+        if not self.parse_request():
+            return False
+        handler: Any = _KeepAliveServerHandler(
+            self.rfile,
+            cast(IO[bytes], self.wfile),
+            self.get_stderr(),
+            self.get_environ(),
+            multithread=True,
+        )
+        handler.request_handler = self
+        handler.run(self.server.get_app())  # type: ignore[attr-defined]
+        return handler.keep_alive and not self.close_connection and self.command == "GET"
+
+
+def route_requests(
+    default: WSGIApplication, routes: Mapping[str, WSGIApplication]
+) -> WSGIApplication:
+    """Dispatch on ``PATH_INFO``; ``routes`` is read per request, so it may change later."""
+
+    def app(environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        handler = routes.get(environ.get("PATH_INFO", ""), default)
+        return handler(environ, start_response)
+
+    return app
+
+
+def serve_wsgi(app: WSGIApplication, host: str, port: int) -> WSGIServer:
+    server = bind_wsgi(app, host, port)
+    Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def bind_wsgi(app: WSGIApplication, host: str, port: int) -> WSGIServer:
+    """Bind the server without serving; call ``serve_forever`` where it should run."""
+    server_class = type(
+        "MetricsServer",
+        (_ThreadingWSGIServer,),
+        {"address_family": _address_family(host, port)},
+    )
+    return make_server(host, port, app, server_class, handler_class=_SilentHandler)
+
+
+def _address_family(host: str, port: int) -> socket.AddressFamily:
+    infos = socket.getaddrinfo(host or None, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)
+    return infos[0][0]
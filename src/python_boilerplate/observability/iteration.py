@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import secrets
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import count
+from random import random
+from time import time_ns
+from uuid import uuid4
+
+from opentelemetry import trace
+from structlog.stdlib import BoundLogger
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.bootstrap import ObservabilityRuntime
+from python_boilerplate.observability.metrics import IterationTimer, start_iteration
+from python_boilerplate.observability.tracing import record_failed_span, root_span, unsampled_span
+
+ITERATION_SPAN_NAME = "service.iteration"
+ITERATION_JOB_NAME = "service_iteration"
+
+
+@dataclass(slots=True)
+class IterationSampler:
+    """Decide which iterations get logs and a span.
+
+    An iteration is recorded when it is one of every ``every`` iterations and also passes the
+    ``rate`` coin flip. Both default to recording everything.
+    """
+
+    every: int = 1
+    rate: float = 1.0
+    random: Callable[[], float] = random
+    _counter: Iterator[int] = field(default_factory=count, init=False)
+
+    def should_record(self) -> bool:
+        if self.every > 1 and next(self._counter) % self.every:
+            return False
+        return self.rate >= 1.0 or self.random() < self.rate
+
+
+@dataclass(slots=True)
+class CounterRequestIds:
+    """Cheap request ids: a random per-process prefix plus a counter."""
+
+    prefix: str = field(default_factory=lambda: secrets.token_hex(6))
+    _counter: Iterator[int] = field(default_factory=lambda: count(1), init=False)
+
+    def __call__(self) -> str:
+        return f"{self.prefix}-{next(self._counter):x}"
+
+
+def uuid4_request_id() -> str:
+    return str(uuid4())
+
+
+def build_request_ids(settings: Settings) -> Callable[[], str]:
+    if settings.iteration_request_ids == "counter":
+        return CounterRequestIds()
+    return uuid4_request_id
+
+
+@dataclass(slots=True)
+class IterationScope:
+    timer: IterationTimer
+    logger: BoundLogger | None = None
+    span: trace.Span | None = None
+
+    def skipped(self) -> None:
+        if self.logger is not None:
+            self.logger.info("iteration_skipped", outcome="shutdown_requested")
+
+    def started(self) -> None:
+        if self.logger is not None:
+            self.logger.info("iteration_started")
+
+    def succeeded(self) -> None:
+        usage = self.timer.observe_success()
+        if self.span is not None:
+            self.span.set_attributes(usage.span_attributes())
+        if self.logger is not None:
+            self.logger.info("iteration_completed", outcome="success")
+
+
+@dataclass(slots=True)
+class IterationInstrumentation:
+    """Request id, logs, span and metrics around one service iteration.
+
+    Metrics are recorded for every iteration. Logs and the ``service.iteration`` span are
+    only written for iterations chosen by ``sampler``; a failing iteration is always logged
+    and gets a span recorded after the fact, subject to the regular trace sampling.
+    """
+
+    settings: Settings
+    runtime: ObservabilityRuntime
+    sampler: IterationSampler = field(init=False)
+    request_ids: Callable[[], str] = field(init=False)
+    allocations: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        # tracemalloc keeps one process-wide peak, so concurrent iterations would reset each
+        # other's measurement.
+        self.allocations = (
+            self.settings.iteration_allocations_enabled and self.settings.worker_concurrency <= 1
+        )
+        self.sampler = IterationSampler(
+            every=self.settings.iteration_sample_every,
+            rate=self.settings.iteration_sample_rate,
+        )
+        self.request_ids = build_request_ids(self.settings)
+
+    @contextmanager
+    def iteration(self) -> Iterator[IterationScope]:
+        timer = start_iteration(
+            self.runtime.metrics,
+            resources=self.settings.iteration_resources_enabled,
+            allocations=self.allocations,
+        )
+        run_id = self.request_ids()
+        if self.sampler.should_record():
+            logger = self.runtime.logger.bind(job_name=ITERATION_JOB_NAME, request_id=run_id)
+            failure_observed = False
+            # The outer try also covers span setup and teardown, so their errors still count
+            # as failed iterations.
+            try:
+                with root_span(
+                    self.runtime.tracer,
+                    ITERATION_SPAN_NAME,
+                    job_name=ITERATION_JOB_NAME,
+                    request_id=run_id,
+                ) as span:
+                    try:
+                        yield IterationScope(timer=timer, logger=logger, span=span)
+                    except Exception:
+                        failure_observed = True
+                        span.set_attributes(timer.observe_failure().span_attributes())
+                        raise
+            except Exception as exc:
+                if not failure_observed:
+                    timer.observe_failure()
+                _log_failure(logger, exc)
+                raise
+            return
+
+        started_at_ns = time_ns()
+        with unsampled_span():
+            try:
+                yield IterationScope(timer=timer)
+            except Exception as exc:
+                usage = timer.observe_failure()
+                _log_failure(
+                    self.runtime.logger.bind(job_name=ITERATION_JOB_NAME, request_id=run_id),
+                    exc,
+                )
+                record_failed_span(
+                    self.runtime.tracer,
+                    ITERATION_SPAN_NAME,
+                    started_at_ns,
+                    exc,
+                    {
+                        "job_name": ITERATION_JOB_NAME,
+                        "request_id": run_id,
+                        **usage.span_attributes(),
+                    },
+                )
+                raise
+
+
+def _log_failure(logger: BoundLogger, exc: Exception) -> None:
+    logger.warning(
+        "iteration_failed",
+        outcome="failure",
+        error=str(exc),
+        exception_type=type(exc).__name__,
+    )
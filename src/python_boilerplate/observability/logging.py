@@ -22,6 +22,9 @@ def _add_trace_context(
     _: Any, __: str, event_dict: MutableMapping[str, Any]
 ) -> MutableMapping[str, Any]:
     span = trace.get_current_span()
+    # Non-recording spans, such as the parent of unsampled iterations, never reach a backend.
+    if not span.is_recording():
+        return event_dict
     span_context = span.get_span_context()
     if span_context.is_valid:
         event_dict["trace_id"] = f"{span_context.trace_id:032x}"
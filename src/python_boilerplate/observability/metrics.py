@@ -1,72 +1,316 @@
 from __future__ import annotations
 
+import math
+import os
+import tracemalloc
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from time import perf_counter, time
+from threading import Lock
+from time import monotonic, perf_counter, process_time, thread_time, time
+from wsgiref.simple_server import WSGIServer
+from wsgiref.types import WSGIApplication
 
-from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    push_to_gateway,
+    values,
+)
+from prometheus_client.core import GaugeMetricFamily, Metric
 
 from python_boilerplate.config import Settings
+from python_boilerplate.observability.cardinality import CardinalityGuard, M
+from python_boilerplate.observability.exposition import CachedExposition
+from python_boilerplate.observability.heartbeat import HeartbeatWriter
+from python_boilerplate.observability.http import bind_wsgi, route_requests, serve_wsgi
+from python_boilerplate.observability.sharded import ShardedIterationMetrics
+from python_boilerplate.observability.status import (
+    HEALTHZ_PATH,
+    READYZ_PATH,
+    HealthStatus,
+    evaluate_health,
+    evaluate_readiness,
+    status_app,
+)
+
+_MULTIPROCESS_ENV = "PROMETHEUS_MULTIPROC_DIR"
+_MULTIPROCESS_DIR: str | None = None
+_BYTE_BUCKETS = tuple(float(2**exponent) for exponent in range(10, 32, 2))
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_SKETCH_MIN_VALUE = 1e-9
+LATENCY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
 
 
 @dataclass(slots=True)
 class Metrics:
+    """Prometheus metrics of one service process.
+
+    With ``metrics_sharded`` a lock-free collector records ``iterations_total``,
+    ``failures_total``, ``iteration_duration_seconds``, ``iterations_in_flight`` and both
+    timestamp gauges. Those attributes then stay out of the registry, so direct updates to
+    them are not exported; record iterations through the ``mark_*`` methods.
+    """
+
     settings: Settings
     registry: CollectorRegistry = field(default_factory=CollectorRegistry)
+    routes: dict[str, WSGIApplication] = field(default_factory=dict, init=False)
     app_up: Gauge = field(init=False)
     app_info: Gauge = field(init=False)
     app_start_time_seconds: Gauge = field(init=False)
     last_progress_timestamp_seconds: Gauge = field(init=False)
     iterations_total: Counter = field(init=False)
     iteration_duration_seconds: Histogram = field(init=False)
+    iteration_cpu_seconds: Histogram = field(init=False)
+    iteration_rss_delta_bytes: Histogram = field(init=False)
+    iteration_allocated_bytes: Histogram = field(init=False)
     last_success_timestamp_seconds: Gauge = field(init=False)
     failures_total: Counter = field(init=False)
+    iterations_in_flight: Gauge = field(init=False)
+    worker_concurrency: Gauge = field(init=False)
+    schedule_lag_seconds: Histogram = field(init=False)
+    schedule_missed_ticks_total: Counter = field(init=False)
+    loop_effective_interval_seconds: Gauge = field(init=False)
+    pipeline_items_total: Counter = field(init=False)
+    pipeline_batch_duration_seconds: Histogram = field(init=False)
+    pipeline_queue_depth: Gauge = field(init=False)
+    queue_items_dequeued_total: Counter = field(init=False)
+    queue_items_acked_total: Counter = field(init=False)
+    queue_items_redelivered_total: Counter = field(init=False)
+    queue_depth: Gauge = field(init=False)
+    cache_hits_total: Counter = field(init=False)
+    cache_misses_total: Counter = field(init=False)
+    cache_evictions_total: Counter = field(init=False)
+    cache_size: Gauge = field(init=False)
+    rate_limit_wait_seconds: Histogram = field(init=False)
+    rate_limit_throttled_total: Counter = field(init=False)
+    concurrency_limit_in_use: Gauge = field(init=False)
+    metrics_label_sets_dropped_total: Counter = field(init=False)
+    # Plain copies of the health gauges so /healthz and /readyz never read the registry.
+    _up: float = field(default=0.0, init=False)
+    _last_success_at: float = field(default=0.0, init=False)
+    _last_progress_at: float = field(default=0.0, init=False)
+    _heartbeat: HeartbeatWriter | None = field(default=None, init=False)
+    _sharded: ShardedIterationMetrics | None = field(default=None, init=False)
+    _latency: LatencyWindows | None = field(default=None, init=False)
+    _guard: CardinalityGuard = field(init=False)
 
     def __post_init__(self) -> None:
+        # The sharded collector exposes the per-iteration metrics itself, so the regular
+        # objects stay out of the registry. Multiprocess mode only aggregates regular metrics.
+        iteration_registry: CollectorRegistry | None = self.registry
+        duration_buckets = self.settings.iteration_duration_buckets or Histogram.DEFAULT_BUCKETS
+        if self.settings.metrics_sharded and _MULTIPROCESS_DIR is None:
+            self._sharded = ShardedIterationMetrics(buckets=duration_buckets)
+            self.registry.register(self._sharded)
+            iteration_registry = None
+        if self.settings.latency_windows_seconds:
+            self._latency = LatencyWindows(self.settings.latency_windows_seconds)
+            # Quantiles cannot be aggregated across processes; children only query them.
+            if _MULTIPROCESS_DIR is None:
+                self.registry.register(self._latency)
         self.app_up = Gauge(
             "app_up",
             "Whether the service is considered healthy.",
             registry=self.registry,
+            multiprocess_mode="livemin",
         )
         self.app_info = Gauge(
             "app_info",
             "Static application metadata.",
             labelnames=("version", "commit", "env"),
             registry=self.registry,
+            multiprocess_mode="max",
         )
         self.app_start_time_seconds = Gauge(
             "app_start_time_seconds",
             "Unix timestamp when the service started.",
             registry=self.registry,
+            multiprocess_mode="min",
         )
         self.last_progress_timestamp_seconds = Gauge(
             "last_progress_timestamp_seconds",
             "Unix timestamp of the last observed service progress signal.",
-            registry=self.registry,
+            registry=iteration_registry,
+            multiprocess_mode="max",
         )
         self.iterations_total = Counter(
             "iterations_total",
             "Total completed service iterations.",
             labelnames=("outcome",),
-            registry=self.registry,
+            registry=iteration_registry,
         )
         self.iteration_duration_seconds = Histogram(
             "iteration_duration_seconds",
             "Duration of service iterations in seconds.",
+            buckets=duration_buckets,
+            registry=iteration_registry,
+        )
+        self.iteration_cpu_seconds = Histogram(
+            "iteration_cpu_seconds",
+            "CPU time consumed during service iterations, by process and by iteration thread.",
+            labelnames=("scope",),
+            registry=self.registry,
+        )
+        self.iteration_rss_delta_bytes = Histogram(
+            "iteration_rss_delta_bytes",
+            "Growth of the resident set size during service iterations in bytes.",
+            buckets=_BYTE_BUCKETS,
+            registry=self.registry,
+        )
+        self.iteration_allocated_bytes = Histogram(
+            "iteration_allocated_bytes",
+            "Growth of the tracemalloc peak over the memory traced at the start of an iteration.",
+            buckets=_BYTE_BUCKETS,
             registry=self.registry,
         )
         self.last_success_timestamp_seconds = Gauge(
             "last_success_timestamp_seconds",
             "Unix timestamp of the last successful iteration.",
-            registry=self.registry,
+            registry=iteration_registry,
+            multiprocess_mode="max",
         )
         self.failures_total = Counter(
             "failures_total",
             "Total failed service iterations.",
+            registry=iteration_registry,
+        )
+        self.iterations_in_flight = Gauge(
+            "iterations_in_flight",
+            "Number of service iterations currently executing.",
+            registry=iteration_registry,
+            multiprocess_mode="livesum",
+        )
+        self.worker_concurrency = Gauge(
+            "worker_concurrency",
+            "Configured maximum number of concurrently executing iterations.",
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.schedule_lag_seconds = Histogram(
+            "schedule_lag_seconds",
+            "Delay between the scheduled and the actual start of fixed-rate iterations.",
+            registry=self.registry,
+        )
+        self.schedule_missed_ticks_total = Counter(
+            "schedule_missed_ticks_total",
+            "Total fixed-rate ticks dropped because an iteration overran its period.",
+            registry=self.registry,
+        )
+        self.loop_effective_interval_seconds = Gauge(
+            "loop_effective_interval_seconds",
+            "Current wait between iterations chosen by the adaptive loop schedule.",
+            registry=self.registry,
+            multiprocess_mode="livemax",
+        )
+        self.pipeline_items_total = Counter(
+            "pipeline_items_total",
+            "Total items emitted by each pipeline stage.",
+            labelnames=("pipeline", "stage"),
+            registry=self.registry,
+        )
+        self.pipeline_batch_duration_seconds = Histogram(
+            "pipeline_batch_duration_seconds",
+            "Time each pipeline stage spent processing one batch in seconds.",
+            labelnames=("pipeline", "stage"),
+            registry=self.registry,
+        )
+        self.pipeline_queue_depth = Gauge(
+            "pipeline_queue_depth",
+            "Batches waiting in front of each pipeline stage.",
+            labelnames=("pipeline", "stage"),
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.queue_items_dequeued_total = Counter(
+            "queue_items_dequeued_total",
+            "Total work items leased from the work queue.",
+            registry=self.registry,
+        )
+        self.queue_items_acked_total = Counter(
+            "queue_items_acked_total",
+            "Total work items acknowledged and removed from the work queue.",
+            registry=self.registry,
+        )
+        self.queue_items_redelivered_total = Counter(
+            "queue_items_redelivered_total",
+            "Total work items delivered again after their visibility timeout expired.",
             registry=self.registry,
         )
+        self.queue_depth = Gauge(
+            "queue_depth",
+            "Work items currently stored in the work queue, including leased ones.",
+            registry=self.registry,
+            multiprocess_mode="max",
+        )
+        self.cache_hits_total = Counter(
+            "cache_hits_total",
+            "Total cache lookups served from a cached entry, including stale ones.",
+            labelnames=("cache",),
+            registry=self.registry,
+        )
+        self.cache_misses_total = Counter(
+            "cache_misses_total",
+            "Total cache lookups that had to run the loader.",
+            labelnames=("cache",),
+            registry=self.registry,
+        )
+        self.cache_evictions_total = Counter(
+            "cache_evictions_total",
+            "Total cache entries evicted to stay within the size bound.",
+            labelnames=("cache",),
+            registry=self.registry,
+        )
+        self.cache_size = Gauge(
+            "cache_size",
+            "Entries currently held by each cache.",
+            labelnames=("cache",),
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.rate_limit_wait_seconds = Histogram(
+            "rate_limit_wait_seconds",
+            "Time calls waited for a rate or concurrency limiter in seconds.",
+            labelnames=("limiter",),
+            registry=self.registry,
+        )
+        self.rate_limit_throttled_total = Counter(
+            "rate_limit_throttled_total",
+            "Total calls rejected because a limiter could not admit them in time.",
+            labelnames=("limiter",),
+            registry=self.registry,
+        )
+        self.concurrency_limit_in_use = Gauge(
+            "concurrency_limit_in_use",
+            "Calls currently holding a slot of a concurrency limiter.",
+            labelnames=("limiter",),
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.metrics_label_sets_dropped_total = Counter(
+            "metrics_label_sets_dropped_total",
+            "Label sets redirected to the overflow child because a metric reached its cap.",
+            labelnames=("metric",),
+            registry=self.registry,
+        )
+        # Removing a child in multiprocess mode leaves its value in the mmap files, so the
+        # aggregated exposition would keep it while the guard counts it as freed.
+        self._guard = CardinalityGuard(
+            max_children=self.settings.metrics_max_label_sets,
+            idle_seconds=(
+                self.settings.metrics_label_idle_seconds if _MULTIPROCESS_DIR is None else 0.0
+            ),
+            dropped=self.metrics_label_sets_dropped_total,
+        )
 
     def start(self) -> None:
         now = time()
+        self._up = 1.0
+        self._last_progress_at = now
         self.app_up.set(1)
         self.app_info.labels(
             version=self.settings.version,
@@ -75,44 +319,454 @@ class Metrics:
         ).set(1)
         self.app_start_time_seconds.set(now)
         self.last_progress_timestamp_seconds.set(now)
-        if self.settings.metrics_enabled:
-            start_http_server(
-                port=self.settings.metrics_port,
-                addr=self.settings.metrics_host,
-                registry=self.registry,
+        if self._sharded is not None:
+            self._sharded.progress(now)
+        self.worker_concurrency.set(max(1, self.settings.worker_concurrency))
+        if self.settings.heartbeat_path and _MULTIPROCESS_DIR is None:
+            self._heartbeat = HeartbeatWriter(self.settings.heartbeat_path)
+            self._heartbeat.open()
+            self._publish_heartbeat()
+        # In multiprocess mode the supervisor serves the aggregated registry instead. With a
+        # Pushgateway the registry is pushed once at shutdown and nothing scrapes this process.
+        if (
+            self.settings.metrics_enabled
+            and not self.settings.pushgateway_url
+            and _MULTIPROCESS_DIR is None
+        ):
+            self.routes.setdefault(HEALTHZ_PATH, status_app(self.health_status))
+            self.routes.setdefault(READYZ_PATH, status_app(self.readiness_status))
+            exposition = CachedExposition(self.registry, self.settings.metrics_cache_seconds)
+            serve_wsgi(
+                route_requests(exposition.wsgi_app, self.routes),
+                self.settings.metrics_host,
+                self.settings.metrics_port,
             )
 
+    def labels(self, metric: M, *values: str) -> M:
+        """Return a label child of ``metric`` within the configured cardinality limits.
+
+        Use it instead of ``metric.labels(...)`` whenever label values come from data.
+        """
+        return self._guard.labels(metric, *values)
+
+    def push(self, timeout_seconds: float) -> None:
+        """Replace this instance's group on the Pushgateway with the current registry."""
+        if not self.settings.pushgateway_url or _MULTIPROCESS_DIR is not None:
+            return
+        push_to_gateway(
+            self.settings.pushgateway_url,
+            job=self.settings.service_name,
+            registry=self.registry,
+            grouping_key={"instance": self.settings.instance},
+            timeout=timeout_seconds,
+        )
+
+    def add_route(self, path: str, app: WSGIApplication) -> None:
+        self.routes[path] = app
+
+    def health_status(self) -> HealthStatus:
+        return evaluate_health(
+            self.settings,
+            app_up=self._up,
+            last_success=self._last_success_at,
+            last_progress=self._last_progress_at,
+            now=time(),
+        )
+
+    def latency_quantile(
+        self, quantile: float, window_seconds: float | None = None
+    ) -> float | None:
+        """Return a quantile of recent iteration durations, by default over the shortest window."""
+        if self._latency is None:
+            return None
+        return self._latency.quantile(quantile, window_seconds)
+
+    def readiness_status(self) -> HealthStatus:
+        return evaluate_readiness(self._up, self._last_success_at)
+
     def mark_shutdown(self) -> None:
+        self._up = 0.0
         self.app_up.set(0)
+        self._publish_heartbeat()
+        if self._heartbeat is not None:
+            self._heartbeat.close()
+
+    def mark_iteration_started(self) -> None:
+        if self._sharded is not None:
+            self._sharded.iteration_started()
+            return
+        self.iterations_in_flight.inc()
+
+    def mark_iteration_finished(self) -> None:
+        if self._sharded is not None:
+            self._sharded.iteration_finished()
+            return
+        self.iterations_in_flight.dec()
+
+    def mark_schedule_lag(self, lag_seconds: float) -> None:
+        self.schedule_lag_seconds.observe(lag_seconds)
+
+    def mark_missed_ticks(self, count: int) -> None:
+        self.schedule_missed_ticks_total.inc(count)
+
+    def mark_loop_interval(self, interval_seconds: float) -> None:
+        self.loop_effective_interval_seconds.set(interval_seconds)
+
+    def mark_pipeline_batch(
+        self, pipeline: str, stage: str, items: int, duration_seconds: float
+    ) -> None:
+        self.labels(self.pipeline_items_total, pipeline, stage).inc(items)
+        self.labels(self.pipeline_batch_duration_seconds, pipeline, stage).observe(duration_seconds)
+
+    def mark_pipeline_queue_depth(self, pipeline: str, stage: str, depth: int) -> None:
+        self.labels(self.pipeline_queue_depth, pipeline, stage).set(depth)
+
+    def mark_queue_dequeued(self, items: int, redelivered: int, depth: int | None = None) -> None:
+        self.queue_items_dequeued_total.inc(items)
+        self.queue_items_redelivered_total.inc(redelivered)
+        if depth is not None:
+            self.queue_depth.set(depth)
+
+    def mark_queue_acked(self, items: int) -> None:
+        self.queue_items_acked_total.inc(items)
+
+    def mark_iteration_resources(self, usage: IterationUsage) -> None:
+        if usage.process_cpu_seconds is not None:
+            self.iteration_cpu_seconds.labels(scope="process").observe(usage.process_cpu_seconds)
+        if usage.thread_cpu_seconds is not None:
+            self.iteration_cpu_seconds.labels(scope="thread").observe(usage.thread_cpu_seconds)
+        if usage.rss_delta_bytes is not None:
+            self.iteration_rss_delta_bytes.observe(max(0, usage.rss_delta_bytes))
+        if usage.allocated_bytes is not None:
+            self.iteration_allocated_bytes.observe(usage.allocated_bytes)
+
+    def mark_cache_event(self, cache: str, event: str) -> None:
+        if event == "hit":
+            self.labels(self.cache_hits_total, cache).inc()
+        elif event == "miss":
+            self.labels(self.cache_misses_total, cache).inc()
+        elif event == "eviction":
+            self.labels(self.cache_evictions_total, cache).inc()
+
+    def mark_cache_size(self, cache: str, size: int) -> None:
+        self.labels(self.cache_size, cache).set(size)
+
+    def mark_rate_limit_wait(self, limiter: str, wait_seconds: float) -> None:
+        self.labels(self.rate_limit_wait_seconds, limiter).observe(wait_seconds)
+
+    def mark_rate_limit_throttled(self, limiter: str) -> None:
+        self.labels(self.rate_limit_throttled_total, limiter).inc()
+
+    def mark_concurrency_in_use(self, limiter: str, in_use: int) -> None:
+        self.labels(self.concurrency_limit_in_use, limiter).set(in_use)
 
     def mark_progress(self) -> None:
-        self.last_progress_timestamp_seconds.set(time())
+        self._last_progress_at = time()
+        if self._sharded is not None:
+            self._sharded.progress(self._last_progress_at)
+        else:
+            self.last_progress_timestamp_seconds.set(self._last_progress_at)
+        self._publish_heartbeat()
 
     def mark_success(self, duration_seconds: float) -> None:
         now = time()
-        self.last_progress_timestamp_seconds.set(now)
-        self.iterations_total.labels(outcome="success").inc()
-        self.iteration_duration_seconds.observe(duration_seconds)
-        self.last_success_timestamp_seconds.set(now)
+        self._last_progress_at = self._last_success_at = now
+        if self._latency is not None:
+            self._latency.add(duration_seconds)
+        if self._sharded is not None:
+            self._sharded.success(duration_seconds, now)
+        else:
+            self.last_progress_timestamp_seconds.set(now)
+            self.iterations_total.labels(outcome="success").inc()
+            self.iteration_duration_seconds.observe(duration_seconds)
+            self.last_success_timestamp_seconds.set(now)
+        self._publish_heartbeat()
 
     def mark_failure(self, duration_seconds: float) -> None:
-        self.last_progress_timestamp_seconds.set(time())
-        self.iterations_total.labels(outcome="failure").inc()
-        self.iteration_duration_seconds.observe(duration_seconds)
-        self.failures_total.inc()
+        self._last_progress_at = time()
+        if self._latency is not None:
+            self._latency.add(duration_seconds)
+        if self._sharded is not None:
+            self._sharded.failure(duration_seconds, self._last_progress_at)
+        else:
+            self.last_progress_timestamp_seconds.set(self._last_progress_at)
+            self.iterations_total.labels(outcome="failure").inc()
+            self.iteration_duration_seconds.observe(duration_seconds)
+            self.failures_total.inc()
+        self._publish_heartbeat()
+
+    def _publish_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.publish(self._up, self._last_progress_at, self._last_success_at)
+
+
+@dataclass(slots=True, frozen=True)
+class IterationUsage:
+    process_cpu_seconds: float | None = None
+    thread_cpu_seconds: float | None = None
+    rss_delta_bytes: int | None = None
+    allocated_bytes: int | None = None
+
+    def span_attributes(self) -> dict[str, float | int]:
+        attributes = {
+            "iteration.cpu.process_seconds": self.process_cpu_seconds,
+            "iteration.cpu.thread_seconds": self.thread_cpu_seconds,
+            "iteration.memory.rss_delta_bytes": self.rss_delta_bytes,
+            "iteration.memory.allocated_bytes": self.allocated_bytes,
+        }
+        return {key: value for key, value in attributes.items() if value is not None}
 
 
 @dataclass(slots=True)
 class IterationTimer:
+    """Measure one iteration and optionally the resources it consumed.
+
+    ``resources`` adds process and thread CPU time and the RSS delta, ``allocations`` adds
+    how far the tracemalloc peak grew above the memory traced at the start. Both read
+    process-wide counters, so with concurrent iterations the process CPU and RSS figures
+    include work done by other iterations. ``allocations`` resets the process-wide peak and
+    is only meaningful when one iteration runs at a time.
+    """
+
     metrics: Metrics
+    resources: bool = False
+    allocations: bool = False
     started_at: float = field(default_factory=perf_counter)
+    _process_cpu_started: float = field(default=0.0, init=False)
+    _thread_cpu_started: float = field(default=0.0, init=False)
+    _rss_started: int | None = field(default=None, init=False)
+    _traced_started: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        if self.resources:
+            self._process_cpu_started = process_time()
+            self._thread_cpu_started = thread_time()
+            self._rss_started = current_rss_bytes()
+        if self.allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._traced_started = tracemalloc.get_traced_memory()[0]
+
+    def observe_success(self) -> IterationUsage:
+        duration_seconds = perf_counter() - self.started_at
+        usage = self.usage()
+        self.metrics.mark_success(duration_seconds)
+        self._observe_usage(usage)
+        return usage
+
+    def observe_failure(self) -> IterationUsage:
+        duration_seconds = perf_counter() - self.started_at
+        usage = self.usage()
+        self.metrics.mark_failure(duration_seconds)
+        self._observe_usage(usage)
+        return usage
+
+    def usage(self) -> IterationUsage:
+        process_cpu_seconds = thread_cpu_seconds = None
+        rss_delta_bytes = allocated_bytes = None
+        if self.resources:
+            process_cpu_seconds = process_time() - self._process_cpu_started
+            thread_cpu_seconds = thread_time() - self._thread_cpu_started
+            rss_bytes = current_rss_bytes()
+            if rss_bytes is not None and self._rss_started is not None:
+                rss_delta_bytes = rss_bytes - self._rss_started
+        if self.allocations and tracemalloc.is_tracing():
+            allocated_bytes = max(0, tracemalloc.get_traced_memory()[1] - self._traced_started)
+        return IterationUsage(
+            process_cpu_seconds=process_cpu_seconds,
+            thread_cpu_seconds=thread_cpu_seconds,
+            rss_delta_bytes=rss_delta_bytes,
+            allocated_bytes=allocated_bytes,
+        )
+
+    def _observe_usage(self, usage: IterationUsage) -> None:
+        if self.resources or self.allocations:
+            self.metrics.mark_iteration_resources(usage)
+
+
+def start_iteration(
+    metrics: Metrics,
+    resources: bool = False,
+    allocations: bool = False,
+) -> IterationTimer:
+    return IterationTimer(metrics=metrics, resources=resources, allocations=allocations)
+
+
+def current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class DDSketch:
+    """Quantile sketch with a relative error of ``relative_accuracy`` (DDSketch).
+
+    Values are counted in logarithmic bins. Beyond ``max_bins`` the lowest bins are merged,
+    which only degrades the lowest quantiles. Sketches with the same accuracy can be merged.
+    """
+
+    relative_accuracy: float = 0.01
+    max_bins: int = 2048
+    count: int = field(default=0, init=False)
+    zero_count: int = field(default=0, init=False)
+    _gamma: float = field(init=False)
+    _log_gamma: float = field(init=False)
+    _bins: dict[int, int] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= _SKETCH_MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._bins[index] = self._bins.get(index, 0) + 1
+        if len(self._bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: DDSketch) -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            msg = "Cannot merge sketches with different relative accuracy"
+            raise ValueError(msg)
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other._bins.items():
+            self._bins[index] = self._bins.get(index, 0) + count
+        if len(self._bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, quantile: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = quantile * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._bins):
+            seen += self._bins[index]
+            if seen > rank:
+                return 2 * self._gamma**index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._bins) / (self._gamma + 1)
+
+    def _collapse(self) -> None:
+        indexes = sorted(self._bins)
+        target = indexes[len(indexes) - self.max_bins]
+        for index in indexes[: len(indexes) - self.max_bins]:
+            self._bins[target] += self._bins.pop(index)
+
+
+@dataclass(slots=True, eq=False)
+class LatencyWindows:
+    """Iteration latency quantiles over sliding windows, served as gauges at scrape time.
+
+    Values go into one sketch per slice of ``min(windows) / 6`` seconds; a window merges the
+    slices it covers, so it slides in steps of one slice.
+    """
+
+    windows_seconds: tuple[float, ...]
+    quantiles: tuple[float, ...] = LATENCY_QUANTILES
+    clock: Callable[[], float] = monotonic
+    _slice_seconds: float = field(init=False)
+    _slices: deque[tuple[int, DDSketch]] = field(default_factory=deque, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def __post_init__(self) -> None:
+        if not self.windows_seconds or min(self.windows_seconds) <= 0:
+            msg = f"Latency windows must be positive, got {self.windows_seconds!r}"
+            raise ValueError(msg)
+        self._slice_seconds = min(self.windows_seconds) / 6
+
+    def add(self, value: float) -> None:
+        slice_id = int(self.clock() // self._slice_seconds)
+        with self._lock:
+            if not self._slices or self._slices[-1][0] != slice_id:
+                self._slices.append((slice_id, DDSketch()))
+                oldest = slice_id - math.ceil(max(self.windows_seconds) / self._slice_seconds)
+                while self._slices[0][0] <= oldest:
+                    self._slices.popleft()
+            self._slices[-1][1].add(value)
+
+    def sketch(self, window_seconds: float) -> DDSketch:
+        """Return a merged copy of the sketches of the last ``window_seconds``."""
+        oldest = int(self.clock() // self._slice_seconds) - math.ceil(
+            window_seconds / self._slice_seconds
+        )
+        merged = DDSketch()
+        with self._lock:
+            for slice_id, sketch in self._slices:
+                if slice_id > oldest:
+                    merged.merge(sketch)
+        return merged
+
+    def quantile(self, quantile: float, window_seconds: float | None = None) -> float | None:
+        return self.sketch(window_seconds or min(self.windows_seconds)).quantile(quantile)
+
+    def collect(self) -> Iterator[Metric]:
+        family = GaugeMetricFamily(
+            "iteration_duration_quantile_seconds",
+            "Quantiles of the iteration duration over sliding windows, within 1% relative error.",
+            labels=("window", "quantile"),
+        )
+        for window_seconds in self.windows_seconds:
+            sketch = self.sketch(window_seconds)
+            for quantile in self.quantiles:
+                value = sketch.quantile(quantile)
+                family.add_metric(
+                    (f"{window_seconds:g}s", str(quantile)),
+                    math.nan if value is None else value,
+                )
+        yield family
+
+
+@contextmanager
+def multiprocess_metrics(directory: str) -> Iterator[None]:
+    """Store metric values in ``directory`` so forked children can be aggregated."""
+    global _MULTIPROCESS_DIR
+
+    previous_env = os.environ.get(_MULTIPROCESS_ENV)
+    previous_value_class = values.ValueClass
+    os.environ[_MULTIPROCESS_ENV] = directory
+    # prometheus_client picks its value backend at import time; rebind it so metrics
+    # created after this point (for example in forked children) write to ``directory``.
+    values.ValueClass = values.get_value_class()  # type: ignore[no-untyped-call]
+    _MULTIPROCESS_DIR = directory
+    try:
+        yield
+    finally:
+        _MULTIPROCESS_DIR = None
+        values.ValueClass = previous_value_class
+        if previous_env is None:
+            os.environ.pop(_MULTIPROCESS_ENV, None)
+        else:
+            os.environ[_MULTIPROCESS_ENV] = previous_env
+
+
+def build_multiprocess_registry(directory: str) -> CollectorRegistry:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=directory)  # type: ignore[no-untyped-call]
+    return registry
 
-    def observe_success(self) -> None:
-        self.metrics.mark_success(perf_counter() - self.started_at)
 
-    def observe_failure(self) -> None:
-        self.metrics.mark_failure(perf_counter() - self.started_at)
+def bind_multiprocess_metrics_server(settings: Settings, directory: str) -> WSGIServer | None:
+    """Bind the aggregated metrics server; the caller decides where it serves."""
+    if not settings.metrics_enabled:
+        return None
+    exposition = CachedExposition(
+        build_multiprocess_registry(directory), settings.metrics_cache_seconds
+    )
+    return bind_wsgi(
+        exposition.wsgi_app,
+        settings.metrics_host,
+        settings.metrics_port,
+    )
 
 
-def start_iteration(metrics: Metrics) -> IterationTimer:
-    return IterationTimer(metrics=metrics)
+def mark_process_dead(pid: int, directory: str) -> None:
+    multiprocess.mark_process_dead(pid, path=directory)  # type: ignore[no-untyped-call]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from time import monotonic
+from types import CodeType, FrameType
+from urllib.parse import parse_qs, urlencode
+from urllib.request import urlopen
+from wsgiref.types import StartResponse, WSGIEnvironment
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.status import local_metrics_url
+
+PROFILE_PATH = "/debug/profile"
+PROFILE_FORMATS = frozenset({"folded", "speedscope"})
+MAX_PROFILE_SECONDS = 300.0
+_TRUNCATED = "[truncated]"
+
+
+@dataclass(slots=True)
+class StackSampler:
+    """Sample the Python stacks of all threads ``hz`` times per second.
+
+    Samples are aggregated as collapsed stacks (``thread;root;...;leaf`` with a count), the
+    input format of flamegraph.pl and speedscope. At most ``max_stacks`` distinct stacks are
+    kept; further ones are counted under ``[truncated]``.
+    """
+
+    name: str = "python-boilerplate"
+    hz: float = 19.0
+    max_stacks: int = 10_000
+    _stacks: Counter[str] = field(default_factory=Counter, init=False)
+    _labels: dict[CodeType, str] = field(default_factory=dict, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+    _stop_event: Event = field(default_factory=Event, init=False)
+    _thread: Thread | None = field(default=None, init=False)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = 1.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_seconds)
+            self._thread = None
+
+    def sample(self) -> None:
+        sampler_ident = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        stacks = [
+            self._collapse(frame, thread_names.get(ident, str(ident)))
+            for ident, frame in frames.items()
+            if ident != sampler_ident
+        ]
+        with self._lock:
+            for stack in stacks:
+                if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[stack] += 1
+                else:
+                    self._stacks[_TRUNCATED] += 1
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stacks)
+
+    def profile(self, seconds: float) -> dict[str, int]:
+        """Return the stacks sampled during the next ``seconds``, or all of them for ``0``."""
+        before = self.snapshot()
+        if seconds <= 0:
+            return before
+        self._stop_event.wait(min(seconds, MAX_PROFILE_SECONDS))
+        after = self.snapshot()
+        return {
+            stack: count - before.get(stack, 0)
+            for stack, count in after.items()
+            if count > before.get(stack, 0)
+        }
+
+    def wsgi_app(self, environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        output_format = query.get("format", ["folded"])[0]
+        try:
+            seconds = float(query.get("seconds", ["0"])[0])
+        except ValueError:
+            seconds = -1.0
+        if output_format not in PROFILE_FORMATS or seconds < 0:
+            start_response("400 Bad Request", [("Content-Type", "text/plain; charset=utf-8")])
+            return [b"expected format=folded|speedscope and seconds>=0\n"]
+
+        stacks = self.profile(seconds)
+        if output_format == "speedscope":
+            body = format_speedscope(stacks, name=self.name).encode("utf-8")
+            content_type = "application/json"
+        else:
+            body = format_folded(stacks).encode("utf-8")
+            content_type = "text/plain; charset=utf-8"
+        start_response("200 OK", [("Content-Type", content_type)])
+        return [body]
+
+    def _run(self) -> None:
+        interval = 1.0 / max(self.hz, 0.1)
+        while not self._stop_event.is_set():
+            started_at = monotonic()
+            self.sample()
+            self._stop_event.wait(max(0.0, interval - (monotonic() - started_at)))
+
+    def _collapse(self, frame: FrameType | None, thread_name: str) -> str:
+        labels: list[str] = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+                label = self._labels[code] = label.replace(";", ":")
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_name.replace(";", ":"))
+        return ";".join(reversed(labels))
+
+
+def format_folded(stacks: Mapping[str, int]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def format_speedscope(stacks: Mapping[str, int], name: str) -> str:
+    frame_indexes: dict[str, int] = {}
+    samples: list[list[int]] = []
+    weights: list[int] = []
+    for stack, count in sorted(stacks.items()):
+        samples.append(
+            [frame_indexes.setdefault(frame, len(frame_indexes)) for frame in stack.split(";")]
+        )
+        weights.append(count)
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "python-boilerplate",
+        "shared": {"frames": [{"name": frame} for frame in frame_indexes]},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "none",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+    return json.dumps(document, separators=(",", ":"))
+
+
+def download_profile(settings: Settings, seconds: float, output_format: str) -> bytes:
+    query = urlencode({"seconds": seconds, "format": output_format})
+    with urlopen(
+        f"{local_metrics_url(settings, PROFILE_PATH)}?{query}",
+        timeout=min(seconds, MAX_PROFILE_SECONDS) + 10,
+    ) as response:
+        payload: bytes = response.read()
+    return payload
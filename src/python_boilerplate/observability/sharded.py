@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import weakref
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from threading import Lock, local
+
+from prometheus_client import Histogram
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+    Metric,
+)
+from prometheus_client.utils import floatToGoString
+
+
+@dataclass(slots=True, eq=False)
+class _Shard:
+    successes: int = 0
+    failures: int = 0
+    duration_sum: float = 0.0
+    duration_buckets: list[int] = field(default_factory=list)
+    in_flight: int = 0
+    last_progress: float = 0.0
+    last_success: float = 0.0
+
+    def absorb(self, other: _Shard) -> None:
+        self.successes += other.successes
+        self.failures += other.failures
+        self.in_flight += other.in_flight
+        self.duration_sum += other.duration_sum
+        self.last_progress = max(self.last_progress, other.last_progress)
+        self.last_success = max(self.last_success, other.last_success)
+        for index, count in enumerate(other.duration_buckets):
+            self.duration_buckets[index] += count
+
+
+class _ThreadToken:
+    """Stored in the thread-local slot; collected when its thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+@dataclass(slots=True, eq=False)
+class ShardedIterationMetrics:
+    """Per-thread accumulators for the metrics every iteration updates.
+
+    Each thread writes only to its own shard, so recording takes no lock. ``collect`` merges
+    the shards when the registry is scraped and exposes the same metric names as the regular
+    ``Metrics`` objects. When a thread exits, its shard is folded into a retired total, so
+    short-lived threads do not accumulate shards and counters never go backwards.
+    """
+
+    buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS
+    _bounds: list[float] = field(init=False)
+    _local: local = field(default_factory=local, init=False)
+    _shards: list[_Shard] = field(default_factory=list, init=False)
+    _retired: _Shard = field(init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def __post_init__(self) -> None:
+        self._bounds = sorted(float(bound) for bound in self.buckets)
+        if not self._bounds or self._bounds[-1] != float("inf"):
+            self._bounds.append(float("inf"))
+        self._retired = self._new_shard()
+
+    @property
+    def shards(self) -> int:
+        with self._lock:
+            return len(self._shards)
+
+    def iteration_started(self) -> None:
+        self._shard().in_flight += 1
+
+    def iteration_finished(self) -> None:
+        self._shard().in_flight -= 1
+
+    def progress(self, now: float) -> None:
+        self._shard().last_progress = now
+
+    def success(self, duration_seconds: float, now: float) -> None:
+        shard = self._shard()
+        shard.successes += 1
+        shard.duration_sum += duration_seconds
+        shard.duration_buckets[bisect_left(self._bounds, duration_seconds)] += 1
+        shard.last_progress = shard.last_success = now
+
+    def failure(self, duration_seconds: float, now: float) -> None:
+        shard = self._shard()
+        shard.failures += 1
+        shard.duration_sum += duration_seconds
+        shard.duration_buckets[bisect_left(self._bounds, duration_seconds)] += 1
+        shard.last_progress = now
+
+    def collect(self) -> Iterator[Metric]:
+        # Merge under the lock, so a shard that is being retired is never counted twice.
+        total = self._new_shard()
+        with self._lock:
+            total.absorb(self._retired)
+            for shard in self._shards:
+                total.absorb(shard)
+
+        iterations = CounterMetricFamily(
+            "iterations_total",
+            "Total completed service iterations.",
+            labels=("outcome",),
+        )
+        iterations.add_metric(("success",), total.successes)
+        iterations.add_metric(("failure",), total.failures)
+        yield iterations
+        yield CounterMetricFamily(
+            "failures_total",
+            "Total failed service iterations.",
+            value=total.failures,
+        )
+        cumulative = 0
+        cumulative_buckets: list[tuple[str, float]] = []
+        for bound, count in zip(self._bounds, total.duration_buckets, strict=True):
+            cumulative += count
+            cumulative_buckets.append(
+                (floatToGoString(bound), cumulative)  # type: ignore[no-untyped-call]
+            )
+        yield HistogramMetricFamily(
+            "iteration_duration_seconds",
+            "Duration of service iterations in seconds.",
+            buckets=cumulative_buckets,
+            sum_value=total.duration_sum,
+        )
+        yield GaugeMetricFamily(
+            "iterations_in_flight",
+            "Number of service iterations currently executing.",
+            value=total.in_flight,
+        )
+        yield GaugeMetricFamily(
+            "last_progress_timestamp_seconds",
+            "Unix timestamp of the last observed service progress signal.",
+            value=total.last_progress,
+        )
+        yield GaugeMetricFamily(
+            "last_success_timestamp_seconds",
+            "Unix timestamp of the last successful iteration.",
+            value=total.last_success,
+        )
+
+    def _shard(self) -> _Shard:
+        try:
+            shard: _Shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            self._local.token = token = _ThreadToken()
+            weakref.finalize(token, self._retire, shard)
+        return shard
+
+    def _new_shard(self) -> _Shard:
+        return _Shard(duration_buckets=[0] * len(self._bounds))
+
+    def _retire(self, shard: _Shard) -> None:
+        with self._lock:
+            self._shards.remove(shard)
+            self._retired.absorb(shard)
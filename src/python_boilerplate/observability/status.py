@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from wsgiref.types import StartResponse, WSGIApplication, WSGIEnvironment
+
+from python_boilerplate.config import Settings
+
+# Shared by the metrics server and the `boilerplate health` client. Keep this module free of
+# third-party imports: the health command imports it on every probe.
+HEALTHZ_PATH = "/healthz"
+READYZ_PATH = "/readyz"
+
+
+@dataclass(slots=True, frozen=True)
+class HealthStatus:
+    ok: bool
+    reason: str
+    age_seconds: float | None = None
+
+    def to_json(self) -> bytes:
+        document: dict[str, object] = {"ok": self.ok, "reason": self.reason}
+        if self.age_seconds is not None:
+            document["age_seconds"] = round(self.age_seconds, 3)
+        return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+
+def evaluate_health(
+    settings: Settings,
+    app_up: float,
+    last_success: float | None,
+    last_progress: float | None,
+    now: float,
+) -> HealthStatus:
+    """Apply the liveness rules shared by ``check_health`` and the ``/healthz`` endpoint."""
+    if app_up < 1:
+        return HealthStatus(ok=False, reason="app_down")
+
+    freshness_signal = last_success if last_success is not None else last_progress
+    if freshness_signal is None:
+        return HealthStatus(ok=True, reason="ok")
+
+    age = now - freshness_signal
+    if settings.health_max_age_seconds <= 0:
+        return HealthStatus(ok=True, reason="ok", age_seconds=age)
+    is_healthy = age <= settings.health_max_age_seconds
+    return HealthStatus(ok=is_healthy, reason="ok" if is_healthy else "stale", age_seconds=age)
+
+
+def evaluate_readiness(app_up: float, last_success: float) -> HealthStatus:
+    """Ready once the service is up and has completed one successful iteration."""
+    if app_up < 1:
+        return HealthStatus(ok=False, reason="app_down")
+    if last_success <= 0:
+        return HealthStatus(ok=False, reason="starting")
+    return HealthStatus(ok=True, reason="ok")
+
+
+def status_app(evaluate: Callable[[], HealthStatus]) -> WSGIApplication:
+    """Serve ``evaluate()`` as JSON with status 200 when ok and 503 otherwise."""
+
+    def app(_environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        status = evaluate()
+        start_response(
+            "200 OK" if status.ok else "503 Service Unavailable",
+            [("Content-Type", "application/json"), ("Cache-Control", "no-store")],
+        )
+        return [status.to_json()]
+
+    return app
+
+
+def local_metrics_url(settings: Settings, path: str = "/metrics") -> str:
+    return f"http://{_health_host(settings.metrics_host)}:{settings.metrics_port}{path}"
+
+
+def _health_host(metrics_host: str) -> str:
+    if metrics_host in {"", "0.0.0.0", "::"}:
+        return "127.0.0.1"
+    return metrics_host
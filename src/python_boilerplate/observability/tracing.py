@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import Iterator, Mapping
 from contextlib import contextmanager
+from random import getrandbits
 from threading import Lock
 
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.context import Context
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider, sampling
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.trace import Status, StatusCode
 
 from python_boilerplate.config import Settings
 
@@ -44,6 +46,10 @@ def configure_tracing(settings: Settings) -> trace.Tracer:
                 sampler=_build_sampler(settings),
             )
             if settings.traces_enabled and settings.otlp_endpoint:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                    OTLPSpanExporter,
+                )
+
                 exporter = OTLPSpanExporter(endpoint=settings.otlp_endpoint)
                 provider.add_span_processor(BatchSpanProcessor(exporter))
             trace.set_tracer_provider(provider)
@@ -58,11 +64,11 @@ def configure_tracing(settings: Settings) -> trace.Tracer:
     return trace.get_tracer(settings.service_name)
 
 
-def shutdown_tracing() -> None:
+def shutdown_tracing(timeout_seconds: float = 30.0) -> None:
     provider = trace.get_tracer_provider()
     force_flush = getattr(provider, "force_flush", None)
     if callable(force_flush):
-        force_flush()
+        force_flush(timeout_millis=int(timeout_seconds * 1000))
     shutdown = getattr(provider, "shutdown", None)
     if callable(shutdown):
         shutdown()
@@ -75,8 +81,42 @@ def _build_sampler(settings: Settings) -> sampling.Sampler:
 
 
 @contextmanager
-def root_span(tracer: trace.Tracer, span_name: str, **attributes: str) -> Iterator[None]:
+def root_span(tracer: trace.Tracer, span_name: str, **attributes: str) -> Iterator[trace.Span]:
     with tracer.start_as_current_span(span_name) as span:
         for key, value in attributes.items():
             span.set_attribute(key, value)
-        yield
+        yield span
+
+
+@contextmanager
+def unsampled_span() -> Iterator[trace.Span]:
+    """Activate a non-recording parent so spans opened inside are dropped by the sampler."""
+    span = trace.NonRecordingSpan(
+        trace.SpanContext(
+            trace_id=getrandbits(128) or 1,
+            span_id=getrandbits(64) or 1,
+            is_remote=False,
+            trace_flags=trace.TraceFlags(trace.TraceFlags.DEFAULT),
+        )
+    )
+    with trace.use_span(span):
+        yield span
+
+
+def record_failed_span(
+    tracer: trace.Tracer,
+    span_name: str,
+    start_time_ns: int,
+    exc: BaseException,
+    attributes: Mapping[str, str | int | float],
+) -> None:
+    """Record a finished root span for an operation whose span was not started up front."""
+    span = tracer.start_span(
+        span_name,
+        context=Context(),
+        attributes=attributes,
+        start_time=start_time_ns,
+    )
+    span.record_exception(exc)
+    span.set_status(Status(StatusCode.ERROR, f"{type(exc).__name__}: {exc}"))
+    span.end()
@@ -1,3 +1,21 @@
-from .health import HealthReport, check_health, emit_health_report, parse_prometheus_text
+from .health import (
+    FleetReport,
+    HealthReport,
+    check_fleet,
+    check_health,
+    emit_health_report,
+    parse_prometheus_text,
+    read_targets,
+    watch_health,
+)
 
-__all__ = ["HealthReport", "check_health", "emit_health_report", "parse_prometheus_text"]
+__all__ = [
+    "FleetReport",
+    "HealthReport",
+    "check_fleet",
+    "check_health",
+    "emit_health_report",
+    "parse_prometheus_text",
+    "read_targets",
+    "watch_health",
+]
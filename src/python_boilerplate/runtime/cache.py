@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, TypeVar, cast
+
+from python_boilerplate.observability.metrics import Metrics
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+@dataclass(slots=True)
+class _Flight:
+    done: Event = field(default_factory=Event)
+    value: Any = None
+    error: BaseException | None = None
+
+
+@dataclass(slots=True)
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL for lookups shared across iterations.
+
+    Concurrent misses for the same key are deduplicated: one caller runs the loader and the
+    others wait for its result. With ``stale_seconds`` > 0, an expired entry is still served
+    for that long while a single background refresh replaces it.
+    """
+
+    name: str
+    max_size: int = 1024
+    ttl_seconds: float = 60.0
+    stale_seconds: float = 0.0
+    metrics: Metrics | None = None
+    clock: Callable[[], float] = monotonic
+    _entries: OrderedDict[Hashable, _Entry] = field(default_factory=OrderedDict, init=False)
+    _flights: dict[Hashable, _Flight] = field(default_factory=dict, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_or_load(
+        self, key: Hashable, loader: Callable[[], T], ttl_seconds: float | None = None
+    ) -> T:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._record("hit")
+                return cast(T, entry.value)
+            if entry is not None and now < entry.expires_at + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self._record("hit")
+                if key not in self._flights:
+                    self._flights[key] = _Flight()
+                    Thread(
+                        target=self._refresh,
+                        args=(key, loader, ttl_seconds),
+                        name=f"cache-{self.name}-refresh",
+                        daemon=True,
+                    ).start()
+                return cast(T, entry.value)
+            self._record("miss")
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return cast(T, flight.value)
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            flight.error = exc
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+            raise
+        self._finish(key, flight, value, ttl_seconds)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._update_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._update_size()
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], ttl_seconds: float | None) -> None:
+        with self._lock:
+            flight = self._flights[key]
+        try:
+            value = loader()
+        except Exception as exc:
+            flight.error = exc
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+            return
+        self._finish(key, flight, value, ttl_seconds)
+
+    def _finish(
+        self, key: Hashable, flight: _Flight, value: Any, ttl_seconds: float | None
+    ) -> None:
+        flight.value = value
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+            del self._flights[key]
+        flight.done.set()
+
+    def _store(self, key: Hashable, value: Any, ttl_seconds: float | None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = _Entry(value=value, expires_at=self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(1, self.max_size):
+            self._entries.popitem(last=False)
+            self._record("eviction")
+        self._update_size()
+
+    def _record(self, event: str) -> None:
+        if self.metrics is not None:
+            self.metrics.mark_cache_event(self.name, event)
+
+    def _update_size(self) -> None:
+        if self.metrics is not None:
+            self.metrics.mark_cache_size(self.name, len(self._entries))
@@ -1,31 +1,175 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict, dataclass
+import re
+from collections import Counter, deque
+from collections.abc import Collection, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
-from time import time
-from urllib.error import URLError
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPResponse,
+    HTTPSConnection,
+    RemoteDisconnected,
+)
+from itertools import chain
+from threading import Event
+from time import perf_counter, time
+from urllib.error import HTTPError
+from urllib.parse import SplitResult, urlsplit
 from urllib.request import urlopen
 
 from python_boilerplate.config import Settings
+from python_boilerplate.observability.heartbeat import read_heartbeat
+from python_boilerplate.observability.status import (
+    HEALTHZ_PATH,
+    HealthStatus,
+    evaluate_health,
+    local_metrics_url,
+)
+
+HEALTH_METRICS = frozenset(
+    {"app_up", "last_success_timestamp_seconds", "last_progress_timestamp_seconds"}
+)
+_METRIC_NAME = re.compile(r"[^{\s]+")
+_LABEL = re.compile(r'\s*(?:([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"\s*)?(,|\})')
+_ESCAPE = re.compile(r"\\(.)")
+
+
+@dataclass(slots=True, frozen=True)
+class PrometheusSample:
+    name: str
+    labels: dict[str, str]
+    value: float
+    timestamp: float | None = None
+
+
+def iter_prometheus_samples(
+    lines: Iterable[bytes | str],
+    names: Collection[str] | None = None,
+) -> Iterator[PrometheusSample]:
+    """Parse Prometheus or OpenMetrics text exposition line by line.
+
+    Lines that do not start with one of ``names`` are skipped before they are decoded or
+    matched, so a scan for a few names costs little more than reading the payload. Escaped
+    label values, timestamps, exemplars, ``NaN`` and ``+Inf`` are supported, and ``# EOF``
+    ends the stream.
+    """
+    text_prefixes = None if names is None else tuple(names)
+    byte_prefixes = (
+        None if text_prefixes is None else tuple(name.encode("utf-8") for name in text_prefixes)
+    )
+    for raw_line in lines:
+        if isinstance(raw_line, bytes):
+            if byte_prefixes is not None and not raw_line.startswith(byte_prefixes):
+                if raw_line.startswith(b"# EOF") and raw_line.rstrip() == b"# EOF":
+                    return
+                continue
+            line = raw_line.decode("utf-8").rstrip()
+        else:
+            if text_prefixes is not None and not raw_line.startswith(text_prefixes):
+                if raw_line.startswith("# EOF") and raw_line.rstrip() == "# EOF":
+                    return
+                continue
+            line = raw_line.rstrip()
+        if not line or line[0] == "#":
+            if line == "# EOF":
+                return
+            continue
+        name_match = _METRIC_NAME.match(line)
+        if name_match is None:
+            msg = f"Invalid Prometheus metric line: {line!r}"
+            raise ValueError(msg)
+        name = name_match.group()
+        if names is not None and name not in names:
+            continue
+        yield _parse_sample(line, name, name_match.end())
+
+
+def scan_prometheus(
+    lines: Iterable[bytes | str],
+    names: Iterable[str],
+    matchers: Mapping[str, Mapping[str, str]] | None = None,
+) -> dict[str, float]:
+    """Return the value of the first matching series per name and stop once all are found.
+
+    Without an entry in ``matchers`` a name matches only its unlabeled series; with one it
+    matches the first series carrying all of the given label values.
+    """
+    remaining = set(names)
+    matchers = matchers or {}
+    values: dict[str, float] = {}
+    if not remaining:
+        return values
+    for sample in iter_prometheus_samples(lines, remaining):
+        matcher = matchers.get(sample.name)
+        if matcher is None:
+            if sample.labels:
+                continue
+        elif any(sample.labels.get(label) != value for label, value in matcher.items()):
+            continue
+        values[sample.name] = sample.value
+        remaining.discard(sample.name)
+        if not remaining:
+            break
+    return values
 
 
 def parse_prometheus_text(payload: str) -> dict[str, float]:
+    """Return the value of every unlabeled series in ``payload``.
+
+    Labeled lines are skipped by looking for ``{`` in the metric name, before any parsing.
+    """
     metrics: dict[str, float] = {}
     for line in payload.splitlines():
-        if not line or line.startswith("#"):
+        if not line or line[0] == "#":
+            if line.rstrip() == "# EOF":
+                break
             continue
         parts = line.split(maxsplit=1)
+        if "{" in parts[0]:
+            continue
         if len(parts) != 2:
             msg = f"Invalid Prometheus metric line: {line!r}"
             raise ValueError(msg)
-        metric_name, raw_value = parts
-        if "{" in metric_name:
-            continue
-        metrics[metric_name] = float(raw_value)
+        metrics[parts[0]] = _parse_sample(line.strip(), parts[0], len(parts[0])).value
     return metrics
 
 
+def _parse_sample(line: str, name: str, position: int) -> PrometheusSample:
+    labels: dict[str, str] = {}
+    if position < len(line) and line[position] == "{":
+        position += 1
+        while True:
+            label_match = _LABEL.match(line, position)
+            if label_match is None:
+                msg = f"Invalid Prometheus labels: {line!r}"
+                raise ValueError(msg)
+            label, value, separator = label_match.groups()
+            if label is not None:
+                labels[label] = _ESCAPE.sub(_unescape, value) if "\\" in value else value
+            position = label_match.end()
+            if separator == "}":
+                break
+    # Anything after " # " is an OpenMetrics exemplar.
+    fields = line[position:].split(" # ", 1)[0].split()
+    if not 1 <= len(fields) <= 2:
+        msg = f"Invalid Prometheus metric line: {line!r}"
+        raise ValueError(msg)
+    return PrometheusSample(
+        name=name,
+        labels=labels,
+        value=float(fields[0]),
+        timestamp=float(fields[1]) if len(fields) == 2 else None,
+    )
+
+
+def _unescape(match: re.Match[str]) -> str:
+    return "\n" if match.group(1) == "n" else match.group(1)
+
+
 @dataclass(slots=True, frozen=True)
 class HealthReport:
     service: str
@@ -38,97 +182,272 @@ class HealthReport:
 
 
 def check_health(settings: Settings) -> HealthReport:
-    if not settings.metrics_enabled:
-        return HealthReport(
-            service=settings.service_name,
-            env=settings.environment,
-            version=settings.version,
-            commit=settings.commit,
-            timestamp=_timestamp(),
-            ok=True,
-            reason="metrics_disabled",
-        )
+    """Read the heartbeat file if configured, otherwise ask ``/healthz``.
+
+    Without a heartbeat file (as with ``--processes`` > 1) the HTTP check is used when metrics
+    are enabled. Servers without ``/healthz``, such as the multiprocess metrics process, answer
+    every path with the Prometheus exposition, so that fallback needs no second request.
+    """
+    status = _local_status(settings)
+    if status is None:
+        status = probe_health(settings, local_metrics_url(settings, ""))
+    return _report(settings, status)
 
-    try:
-        with urlopen(
-            f"http://{_health_host(settings.metrics_host)}:{settings.metrics_port}/metrics",
-            timeout=2,
-        ) as response:
-            payload = response.read().decode("utf-8")
-    except URLError:
-        return HealthReport(
-            service=settings.service_name,
-            env=settings.environment,
-            version=settings.version,
-            commit=settings.commit,
-            timestamp=_timestamp(),
-            ok=False,
-            reason="metrics_unreachable",
-        )
 
+def probe_health(settings: Settings, base_url: str, timeout: float = 2) -> HealthStatus:
+    """Check the service whose metrics server listens at ``base_url``."""
     try:
-        metrics = parse_prometheus_text(payload)
-    except (UnicodeDecodeError, ValueError):
-        return HealthReport(
-            service=settings.service_name,
-            env=settings.environment,
-            version=settings.version,
-            commit=settings.commit,
-            timestamp=_timestamp(),
-            ok=False,
-            reason="metrics_invalid",
-        )
+        with urlopen(f"{base_url}{HEALTHZ_PATH}", timeout=timeout) as response:
+            return _read_health_response(settings, response)
+    except HTTPError as exc:
+        if exc.code != 503:
+            return HealthStatus(ok=False, reason="metrics_unreachable")
+        return _read_health_response(settings, exc)
+    except OSError:
+        return HealthStatus(ok=False, reason="metrics_unreachable")
 
-    app_up = metrics.get("app_up", 0.0)
-    if app_up < 1:
-        return HealthReport(
-            service=settings.service_name,
-            env=settings.environment,
-            version=settings.version,
-            commit=settings.commit,
-            timestamp=_timestamp(),
-            ok=False,
-            reason="app_down",
-        )
 
-    freshness_signal = metrics.get("last_success_timestamp_seconds")
-    if freshness_signal is None:
-        freshness_signal = metrics.get("last_progress_timestamp_seconds")
-
-    if freshness_signal is None or settings.health_max_age_seconds <= 0:
-        return HealthReport(
-            service=settings.service_name,
-            env=settings.environment,
-            version=settings.version,
-            commit=settings.commit,
-            timestamp=_timestamp(),
-            ok=True,
-            reason="ok",
+@dataclass(slots=True, frozen=True)
+class TargetHealth:
+    target: str
+    ok: bool
+    reason: str
+    duration_seconds: float
+
+
+@dataclass(slots=True, frozen=True)
+class FleetReport:
+    service: str
+    env: str
+    timestamp: str
+    ok: bool
+    total: int
+    healthy: int
+    reasons: dict[str, int]
+    slowest: list[TargetHealth]
+    targets: list[TargetHealth]
+
+
+def check_fleet(
+    settings: Settings,
+    targets: Sequence[str],
+    timeout: float = 2.0,
+    concurrency: int = 64,
+    slowest: int = 5,
+) -> FleetReport:
+    """Probe ``targets`` (``host:port`` or URLs) concurrently and summarize the results.
+
+    Unreachable hosts cost at most ``timeout`` each and run in parallel, so the whole check takes
+    about ``timeout`` times ``len(targets) / concurrency`` in the worst case.
+    """
+
+    def probe(target: str) -> TargetHealth:
+        started_at = perf_counter()
+        status = probe_health(settings, _target_url(target), timeout=timeout)
+        return TargetHealth(
+            target=target,
+            ok=status.ok,
+            reason=status.reason,
+            duration_seconds=round(perf_counter() - started_at, 4),
         )
 
-    age = time() - freshness_signal
-    is_healthy = age <= settings.health_max_age_seconds
-    return HealthReport(
+    results: list[TargetHealth] = []
+    if targets:
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(concurrency, len(targets))),
+            thread_name_prefix="health-probe",
+        ) as executor:
+            results = list(executor.map(probe, targets))
+    healthy = sum(result.ok for result in results)
+    return FleetReport(
         service=settings.service_name,
         env=settings.environment,
-        version=settings.version,
-        commit=settings.commit,
         timestamp=_timestamp(),
-        ok=is_healthy,
-        reason="ok" if is_healthy else "stale",
+        ok=healthy == len(results),
+        total=len(results),
+        healthy=healthy,
+        reasons=dict(Counter(result.reason for result in results).most_common()),
+        slowest=sorted(results, key=lambda result: result.duration_seconds, reverse=True)[:slowest],
+        targets=results,
     )
 
 
-def emit_health_report(report: HealthReport) -> int:
+def read_targets(path: str) -> list[str]:
+    """Read one target per line, ignoring blank lines and ``#`` comments."""
+    with open(path, encoding="utf-8") as targets_file:
+        lines = (line.split("#", 1)[0].strip() for line in targets_file)
+        return [line for line in lines if line]
+
+
+@dataclass(slots=True)
+class HealthWatcher:
+    """Poll one service over a single keep-alive connection and report transitions.
+
+    Without ``target`` the local service is watched, through its heartbeat file if configured.
+    The last ``window`` freshness ages are kept in ``ages``.
+    """
+
+    settings: Settings
+    target: str | None = None
+    timeout: float = 2.0
+    window: int = 12
+    ages: deque[float] = field(init=False)
+    status: HealthStatus | None = field(default=None, init=False)
+    _connection: HTTPConnection | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        self.ages = deque(maxlen=max(1, self.window))
+
+    def poll(self) -> dict[str, object] | None:
+        """Probe once and return a report if ``ok`` or ``reason`` changed."""
+        status = self.probe()
+        if status.age_seconds is not None:
+            self.ages.append(round(status.age_seconds, 3))
+        previous, self.status = self.status, status
+        if previous is not None and (previous.ok, previous.reason) == (status.ok, status.reason):
+            return None
+        return {
+            **asdict(_report(self.settings, status)),
+            "previous_reason": None if previous is None else previous.reason,
+            "ages": list(self.ages),
+        }
+
+    def probe(self) -> HealthStatus:
+        if self.target is None:
+            status = _local_status(self.settings)
+            if status is not None:
+                return status
+        url = urlsplit(
+            _target_url(self.target) if self.target else local_metrics_url(self.settings, "")
+        )
+        try:
+            response = self._request(url)
+            try:
+                if response.status not in {200, 503}:
+                    return HealthStatus(ok=False, reason="metrics_unreachable")
+                return _read_health_response(self.settings, response)
+            finally:
+                # Drain what an early-stopping parse left, so the connection can be reused.
+                response.read()
+        except (OSError, HTTPException):
+            self.close()
+            return HealthStatus(ok=False, reason="metrics_unreachable")
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _request(self, url: SplitResult) -> HTTPResponse:
+        reused = self._connection is not None
+        if self._connection is None:
+            connection_class = HTTPSConnection if url.scheme == "https" else HTTPConnection
+            self._connection = connection_class(url.netloc, timeout=self.timeout)
+        try:
+            self._connection.request("GET", f"{url.path}{HEALTHZ_PATH}")
+            return self._connection.getresponse()
+        except (RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            if not reused:
+                raise
+            # The server closed the idle connection since the last poll; that is not an outage.
+            self.close()
+            return self._request(url)
+
+
+def watch_health(
+    settings: Settings,
+    target: str | None = None,
+    interval: float = 5.0,
+    timeout: float = 2.0,
+    stop_event: Event | None = None,
+    max_polls: int | None = None,
+) -> int:
+    """Print a JSON line per health transition until interrupted; exit with the last state."""
+    watcher = HealthWatcher(settings, target=target, timeout=timeout)
+    stop_event = stop_event or Event()
+    polls = 0
+    try:
+        while not stop_event.is_set():
+            event = watcher.poll()
+            if event is not None:
+                print(json.dumps(event, separators=(",", ":")), flush=True)
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            stop_event.wait(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0 if watcher.status is not None and watcher.status.ok else 1
+
+
+def emit_health_report(report: HealthReport | FleetReport) -> int:
     print(json.dumps(asdict(report), separators=(",", ":")))
     return 0 if report.ok else 1
 
 
-def _timestamp() -> str:
-    return datetime.now(UTC).isoformat()
+def _target_url(target: str) -> str:
+    return (target if "://" in target else f"http://{target}").rstrip("/")
+
+
+def _local_status(settings: Settings) -> HealthStatus | None:
+    """Answer from the heartbeat file or the metrics switch, or ``None`` to ask HTTP."""
+    if settings.heartbeat_path:
+        try:
+            heartbeat = read_heartbeat(settings.heartbeat_path)
+        except (OSError, ValueError):
+            return HealthStatus(ok=False, reason="heartbeat_invalid")
+        if heartbeat is not None:
+            return evaluate_health(
+                settings,
+                app_up=heartbeat.app_up,
+                last_success=heartbeat.last_success,
+                last_progress=heartbeat.last_progress,
+                now=time(),
+            )
+        if not settings.metrics_enabled:
+            return HealthStatus(ok=False, reason="heartbeat_missing")
+    if not settings.metrics_enabled:
+        return HealthStatus(ok=True, reason="metrics_disabled")
+    return None
+
+
+def _read_health_response(settings: Settings, response: Iterable[bytes]) -> HealthStatus:
+    lines = iter(response)
+    try:
+        first_line = next(lines, b"")
+        if first_line.lstrip().startswith(b"{"):
+            document = json.loads(b"".join([first_line, *lines]))
+            age_seconds = document.get("age_seconds")
+            return HealthStatus(
+                ok=document["ok"] is True,
+                reason=str(document["reason"]),
+                age_seconds=None if age_seconds is None else float(age_seconds),
+            )
+        metrics = scan_prometheus(chain([first_line], lines), HEALTH_METRICS)
+    except (ValueError, KeyError, TypeError):
+        return HealthStatus(ok=False, reason="metrics_invalid")
+    return evaluate_health(
+        settings,
+        app_up=metrics.get("app_up", 0.0),
+        last_success=metrics.get("last_success_timestamp_seconds"),
+        last_progress=metrics.get("last_progress_timestamp_seconds"),
+        now=time(),
+    )
+
+
+def _report(settings: Settings, status: HealthStatus) -> HealthReport:
+    return HealthReport(
+        service=settings.service_name,
+        env=settings.environment,
+        version=settings.version,
+        commit=settings.commit,
+        timestamp=_timestamp(),
+        ok=status.ok,
+        reason=status.reason,
+    )
 
 
-def _health_host(metrics_host: str) -> str:
-    if metrics_host in {"", "0.0.0.0", "::"}:
-        return "127.0.0.1"
-    return metrics_host
+def _timestamp() -> str:
+    return datetime.now(UTC).isoformat()
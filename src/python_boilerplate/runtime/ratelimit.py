@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from threading import Condition, Lock
+from time import monotonic, perf_counter, sleep
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+
+
+class ThrottledError(TimeoutError):
+    """Raised when a limiter cannot admit a call within its timeout."""
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Pace calls to ``rate_per_second`` with bursts of up to ``burst`` tokens.
+
+    ``acquire`` reserves its tokens immediately and then sleeps until they are due, so
+    concurrent callers are spaced out instead of all retrying at once. The same bucket can
+    be shared by threads and asyncio tasks. A rate of ``0`` disables limiting.
+    """
+
+    name: str
+    rate_per_second: float = 0.0
+    burst: float = 1.0
+    metrics: Metrics | None = None
+    clock: Callable[[], float] = monotonic
+    sleep: Callable[[float], None] = sleep
+    _tokens: float = field(default=0.0, init=False)
+    _updated_at: float = field(default=0.0, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def __post_init__(self) -> None:
+        self._tokens = max(1.0, self.burst)
+        self._updated_at = self.clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        if not self.enabled:
+            return True
+        if self._reserve(tokens, max_wait_seconds=0.0) is None:
+            self._record_throttled()
+            return False
+        return True
+
+    def acquire(self, tokens: float = 1.0, timeout: float | None = None) -> float:
+        """Block until ``tokens`` are available and return the seconds waited."""
+        wait_seconds = self._reserve_or_throttle(tokens, timeout)
+        if wait_seconds > 0:
+            self.sleep(wait_seconds)
+        self._record_wait(wait_seconds)
+        return wait_seconds
+
+    async def acquire_async(self, tokens: float = 1.0, timeout: float | None = None) -> float:
+        wait_seconds = self._reserve_or_throttle(tokens, timeout)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+        self._record_wait(wait_seconds)
+        return wait_seconds
+
+    def _reserve_or_throttle(self, tokens: float, timeout: float | None) -> float:
+        if not self.enabled:
+            return 0.0
+        wait_seconds = self._reserve(tokens, max_wait_seconds=timeout)
+        if wait_seconds is None:
+            self._record_throttled()
+            msg = f"Rate limiter {self.name!r} cannot admit the call within {timeout} seconds"
+            raise ThrottledError(msg)
+        return wait_seconds
+
+    def _reserve(self, tokens: float, max_wait_seconds: float | None) -> float | None:
+        capacity = max(1.0, self.burst)
+        if tokens > capacity:
+            msg = f"Cannot acquire {tokens} tokens from a bucket with burst {capacity}"
+            raise ValueError(msg)
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                capacity,
+                self._tokens + (now - self._updated_at) * self.rate_per_second,
+            )
+            self._updated_at = now
+            wait_seconds = max(0.0, (tokens - self._tokens) / self.rate_per_second)
+            if max_wait_seconds is not None and wait_seconds > max_wait_seconds:
+                return None
+            self._tokens -= tokens
+            return wait_seconds
+
+    def _record_wait(self, wait_seconds: float) -> None:
+        if self.metrics is not None and self.enabled:
+            self.metrics.mark_rate_limit_wait(self.name, wait_seconds)
+
+    def _record_throttled(self) -> None:
+        if self.metrics is not None:
+            self.metrics.mark_rate_limit_throttled(self.name)
+
+
+@dataclass(slots=True)
+class ConcurrencyLimiter:
+    """Allow at most ``limit`` calls in flight, shared by threads and asyncio tasks.
+
+    Use ``with limiter.slot():`` from threads and ``async with limiter.slot_async():`` from
+    coroutines. A limit of ``0`` disables limiting.
+    """
+
+    name: str
+    limit: int = 0
+    metrics: Metrics | None = None
+    _in_use: int = field(default=0, init=False)
+    _condition: Condition = field(default_factory=Condition, init=False)
+    _async_waiters: deque[asyncio.Future[None]] = field(default_factory=deque, init=False)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @contextmanager
+    def slot(self, timeout: float | None = None) -> Iterator[None]:
+        if self.limit <= 0:
+            yield
+            return
+        started_at = perf_counter()
+        with self._condition:
+            if not self._condition.wait_for(self._has_capacity, timeout=timeout):
+                self._throttle(timeout)
+            self._enter()
+        self._record_wait(perf_counter() - started_at)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    @asynccontextmanager
+    async def slot_async(self, timeout: float | None = None) -> AsyncIterator[None]:
+        if self.limit <= 0:
+            yield
+            return
+        started_at = perf_counter()
+        try:
+            await asyncio.wait_for(self._enter_async(), timeout=timeout)
+        except TimeoutError:
+            with self._condition:
+                self._throttle(timeout)
+        self._record_wait(perf_counter() - started_at)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    async def _enter_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._has_capacity():
+                    self._enter()
+                    return
+                waiter: asyncio.Future[None] = loop.create_future()
+                self._async_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._condition:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                    elif self._has_capacity():
+                        # This waiter was already woken; hand the free slot to the next one.
+                        self._wake_async_waiter()
+                raise
+
+    def _has_capacity(self) -> bool:
+        return self._in_use < self.limit
+
+    def _enter(self) -> None:
+        self._in_use += 1
+        self._record_in_use()
+
+    def _exit(self) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._record_in_use()
+            self._condition.notify()
+            self._wake_async_waiter()
+
+    def _wake_async_waiter(self) -> None:
+        while self._async_waiters:
+            waiter = self._async_waiters.popleft()
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+                return
+
+    def _throttle(self, timeout: float | None) -> None:
+        if self.metrics is not None:
+            self.metrics.mark_rate_limit_throttled(self.name)
+        msg = f"Concurrency limiter {self.name!r} has no free slot within {timeout} seconds"
+        raise ThrottledError(msg)
+
+    def _record_wait(self, wait_seconds: float) -> None:
+        if self.metrics is not None:
+            self.metrics.mark_rate_limit_wait(self.name, wait_seconds)
+
+    def _record_in_use(self) -> None:
+        if self.metrics is not None:
+            self.metrics.mark_concurrency_in_use(self.name, self._in_use)
+
+
+def _resolve(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def create_rate_limiter(settings: Settings, metrics: Metrics, name: str) -> TokenBucket:
+    return TokenBucket(
+        name=name,
+        rate_per_second=settings.rate_limit_per_second,
+        burst=settings.rate_limit_burst,
+        metrics=metrics,
+    )
+
+
+def create_concurrency_limiter(
+    settings: Settings,
+    metrics: Metrics,
+    name: str,
+) -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(name=name, limit=settings.concurrency_limit, metrics=metrics)
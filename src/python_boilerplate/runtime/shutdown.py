@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Condition, Thread
+from time import monotonic
+from typing import Protocol
+
+
+class StopSignal(Protocol):
+    def set(self) -> None: ...
+
+    def is_set(self) -> bool: ...
+
+
+@dataclass(slots=True)
+class ShutdownCoordinator:
+    """Track in-flight iterations and bound the whole shutdown by one deadline.
+
+    ``request_stop`` is safe to call from a signal handler: it only starts the deadline
+    and sets ``stop_event``. From then on ``admit`` rejects new iterations, and
+    ``wait_for_drain`` waits for the admitted ones until the deadline passes.
+    """
+
+    stop_event: StopSignal
+    timeout_seconds: float
+    clock: Callable[[], float] = monotonic
+    _in_flight: int = field(default=0, init=False)
+    _deadline: float | None = field(default=None, init=False)
+    _condition: Condition = field(default_factory=Condition, init=False)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def request_stop(self) -> None:
+        if self._deadline is None:
+            self._deadline = self.clock() + max(0.0, self.timeout_seconds)
+        self.stop_event.set()
+
+    def remaining_seconds(self) -> float:
+        if self._deadline is None:
+            return max(0.0, self.timeout_seconds)
+        return max(0.0, self._deadline - self.clock())
+
+    @contextmanager
+    def admit(self) -> Iterator[bool]:
+        with self._condition:
+            admitted = not self.stop_event.is_set()
+            if admitted:
+                self._in_flight += 1
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def wait_for_drain(self) -> bool:
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._in_flight == 0,
+                timeout=self.remaining_seconds(),
+            )
+
+
+def run_with_deadline(tasks: dict[str, Callable[[], None]], timeout_seconds: float) -> list[str]:
+    """Run ``tasks`` in parallel and return the names that failed or missed the deadline."""
+    completed: set[str] = set()
+
+    def run_task(name: str, task: Callable[[], None]) -> None:
+        try:
+            task()
+        except Exception:
+            return
+        completed.add(name)
+
+    threads = [
+        Thread(target=run_task, args=(name, task), name=f"shutdown-{name}", daemon=True)
+        for name, task in tasks.items()
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = monotonic() + max(0.0, timeout_seconds)
+    for thread in threads:
+        thread.join(timeout=max(0.0, deadline - monotonic()))
+    return [name for name in tasks if name not in completed]
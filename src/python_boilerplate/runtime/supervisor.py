@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import monotonic, sleep
+from types import FrameType
+from typing import NoReturn
+from wsgiref.simple_server import WSGIServer
+
+from structlog.stdlib import BoundLogger
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.logging import configure_logging, get_logger
+from python_boilerplate.observability.metrics import (
+    bind_multiprocess_metrics_server,
+    mark_process_dead,
+    multiprocess_metrics,
+)
+
+_FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+_RESTART_POLL_SECONDS = 0.05
+
+
+@dataclass(slots=True)
+class ProcessSupervisor:
+    """Fork ``processes`` workers and restart the ones that crash.
+
+    A slot that crashes again within ``stable_uptime_seconds`` of its start waits twice as
+    long before the next restart, up to ``max_restart_delay_seconds``. Children that exit
+    with ``0`` are done and their slot is not restarted; the supervisor returns once no
+    child is left.
+    """
+
+    settings: Settings
+    processes: int
+    target: Callable[[], int]
+    logger: BoundLogger
+    restart_delay_seconds: float = 1.0
+    max_restart_delay_seconds: float = 60.0
+    stable_uptime_seconds: float = 30.0
+    clock: Callable[[], float] = monotonic
+    children: dict[int, int] = field(default_factory=dict)
+    stopping: bool = False
+    _started_at: dict[int, float] = field(default_factory=dict, init=False)
+    _crashes: dict[int, int] = field(default_factory=dict, init=False)
+    _restarts_due: dict[int, float] = field(default_factory=dict, init=False)
+
+    def run(self, metrics_directory: str) -> int:
+        previous_handlers = {signum: signal.getsignal(signum) for signum in _FORWARDED_SIGNALS}
+        for signum in _FORWARDED_SIGNALS:
+            signal.signal(signum, self._handle_signal)
+        self.logger.info("startup_success", worker_processes=self.processes)
+        exit_code = 0
+        try:
+            for slot in range(self.processes):
+                self._spawn(slot)
+            while self.children or self._restarts_due:
+                if self.stopping:
+                    self._restarts_due.clear()
+                self._spawn_due_restarts()
+                reaped = self._wait()
+                if reaped is None:
+                    continue
+                pid, status = reaped
+                if pid not in self.children:
+                    continue
+                slot = self.children.pop(pid)
+                mark_process_dead(pid, metrics_directory)
+                child_exit_code = os.waitstatus_to_exitcode(status)
+                self.logger.info(
+                    "worker_process_exited",
+                    pid=pid,
+                    slot=slot,
+                    exit_code=child_exit_code,
+                )
+                if self.stopping:
+                    if child_exit_code != 0:
+                        exit_code = 1
+                    continue
+                if child_exit_code != 0:
+                    self._schedule_restart(slot)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        self.logger.info("shutdown_complete")
+        return exit_code
+
+    def _handle_signal(self, signum: int, _frame: FrameType | None) -> None:
+        reason = "sigterm" if signum == signal.SIGTERM else "sigint"
+        if not self.stopping:
+            self.logger.info("shutting_down", reason=reason, worker_processes=len(self.children))
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+
+    def _wait(self) -> tuple[int, int] | None:
+        """Reap one child; while restarts are pending, return ``None`` instead of blocking."""
+        if not self._restarts_due:
+            return os.wait()
+        if self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid != 0:
+                return pid, status
+        next_due = min(self._restarts_due.values())
+        sleep(max(0.0, min(_RESTART_POLL_SECONDS, next_due - self.clock())))
+        return None
+
+    def _schedule_restart(self, slot: int) -> None:
+        uptime = self.clock() - self._started_at.get(slot, self.clock())
+        if uptime >= self.stable_uptime_seconds:
+            crashes = 1
+        else:
+            crashes = self._crashes.get(slot, 0) + 1
+        self._crashes[slot] = crashes
+        delay = min(
+            self.max_restart_delay_seconds,
+            self.restart_delay_seconds * 2 ** (crashes - 1),
+        )
+        self._restarts_due[slot] = self.clock() + delay
+        self.logger.info(
+            "worker_process_restart_scheduled",
+            slot=slot,
+            crashes=crashes,
+            delay_seconds=delay,
+        )
+
+    def _spawn_due_restarts(self) -> None:
+        now = self.clock()
+        for slot, due in list(self._restarts_due.items()):
+            if due <= now:
+                del self._restarts_due[slot]
+                self._spawn(slot)
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_child()
+        self.children[pid] = slot
+        self._started_at[slot] = self.clock()
+        self.logger.info("worker_process_started", pid=pid, slot=slot)
+
+    def _run_child(self) -> NoReturn:
+        # The child inherits the supervisor's handlers; drop them before the worker
+        # installs its own so an early signal cannot be forwarded to sibling processes.
+        for signum in _FORWARDED_SIGNALS:
+            signal.signal(signum, signal.SIG_DFL)
+        exit_code = 1
+        try:
+            exit_code = self.target()
+        except BaseException:
+            self.logger.exception("worker_process_failed", pid=os.getpid())
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(exit_code)
+
+
+def _fork_metrics_server(server: WSGIServer, logger: BoundLogger) -> int:
+    """Serve the aggregated metrics from a child process.
+
+    The supervisor itself stays single-threaded, so forking workers never copies a running
+    server thread or a lock it holds.
+    """
+    pid = os.fork()
+    if pid != 0:
+        server.server_close()
+        logger.info("metrics_process_started", pid=pid)
+        return pid
+    # SIGINT from the terminal reaches the whole process group; the supervisor stops this
+    # process with SIGTERM once the workers are gone.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    exit_code = 0
+    try:
+        server.serve_forever()
+    except BaseException:
+        logger.exception("metrics_process_failed", pid=os.getpid())
+        exit_code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    os._exit(exit_code)
+
+
+def _stop_metrics_server(pid: int) -> None:
+    with suppress(ProcessLookupError):
+        os.kill(pid, signal.SIGTERM)
+    # The supervisor loop may already have reaped it if it died early.
+    with suppress(ChildProcessError):
+        os.waitpid(pid, 0)
+
+
+def run_supervisor(settings: Settings, processes: int, target: Callable[[], int]) -> int:
+    configure_logging(settings)
+    logger = get_logger(settings, "python_boilerplate.supervisor")
+    configured_directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if configured_directory:
+        metrics_directory = configured_directory
+        Path(metrics_directory).mkdir(parents=True, exist_ok=True)
+        for stale_file in Path(metrics_directory).glob("*.db"):
+            stale_file.unlink()
+    else:
+        metrics_directory = tempfile.mkdtemp(prefix="prometheus-multiproc-")
+    supervisor = ProcessSupervisor(
+        settings=settings,
+        processes=processes,
+        target=target,
+        logger=logger,
+    )
+    try:
+        with multiprocess_metrics(metrics_directory):
+            # Bind here so a taken port still fails the start, then serve from a child.
+            server = bind_multiprocess_metrics_server(settings, metrics_directory)
+            server_pid = None if server is None else _fork_metrics_server(server, logger)
+            try:
+                return supervisor.run(metrics_directory)
+            finally:
+                if server_pid is not None:
+                    _stop_metrics_server(server_pid)
+    finally:
+        if not configured_directory:
+            shutil.rmtree(metrics_directory, ignore_errors=True)
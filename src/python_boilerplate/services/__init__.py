@@ -1,3 +1,25 @@
+from .async_worker import AsyncWorkerService
+from .pipeline import Pipeline, PipelineStage, create_pipeline
+from .queue_worker import QueueWorkerService
+from .work_queue import (
+    InMemoryWorkQueue,
+    SqliteWorkQueue,
+    WorkItem,
+    WorkQueue,
+    create_work_queue,
+)
 from .worker import WorkerService
 
-__all__ = ["WorkerService"]
+__all__ = [
+    "AsyncWorkerService",
+    "InMemoryWorkQueue",
+    "Pipeline",
+    "PipelineStage",
+    "QueueWorkerService",
+    "SqliteWorkQueue",
+    "WorkItem",
+    "WorkQueue",
+    "WorkerService",
+    "create_pipeline",
+    "create_work_queue",
+]
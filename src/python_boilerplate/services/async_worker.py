@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import signal
+from contextlib import suppress
+from dataclasses import dataclass, field
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability import ObservabilityRuntime
+from python_boilerplate.observability.errors import report_exception
+from python_boilerplate.observability.iteration import IterationInstrumentation
+from python_boilerplate.runtime.shutdown import ShutdownCoordinator
+from python_boilerplate.services.scheduling import (
+    IterationBudget,
+    LoopSchedule,
+    build_loop_schedule,
+)
+
+
+@dataclass(slots=True)
+class AsyncWorkerService:
+    settings: Settings
+    runtime: ObservabilityRuntime
+    stop_event: asyncio.Event = field(default_factory=asyncio.Event)
+    shutdown_coordinator: ShutdownCoordinator = field(init=False)
+    instrumentation: IterationInstrumentation = field(init=False)
+    budget: IterationBudget = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.shutdown_coordinator = ShutdownCoordinator(
+            stop_event=self.stop_event,
+            timeout_seconds=self.settings.shutdown_timeout_seconds,
+        )
+        self.instrumentation = IterationInstrumentation(self.settings, self.runtime)
+        self.budget = IterationBudget(self.settings.max_iterations)
+
+    def install_signal_handlers(self, loop: asyncio.AbstractEventLoop) -> None:
+        loop.add_signal_handler(signal.SIGINT, self._handle_signal, signal.SIGINT)
+        loop.add_signal_handler(signal.SIGTERM, self._handle_signal, signal.SIGTERM)
+
+    def _handle_signal(self, signum: int) -> None:
+        reason = "sigterm" if signum == signal.SIGTERM else "sigint"
+        self.runtime.logger.info("shutting_down", reason=reason)
+        self.shutdown_coordinator.request_stop()
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, self.settings.worker_concurrency)
+
+    def run(self) -> int:
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> int:
+        self.install_signal_handlers(asyncio.get_running_loop())
+        self.runtime.logger.info(
+            "startup_success",
+            config_source="environment",
+            metrics_enabled=self.settings.metrics_enabled,
+            traces_enabled=self.settings.traces_enabled,
+            sentry_enabled=bool(self.settings.sentry_dsn),
+            worker_concurrency=self.concurrency,
+        )
+        exit_code = 0
+        try:
+            await self._run_lanes()
+        except Exception as exc:
+            report_exception(exc)
+            self.runtime.logger.exception(
+                "crashed",
+                error=str(exc),
+                exception_type=type(exc).__name__,
+            )
+            exit_code = 1
+        finally:
+            self.shutdown_coordinator.request_stop()
+            self.runtime.metrics.mark_shutdown()
+            self.runtime.shutdown(self.shutdown_coordinator.remaining_seconds())
+        self.runtime.logger.info("shutdown_complete")
+        return exit_code
+
+    async def _run_lanes(self) -> None:
+        # Lanes mirror the threaded worker: a failing lane stops the others after their
+        # current iteration, and lanes still running at the shutdown deadline are cancelled.
+        schedule = build_loop_schedule(self.settings, self.runtime.metrics)
+        lanes = [asyncio.create_task(self._run_lane(schedule)) for _ in range(self.concurrency)]
+        await self.stop_event.wait()
+        self.shutdown_coordinator.request_stop()
+        _done, pending = await asyncio.wait(
+            lanes, timeout=self.shutdown_coordinator.remaining_seconds()
+        )
+        if pending:
+            self.runtime.logger.warning(
+                "shutdown_deadline_exceeded",
+                in_flight=self.shutdown_coordinator.in_flight,
+                timeout_seconds=self.settings.shutdown_timeout_seconds,
+            )
+            for lane in pending:
+                lane.cancel()
+            await asyncio.wait(pending)
+        for lane in lanes:
+            if not lane.cancelled() and (exc := lane.exception()) is not None:
+                raise exc
+
+    async def _run_lane(self, schedule: LoopSchedule) -> None:
+        try:
+            await self._run_loop(schedule)
+        except Exception:
+            self.shutdown_coordinator.request_stop()
+            raise
+
+    async def _run_loop(self, schedule: LoopSchedule) -> None:
+        await self._wait_for_stop(schedule.start_delay())
+        while not self.stop_event.is_set() and self.budget.claim():
+            schedule.tick_started()
+            with self.shutdown_coordinator.admit() as admitted:
+                if not admitted:
+                    return
+                self.runtime.metrics.mark_iteration_started()
+                try:
+                    found_work = await self.run_iteration()
+                finally:
+                    self.runtime.metrics.mark_iteration_finished()
+            if self.budget.complete():
+                self._stop_after_budget()
+                return
+            await self._wait_for_stop(schedule.next_delay(found_work))
+
+    def _stop_after_budget(self) -> None:
+        self.runtime.logger.info("iteration_limit_reached", iterations=self.budget.limit)
+        self.shutdown_coordinator.request_stop()
+
+    async def _wait_for_stop(self, timeout_seconds: float) -> None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(self.stop_event.wait(), timeout=timeout_seconds)
+
+    async def run_iteration(self) -> bool | None:
+        # OpenTelemetry keeps the current span in a contextvar, so the span stays scoped
+        # to this task even while other lanes run on the same event loop.
+        with self.instrumentation.iteration() as iteration:
+            if self.stop_event.is_set():
+                iteration.skipped()
+                return None
+            iteration.started()
+            found_work = await self.execute_iteration(self.stop_event)
+            iteration.succeeded()
+            return found_work
+
+    async def execute_iteration(self, stop_event: asyncio.Event) -> bool | None:
+        await asyncio.sleep(0)
+        return None
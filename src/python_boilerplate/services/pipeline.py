@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from time import perf_counter
+from typing import Any
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+BatchSource = Callable[[int], Iterable[Sequence[Any]]]
+BatchSink = Callable[[Sequence[Any]], None]
+
+
+@dataclass(slots=True, frozen=True)
+class PipelineStage:
+    name: str
+    transform: Callable[[Iterable[Any]], Iterable[Any]]
+
+
+@dataclass(slots=True)
+class Pipeline:
+    """Move batches from a source through generator stages into a sink.
+
+    Every stage runs in its own thread and hands batches to the next stage through a
+    bounded queue, so a slow sink throttles the source instead of buffering without limit.
+    ``run`` drains the source once and is meant to be called from ``execute_iteration``.
+    It starts one thread per stage plus one for the source on every call, which costs well
+    under a millisecond; keep batches large enough that this stays negligible.
+    """
+
+    name: str
+    source: BatchSource
+    sink: BatchSink
+    metrics: Metrics
+    stages: Sequence[PipelineStage] = ()
+    batch_size: int = 100
+    queue_size: int = 4
+
+    def run(self, stop_event: Event) -> int:
+        state = _RunState()
+        queues: list[Queue[Any]] = [
+            Queue(maxsize=max(1, self.queue_size)) for _ in range(len(self.stages) + 1)
+        ]
+        threads = [
+            Thread(
+                target=self._produce,
+                args=(queues[0], stop_event, state),
+                name=f"pipeline-{self.name}-source",
+                daemon=True,
+            )
+        ]
+        for index, stage in enumerate(self.stages):
+            threads.append(
+                Thread(
+                    target=self._transform,
+                    args=(stage, queues[index], queues[index + 1], state),
+                    name=f"pipeline-{self.name}-{stage.name}",
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+        try:
+            delivered = self._consume(queues[-1], state)
+        except BaseException as exc:
+            state.fail(exc)
+            delivered = 0
+        for thread in threads:
+            thread.join()
+        if state.errors:
+            raise state.errors[0]
+        return delivered
+
+    def _produce(self, output: Queue[Any], stop_event: Event, state: _RunState) -> None:
+        try:
+            batches = iter(self.source(max(1, self.batch_size)))
+            while not stop_event.is_set() and not state.abort.is_set():
+                started_at = perf_counter()
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                self.metrics.mark_pipeline_batch(
+                    self.name, "source", len(batch), perf_counter() - started_at
+                )
+                if batch and not self._put(output, batch, state):
+                    return
+        except BaseException as exc:
+            state.fail(exc)
+            return
+        self._put(output, _END, state)
+
+    def _transform(
+        self,
+        stage: PipelineStage,
+        source: Queue[Any],
+        output: Queue[Any],
+        state: _RunState,
+    ) -> None:
+        try:
+            while True:
+                batch = self._get(source, stage.name, state)
+                if batch is _END:
+                    break
+                started_at = perf_counter()
+                transformed = list(stage.transform(batch))
+                self.metrics.mark_pipeline_batch(
+                    self.name, stage.name, len(transformed), perf_counter() - started_at
+                )
+                if transformed and not self._put(output, transformed, state):
+                    return
+        except BaseException as exc:
+            state.fail(exc)
+            return
+        self._put(output, _END, state)
+
+    def _consume(self, source: Queue[Any], state: _RunState) -> int:
+        delivered = 0
+        while True:
+            batch = self._get(source, "sink", state)
+            if batch is _END:
+                return delivered
+            started_at = perf_counter()
+            self.sink(batch)
+            self.metrics.mark_pipeline_batch(
+                self.name, "sink", len(batch), perf_counter() - started_at
+            )
+            delivered += len(batch)
+
+    def _get(self, source: Queue[Any], stage: str, state: _RunState) -> Any:
+        self.metrics.mark_pipeline_queue_depth(self.name, stage, source.qsize())
+        while not state.abort.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except Empty:
+                continue
+        return _END
+
+    def _put(self, output: Queue[Any], batch: Any, state: _RunState) -> bool:
+        while not state.abort.is_set():
+            try:
+                output.put(batch, timeout=_POLL_SECONDS)
+            except Full:
+                continue
+            return True
+        return False
+
+
+@dataclass(slots=True)
+class _RunState:
+    abort: Event = field(default_factory=Event)
+    errors: list[BaseException] = field(default_factory=list)
+
+    def fail(self, exc: BaseException) -> None:
+        self.errors.append(exc)
+        self.abort.set()
+
+
+def create_pipeline(
+    settings: Settings,
+    metrics: Metrics,
+    name: str,
+    source: BatchSource,
+    sink: BatchSink,
+    stages: Sequence[PipelineStage] = (),
+) -> Pipeline:
+    return Pipeline(
+        name=name,
+        source=source,
+        sink=sink,
+        metrics=metrics,
+        stages=stages,
+        batch_size=settings.pipeline_batch_size,
+        queue_size=settings.pipeline_queue_size,
+    )
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from threading import Event
+from time import monotonic
+
+from python_boilerplate.services.work_queue import InMemoryWorkQueue, WorkItem, WorkQueue
+from python_boilerplate.services.worker import WorkerService
+
+
+@dataclass(slots=True)
+class QueueWorkerService(WorkerService):
+    """Worker that drains a ``WorkQueue`` in batches.
+
+    Each iteration leases up to ``APP_QUEUE_BATCH_SIZE`` items, hands them to
+    ``process_items`` and acknowledges the whole batch in one transaction. If processing
+    raises, nothing is acknowledged and the items are redelivered after the visibility
+    timeout.
+
+    ``queue_depth`` is refreshed at most once per ``depth_sample_seconds``, because
+    ``size()`` counts the whole table on ``SqliteWorkQueue``.
+    """
+
+    work_queue: WorkQueue = field(default_factory=InMemoryWorkQueue)
+    depth_sample_seconds: float = 5.0
+    _depth_sampled_at: float | None = field(default=None, init=False)
+
+    def run(self) -> int:
+        try:
+            return WorkerService.run(self)
+        finally:
+            self.work_queue.close()
+
+    def execute_iteration(self, stop_event: Event) -> bool | None:
+        items = self.work_queue.dequeue(max(1, self.settings.queue_batch_size))
+        self.runtime.metrics.mark_queue_dequeued(
+            items=len(items),
+            redelivered=sum(1 for item in items if item.redelivered),
+            depth=self._sample_depth(),
+        )
+        if not items:
+            return False
+        self.process_items(items, stop_event)
+        self.runtime.metrics.mark_queue_acked(self.work_queue.ack(items))
+        return True
+
+    def _sample_depth(self) -> int | None:
+        now = monotonic()
+        sampled_at = self._depth_sampled_at
+        if sampled_at is not None and now - sampled_at < self.depth_sample_seconds:
+            return None
+        self._depth_sampled_at = now
+        return self.work_queue.size()
+
+    def process_items(self, items: Sequence[WorkItem], stop_event: Event) -> None:
+        return None
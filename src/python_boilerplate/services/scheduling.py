@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Protocol
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+
+
+class LoopSchedule(Protocol):
+    """Decide when the next iteration of a lane starts.
+
+    One schedule is shared by all lanes of a worker, so implementations must be safe to call
+    from several threads or tasks. ``start_delay`` is called once per lane before its first
+    iteration.
+    """
+
+    def start_delay(self) -> float: ...
+
+    def tick_started(self) -> None: ...
+
+    def next_delay(self, found_work: bool | None) -> float: ...
+
+
+@dataclass(slots=True)
+class FixedDelaySchedule:
+    interval_seconds: float
+
+    def start_delay(self) -> float:
+        return 0.0
+
+    def tick_started(self) -> None:
+        return None
+
+    def next_delay(self, found_work: bool | None) -> float:
+        return self.interval_seconds
+
+
+def _lane_tick() -> ContextVar[float | None]:
+    return ContextVar("lane_tick", default=None)
+
+
+@dataclass(slots=True)
+class FixedRateSchedule:
+    """Start iterations on a fixed grid of monotonic ticks.
+
+    All lanes share one grid: each lane claims the next free tick before it waits, so the
+    worker starts one iteration per tick however many lanes it runs. When the next free tick
+    has already passed, ``overrun_policy`` decides what happens to the passed ticks: ``skip``
+    drops them and waits for the next tick on the grid, ``catch_up`` runs every missed tick
+    back-to-back, and ``coalesce`` runs once immediately for all of them.
+    """
+
+    interval_seconds: float
+    overrun_policy: str
+    metrics: Metrics
+    clock: Callable[[], float] = monotonic
+    _next_tick: float | None = field(default=None, init=False)
+    _lane_tick: ContextVar[float | None] = field(default_factory=_lane_tick, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def start_delay(self) -> float:
+        return self._claim(self.clock())
+
+    def tick_started(self) -> None:
+        now = self.clock()
+        tick = self._lane_tick.get()
+        if tick is None:
+            self._claim(now)
+            tick = now
+        self.metrics.mark_schedule_lag(max(0.0, now - tick))
+
+    def next_delay(self, found_work: bool | None) -> float:
+        return self._claim(self.clock())
+
+    def _claim(self, now: float) -> float:
+        with self._lock:
+            tick = now if self._next_tick is None else self._next_tick
+            missed = 0
+            if self.interval_seconds <= 0:
+                tick = max(tick, now)
+            elif now > tick:
+                overdue_ticks = int((now - tick) // self.interval_seconds)
+                if self.overrun_policy == "coalesce":
+                    tick += overdue_ticks * self.interval_seconds
+                    missed = overdue_ticks
+                elif self.overrun_policy != "catch_up":
+                    missed = math.ceil((now - tick) / self.interval_seconds)
+                    tick += missed * self.interval_seconds
+            self._next_tick = tick + max(self.interval_seconds, 0.0)
+        self._lane_tick.set(tick)
+        if missed:
+            self.metrics.mark_missed_ticks(missed)
+        return max(0.0, tick - now)
+
+
+@dataclass(slots=True)
+class AdaptiveSchedule:
+    """Poll immediately while iterations find work and back off exponentially while idle.
+
+    Iterations that do not report a result (``None``) reset the schedule to the base
+    interval, so services that never return a value behave like fixed-delay loops. Lanes
+    share the backoff: work found by any lane resets it, and every idle iteration grows it.
+    """
+
+    interval_seconds: float
+    max_interval_seconds: float
+    backoff_factor: float
+    metrics: Metrics
+    _idle_interval: float | None = field(default=None, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def start_delay(self) -> float:
+        return 0.0
+
+    def tick_started(self) -> None:
+        return None
+
+    def next_delay(self, found_work: bool | None) -> float:
+        with self._lock:
+            if found_work:
+                self._idle_interval = None
+                delay = 0.0
+            elif found_work is None:
+                self._idle_interval = None
+                delay = self.interval_seconds
+            else:
+                delay = (
+                    self.interval_seconds if self._idle_interval is None else self._idle_interval
+                )
+                self._idle_interval = min(
+                    max(delay * self.backoff_factor, self.interval_seconds),
+                    max(self.max_interval_seconds, self.interval_seconds),
+                )
+            self.metrics.mark_loop_interval(delay)
+        return delay
+
+
+@dataclass(slots=True)
+class IterationBudget:
+    """Share a limit of ``limit`` iterations between all lanes; ``0`` means unlimited.
+
+    Lanes claim an iteration before running it, so concurrent lanes never start more than
+    ``limit`` in total. ``complete`` returns ``True`` once the last claimed iteration finished.
+    """
+
+    limit: int = 0
+    _claimed: int = field(default=0, init=False)
+    _completed: int = field(default=0, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def claim(self) -> bool:
+        if self.limit <= 0:
+            return True
+        with self._lock:
+            if self._claimed >= self.limit:
+                return False
+            self._claimed += 1
+            return True
+
+    def complete(self) -> bool:
+        if self.limit <= 0:
+            return False
+        with self._lock:
+            self._completed += 1
+            return self._completed >= self.limit
+
+
+def build_loop_schedule(settings: Settings, metrics: Metrics) -> LoopSchedule:
+    if settings.loop_schedule == "fixed_rate":
+        return FixedRateSchedule(
+            interval_seconds=settings.loop_interval_seconds,
+            overrun_policy=settings.loop_overrun_policy,
+            metrics=metrics,
+        )
+    if settings.loop_schedule == "adaptive":
+        return AdaptiveSchedule(
+            interval_seconds=settings.loop_interval_seconds,
+            max_interval_seconds=settings.loop_max_interval_seconds,
+            backoff_factor=settings.loop_backoff_factor,
+            metrics=metrics,
+        )
+    return FixedDelaySchedule(interval_seconds=settings.loop_interval_seconds)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import heapq
+import sqlite3
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Protocol
+
+from python_boilerplate.config import Settings
+
+
+@dataclass(slots=True, frozen=True)
+class WorkItem:
+    id: int
+    payload: str
+    deliveries: int
+
+    @property
+    def redelivered(self) -> bool:
+        return self.deliveries > 1
+
+
+class WorkQueue(Protocol):
+    def enqueue(self, payloads: Iterable[str]) -> int: ...
+
+    def dequeue(self, max_items: int) -> list[WorkItem]: ...
+
+    def ack(self, items: Iterable[WorkItem]) -> int: ...
+
+    def release(self, items: Iterable[WorkItem]) -> int: ...
+
+    def size(self) -> int: ...
+
+    def close(self) -> None: ...
+
+
+@dataclass(slots=True)
+class _Entry:
+    payload: str
+    visible_at: float
+    deliveries: int = 0
+
+
+@dataclass(slots=True)
+class InMemoryWorkQueue:
+    """Process-local queue with the same lease semantics as ``SqliteWorkQueue``.
+
+    Dequeued items stay invisible for ``visibility_timeout_seconds``. Items that are not
+    acknowledged in time become visible again and are redelivered with a higher
+    ``deliveries`` count.
+
+    ``dequeue`` takes the lowest visible ids from a heap instead of scanning every entry;
+    leased items wait in a second heap ordered by ``visible_at`` until their lease expires.
+    Heap records of acknowledged or released items stay in place and are skipped later.
+    """
+
+    visibility_timeout_seconds: float = 30.0
+    clock: Callable[[], float] = time
+    _entries: dict[int, _Entry] = field(default_factory=dict, init=False)
+    _visible: list[int] = field(default_factory=list, init=False)
+    _leased: list[tuple[float, int]] = field(default_factory=list, init=False)
+    _next_id: int = field(default=1, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def enqueue(self, payloads: Iterable[str]) -> int:
+        now = self.clock()
+        with self._lock:
+            added = 0
+            for payload in payloads:
+                self._entries[self._next_id] = _Entry(payload=payload, visible_at=now)
+                heapq.heappush(self._visible, self._next_id)
+                self._next_id += 1
+                added += 1
+            return added
+
+    def dequeue(self, max_items: int) -> list[WorkItem]:
+        now = self.clock()
+        leased: list[WorkItem] = []
+        with self._lock:
+            while self._leased and self._leased[0][0] <= now:
+                visible_at, item_id = heapq.heappop(self._leased)
+                entry = self._entries.get(item_id)
+                if entry is not None and entry.visible_at == visible_at:
+                    heapq.heappush(self._visible, item_id)
+            while self._visible and len(leased) < max_items:
+                item_id = heapq.heappop(self._visible)
+                entry = self._entries.get(item_id)
+                if entry is None or entry.visible_at > now:
+                    continue
+                entry.visible_at = now + self.visibility_timeout_seconds
+                entry.deliveries += 1
+                heapq.heappush(self._leased, (entry.visible_at, item_id))
+                leased.append(WorkItem(item_id, entry.payload, entry.deliveries))
+        return leased
+
+    def ack(self, items: Iterable[WorkItem]) -> int:
+        with self._lock:
+            removed = 0
+            for item in items:
+                entry = self._entries.get(item.id)
+                if entry is not None and entry.deliveries == item.deliveries:
+                    del self._entries[item.id]
+                    removed += 1
+            return removed
+
+    def release(self, items: Iterable[WorkItem]) -> int:
+        now = self.clock()
+        with self._lock:
+            released = 0
+            for item in items:
+                entry = self._entries.get(item.id)
+                if entry is not None and entry.deliveries == item.deliveries:
+                    entry.visible_at = now
+                    heapq.heappush(self._visible, item.id)
+                    released += 1
+            return released
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def close(self) -> None:
+        return None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    deliveries INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS work_items_visible_at ON work_items (visible_at, id);
+"""
+
+
+@dataclass(slots=True)
+class SqliteWorkQueue:
+    """Durable queue stored in a SQLite database in WAL mode.
+
+    Batched operations run in a single transaction, so draining hundreds of items costs
+    one commit instead of one per item. The database can be shared by several processes;
+    ``BEGIN IMMEDIATE`` serializes concurrent leases.
+    """
+
+    path: str
+    visibility_timeout_seconds: float = 30.0
+    clock: Callable[[], float] = time
+    _connection: sqlite3.Connection = field(init=False)
+    _lock: Lock = field(default_factory=Lock, init=False)
+
+    def __post_init__(self) -> None:
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def enqueue(self, payloads: Iterable[str]) -> int:
+        now = self.clock()
+        rows = [(payload, now, now) for payload in payloads]
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT INTO work_items (payload, enqueued_at, visible_at) VALUES (?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def dequeue(self, max_items: int) -> list[WorkItem]:
+        now = self.clock()
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, payload, deliveries FROM work_items "
+                "WHERE visible_at <= ? ORDER BY id LIMIT ?",
+                (now, max_items),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE work_items SET visible_at = ?, deliveries = deliveries + 1 WHERE id = ?",
+                [(now + self.visibility_timeout_seconds, row[0]) for row in rows],
+            )
+        return [WorkItem(row[0], row[1], row[2] + 1) for row in rows]
+
+    def ack(self, items: Iterable[WorkItem]) -> int:
+        with self._transaction() as connection:
+            cursor = connection.executemany(
+                "DELETE FROM work_items WHERE id = ? AND deliveries = ?",
+                [(item.id, item.deliveries) for item in items],
+            )
+        return cursor.rowcount
+
+    def release(self, items: Iterable[WorkItem]) -> int:
+        now = self.clock()
+        with self._transaction() as connection:
+            cursor = connection.executemany(
+                "UPDATE work_items SET visible_at = ? WHERE id = ? AND deliveries = ?",
+                [(now, item.id, item.deliveries) for item in items],
+            )
+        return cursor.rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            row = self._connection.execute("SELECT COUNT(*) FROM work_items").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+
+def create_work_queue(settings: Settings) -> WorkQueue:
+    if settings.queue_path:
+        return SqliteWorkQueue(
+            path=settings.queue_path,
+            visibility_timeout_seconds=settings.queue_visibility_timeout_seconds,
+        )
+    return InMemoryWorkQueue(visibility_timeout_seconds=settings.queue_visibility_timeout_seconds)
@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import signal
 from dataclasses import dataclass, field
-from threading import Event
-from uuid import uuid4
+from threading import Event, Thread
 
 from python_boilerplate.config import Settings
 from python_boilerplate.observability import ObservabilityRuntime
 from python_boilerplate.observability.errors import report_exception
-from python_boilerplate.observability.metrics import start_iteration
-from python_boilerplate.observability.tracing import root_span
+from python_boilerplate.observability.iteration import IterationInstrumentation
+from python_boilerplate.runtime.shutdown import ShutdownCoordinator
+from python_boilerplate.services.scheduling import (
+    IterationBudget,
+    LoopSchedule,
+    build_loop_schedule,
+)
 
 
 @dataclass(slots=True)
@@ -17,6 +21,17 @@ class WorkerService:
     settings: Settings
     runtime: ObservabilityRuntime
     stop_event: Event = field(default_factory=Event)
+    shutdown_coordinator: ShutdownCoordinator = field(init=False)
+    instrumentation: IterationInstrumentation = field(init=False)
+    budget: IterationBudget = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.shutdown_coordinator = ShutdownCoordinator(
+            stop_event=self.stop_event,
+            timeout_seconds=self.settings.shutdown_timeout_seconds,
+        )
+        self.instrumentation = IterationInstrumentation(self.settings, self.runtime)
+        self.budget = IterationBudget(self.settings.max_iterations)
 
     def install_signal_handlers(self) -> None:
         signal.signal(signal.SIGINT, self._handle_signal)
@@ -25,7 +40,7 @@ class WorkerService:
     def _handle_signal(self, signum: int, _frame: object) -> None:
         reason = "sigterm" if signum == signal.SIGTERM else "sigint"
         self.runtime.logger.info("shutting_down", reason=reason)
-        self.stop_event.set()
+        self.shutdown_coordinator.request_stop()
 
     def run(self) -> int:
         self.install_signal_handlers()
@@ -35,12 +50,11 @@ class WorkerService:
             metrics_enabled=self.settings.metrics_enabled,
             traces_enabled=self.settings.traces_enabled,
             sentry_enabled=bool(self.settings.sentry_dsn),
+            worker_concurrency=self.concurrency,
         )
         exit_code = 0
         try:
-            while not self.stop_event.is_set():
-                self.run_iteration()
-                self.stop_event.wait(self.settings.loop_interval_seconds)
+            self._run_lanes()
         except Exception as exc:
             report_exception(exc)
             self.runtime.logger.exception(
@@ -50,38 +64,83 @@ class WorkerService:
             )
             exit_code = 1
         finally:
+            self.shutdown_coordinator.request_stop()
             self.runtime.metrics.mark_shutdown()
-            self.runtime.shutdown()
+            self.runtime.shutdown(self.shutdown_coordinator.remaining_seconds())
         self.runtime.logger.info("shutdown_complete")
         return exit_code
 
-    def run_iteration(self) -> None:
-        timer = start_iteration(self.runtime.metrics)
-        run_id = str(uuid4())
-        iteration_logger = self.runtime.logger.bind(job_name="service_iteration", request_id=run_id)
+    @property
+    def concurrency(self) -> int:
+        return max(1, self.settings.worker_concurrency)
+
+    def _run_lanes(self) -> None:
+        # Iterations run in daemon lane threads so the main thread stays free for signal
+        # handlers and can give up on lanes that outlive the shutdown deadline.
+        failures: list[Exception] = []
+        schedule = build_loop_schedule(self.settings, self.runtime.metrics)
+        lanes = [
+            Thread(
+                target=self._run_lane,
+                args=(schedule, failures),
+                name=f"worker-iteration-{index}",
+                daemon=True,
+            )
+            for index in range(self.concurrency)
+        ]
+        for lane in lanes:
+            lane.start()
+        self.stop_event.wait()
+        self.shutdown_coordinator.request_stop()
+        if not self.shutdown_coordinator.wait_for_drain():
+            self.runtime.logger.warning(
+                "shutdown_deadline_exceeded",
+                in_flight=self.shutdown_coordinator.in_flight,
+                timeout_seconds=self.settings.shutdown_timeout_seconds,
+            )
+        for lane in lanes:
+            lane.join(timeout=self.shutdown_coordinator.remaining_seconds())
+        if failures:
+            raise failures[0]
+
+    def _run_lane(self, schedule: LoopSchedule, failures: list[Exception]) -> None:
         try:
-            with root_span(
-                self.runtime.tracer,
-                "service.iteration",
-                job_name="service_iteration",
-                request_id=run_id,
-            ):
-                if self.stop_event.is_set():
-                    iteration_logger.info("iteration_skipped", outcome="shutdown_requested")
-                    return
-                iteration_logger.info("iteration_started")
-                self.execute_iteration(self.stop_event)
-                timer.observe_success()
-                iteration_logger.info("iteration_completed", outcome="success")
+            self._run_loop(schedule)
         except Exception as exc:
-            timer.observe_failure()
-            iteration_logger.warning(
-                "iteration_failed",
-                outcome="failure",
-                error=str(exc),
-                exception_type=type(exc).__name__,
-            )
-            raise
+            failures.append(exc)
+            self.shutdown_coordinator.request_stop()
+
+    def _run_loop(self, schedule: LoopSchedule) -> None:
+        self.stop_event.wait(schedule.start_delay())
+        while not self.stop_event.is_set() and self.budget.claim():
+            schedule.tick_started()
+            with self.shutdown_coordinator.admit() as admitted:
+                if not admitted:
+                    return
+                self.runtime.metrics.mark_iteration_started()
+                try:
+                    found_work = self.run_iteration()
+                finally:
+                    self.runtime.metrics.mark_iteration_finished()
+            if self.budget.complete():
+                self._stop_after_budget()
+                return
+            self.stop_event.wait(schedule.next_delay(found_work))
+
+    def _stop_after_budget(self) -> None:
+        self.runtime.logger.info("iteration_limit_reached", iterations=self.budget.limit)
+        self.shutdown_coordinator.request_stop()
+
+    def run_iteration(self) -> bool | None:
+        with self.instrumentation.iteration() as iteration:
+            if self.stop_event.is_set():
+                iteration.skipped()
+                return None
+            iteration.started()
+            found_work = self.execute_iteration(self.stop_event)
+            iteration.succeeded()
+            return found_work
 
-    def execute_iteration(self, stop_event: Event) -> None:
+    def execute_iteration(self, stop_event: Event) -> bool | None:
         stop_event.wait(timeout=0)
+        return None
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from typing import cast
+
+import pytest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability import metrics as app_metrics
+from python_boilerplate.observability.bootstrap import ObservabilityRuntime
+from python_boilerplate.services import AsyncWorkerService
+
+
+class LoggerStub:
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    def bind(self, **_kwargs: object) -> LoggerStub:
+        return self
+
+    def info(self, event: str, **_kwargs: object) -> None:
+        self.events.append(event)
+
+    def warning(self, event: str, **_kwargs: object) -> None:
+        self.events.append(event)
+
+    def exception(self, event: str, **_kwargs: object) -> None:
+        self.events.append(event)
+
+
+class SpanContextStub:
+    def __enter__(self) -> SpanContextStub:
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        return None
+
+    def set_attribute(self, _key: str, _value: str) -> None:
+        return None
+
+    def set_attributes(self, _attributes: dict[str, float | int]) -> None:
+        return None
+
+
+class TracerStub:
+    def start_as_current_span(self, _name: str) -> SpanContextStub:
+        return SpanContextStub()
+
+
+def _runtime(logger: LoggerStub, metrics: app_metrics.Metrics) -> ObservabilityRuntime:
+    return cast(
+        ObservabilityRuntime,
+        type(
+            "RuntimeStub",
+            (),
+            {
+                "logger": logger,
+                "metrics": metrics,
+                "tracer": TracerStub(),
+                "shutdown": staticmethod(lambda _timeout_seconds: None),
+            },
+        )(),
+    )
+
+
+def test_async_worker_runs_iterations_concurrently() -> None:
+    metrics = app_metrics.Metrics(Settings())
+    logger = LoggerStub()
+    observed_in_flight: list[float] = []
+
+    class ServiceStub(AsyncWorkerService):
+        def install_signal_handlers(self, _loop: asyncio.AbstractEventLoop) -> None:
+            return None
+
+        async def execute_iteration(self, stop_event: asyncio.Event) -> None:
+            await asyncio.sleep(0.01)
+            observed_in_flight.append(metrics.iterations_in_flight._value.get())
+            stop_event.set()
+
+    service = ServiceStub(
+        settings=Settings(worker_concurrency=3), runtime=_runtime(logger, metrics)
+    )
+
+    exit_code = service.run()
+
+    assert exit_code == 0
+    assert observed_in_flight[0] == 3.0
+    assert metrics.iterations_in_flight._value.get() == 0.0
+    assert metrics.iterations_total.labels(outcome="success")._value.get() == 3.0
+    assert logger.events[0] == "startup_success"
+    assert logger.events[-1] == "shutdown_complete"
+
+
+def test_async_worker_reports_crash_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics = app_metrics.Metrics(Settings())
+    logger = LoggerStub()
+    reported: list[BaseException] = []
+
+    class FailingServiceStub(AsyncWorkerService):
+        def install_signal_handlers(self, _loop: asyncio.AbstractEventLoop) -> None:
+            return None
+
+        async def execute_iteration(self, _stop_event: asyncio.Event) -> None:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(
+        "python_boilerplate.services.async_worker.report_exception", reported.append
+    )
+    service = FailingServiceStub(settings=Settings(), runtime=_runtime(logger, metrics))
+
+    exit_code = service.run()
+
+    assert exit_code == 1
+    assert [type(exc) for exc in reported] == [RuntimeError]
+    assert "iteration_failed" in logger.events
+    assert "crashed" in logger.events
+    assert metrics.failures_total._value.get() == 1.0
+    assert metrics.app_up._value.get() == 0.0
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+
+from python_boilerplate import bench
+from python_boilerplate.bench import BenchResult
+from python_boilerplate.config import Settings
+from python_boilerplate.runtime.health import HEALTH_METRICS, parse_prometheus_text, scan_prometheus
+
+
+def test_default_scenarios_cover_every_observability_combination() -> None:
+    scenarios = bench.default_scenarios(Settings())
+
+    names = [scenario.name for scenario in scenarios]
+    assert names[0] == "bare"
+    assert "metrics" in names
+    assert "logs+traces+resources" in names
+    assert len(set(names)) == len(names) == 11
+    assert all(not scenario.settings.metrics_enabled for scenario in scenarios)
+
+
+def test_run_benchmarks_reports_throughput_and_percentiles() -> None:
+    scenarios = [
+        scenario
+        for scenario in bench.default_scenarios(Settings())
+        if scenario.name in {"bare", "logs+traces+resources"}
+    ]
+
+    results = bench.run_benchmarks(scenarios, iterations=50, warmup=5)
+    results += bench.run_component_benchmarks(Settings(), iterations=50, warmup=5)
+
+    assert [result.name for result in results][:2] == ["bare", "logs+traces+resources"]
+    assert "component:root_span" in [result.name for result in results]
+    for result in results:
+        assert result.iterations == 50
+        assert result.ops_per_second > 0
+        assert 0 < result.p50_us <= result.p99_us
+
+
+def test_parser_benchmarks_scan_the_same_exposition() -> None:
+    payload = bench.build_exposition(200, health_first=False)
+
+    results, exposition_bytes = bench.run_parser_benchmarks(series=200, iterations=3, warmup=0)
+
+    assert scan_prometheus(io.BytesIO(payload), HEALTH_METRICS)["app_up"] == 1.0
+    assert len(parse_prometheus_text(payload.decode("utf-8"))) == 3
+    assert [result.iterations for result in results] == [3, 3, 3, 3]
+    assert exposition_bytes == len(payload)
+
+
+def test_run_bench_reports_parser_exposition_size(capsys: pytest.CaptureFixture[str]) -> None:
+    assert bench.run_bench(Settings(), 2, 0, suite="parser", series=200) == 0
+
+    output = capsys.readouterr().out
+    assert output.startswith("exposition: 200 series")
+    assert "parser:scan health last" in output
+
+
+def test_results_round_trip_and_detect_regressions(tmp_path: Path) -> None:
+    baseline = [
+        BenchResult("fast", 100, 1000.0, 1.0, 2.0),
+        BenchResult("slow", 100, 1000.0, 1.0, 2.0),
+    ]
+    path = tmp_path / "baseline.json"
+    bench.save_results(baseline, path)
+    current = [
+        BenchResult("fast", 100, 900.0, 1.1, 2.2),
+        BenchResult("slow", 100, 700.0, 1.4, 2.8),
+        BenchResult("new", 100, 10.0, 100.0, 200.0),
+    ]
+
+    reference = bench.load_results(path)
+
+    assert reference["fast"] == baseline[0]
+    assert bench.find_regressions(current, reference, max_regression=0.2) == ["slow"]
+    assert "-30.0%" in bench.format_results(current, reference)
+
+
+def test_run_bench_fails_when_baseline_regresses(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(
+        bench,
+        "run_benchmarks",
+        lambda _scenarios, _iterations, _warmup: [BenchResult("metrics", 10, 500.0, 1.0, 2.0)],
+    )
+    monkeypatch.setattr(bench, "run_component_benchmarks", lambda _settings, _i, _w: [])
+    path = tmp_path / "baseline.json"
+    bench.save_results([BenchResult("metrics", 10, 1000.0, 1.0, 2.0)], path)
+
+    assert bench.run_bench(Settings(), 10, 0, save=str(tmp_path / "current.json")) == 0
+    assert bench.run_bench(Settings(), 10, 0, baseline=str(path)) == 1
+    assert bench.load_results(tmp_path / "current.json")["metrics"].ops_per_second == 500.0
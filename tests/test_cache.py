@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from threading import Barrier, Event, Thread
+
+import pytest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.runtime.cache import TTLCache
+
+
+class ClockStub:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_expires_entries_and_evicts_least_recently_used() -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    cache = TTLCache(name="reference", max_size=2, ttl_seconds=10.0, metrics=metrics, clock=clock)
+
+    assert cache.get_or_load("a", lambda: 1) == 1
+    assert cache.get_or_load("b", lambda: 2) == 2
+    assert cache.get_or_load("a", lambda: 99) == 1
+    assert cache.get_or_load("c", lambda: 3) == 3
+    assert cache.get_or_load("b", lambda: 20) == 20
+    clock.now = 11.0
+    assert cache.get_or_load("c", lambda: 30) == 30
+
+    labels = {"cache": "reference"}
+    assert metrics.cache_hits_total.labels(**labels)._value.get() == 1.0
+    assert metrics.cache_misses_total.labels(**labels)._value.get() == 5.0
+    assert metrics.cache_evictions_total.labels(**labels)._value.get() == 2.0
+    assert metrics.cache_size.labels(**labels)._value.get() == 2.0
+
+
+def test_cache_deduplicates_concurrent_misses() -> None:
+    cache = TTLCache(name="reference")
+    loading = Event()
+    release = Event()
+    callers = 5
+    barrier = Barrier(callers)
+    loads: list[str] = []
+    results: list[str] = []
+
+    def loader() -> str:
+        loads.append("load")
+        loading.set()
+        release.wait(timeout=5)
+        return "value"
+
+    def lookup() -> None:
+        barrier.wait(timeout=5)
+        results.append(cache.get_or_load("key", loader))
+
+    threads = [Thread(target=lookup) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    assert loading.wait(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert loads == ["load"]
+    assert results == ["value"] * callers
+
+
+def test_cache_serves_stale_value_while_refreshing_in_background() -> None:
+    clock = ClockStub()
+    cache = TTLCache(name="reference", ttl_seconds=10.0, stale_seconds=5.0, clock=clock)
+    refreshed = Event()
+
+    def refresh() -> str:
+        refreshed.set()
+        return "fresh"
+
+    cache.set("key", "stale")
+    clock.now = 12.0
+
+    assert cache.get_or_load("key", refresh) == "stale"
+    assert refreshed.wait(timeout=5)
+    for _ in range(100):
+        if cache.get_or_load("key", lambda: "unexpected") == "fresh":
+            break
+        Event().wait(0.01)
+    assert cache.get_or_load("key", lambda: "unexpected") == "fresh"
+
+
+def test_cache_propagates_loader_errors_without_caching_them() -> None:
+    cache = TTLCache(name="reference")
+
+    def fail() -> str:
+        raise RuntimeError("downstream unavailable")
+
+    with pytest.raises(RuntimeError, match="downstream unavailable"):
+        cache.get_or_load("key", fail)
+    assert cache.get_or_load("key", lambda: "value") == "value"
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, generate_latest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability import metrics as app_metrics
+from python_boilerplate.observability.cardinality import OVERFLOW_LABEL_VALUE, CardinalityGuard
+
+
+def _guarded_counter(
+    max_children: int, idle_seconds: float = 0.0, now: list[float] | None = None
+) -> tuple[CardinalityGuard, Counter, Counter]:
+    registry = CollectorRegistry()
+    requests = Counter("requests_total", "Requests.", labelnames=("route",), registry=registry)
+    dropped = Counter("dropped_total", "Dropped.", labelnames=("metric",), registry=registry)
+    clock = now if now is not None else [0.0]
+    guard = CardinalityGuard(
+        max_children=max_children,
+        idle_seconds=idle_seconds,
+        dropped=dropped,
+        clock=lambda: clock[0],
+    )
+    return guard, requests, dropped
+
+
+def _text(metric: Counter) -> str:
+    return generate_latest(metric).decode("utf-8")
+
+
+def test_guard_redirects_label_sets_beyond_the_cap_to_overflow() -> None:
+    guard, requests, dropped = _guarded_counter(max_children=2)
+
+    for route in ("/a", "/b", "/c", "/d", "/a"):
+        guard.labels(requests, route).inc()
+
+    assert guard.children(requests) == 2
+    assert requests.labels(route="/a")._value.get() == 2.0
+    assert requests.labels(route="/b")._value.get() == 1.0
+    assert requests.labels(route=OVERFLOW_LABEL_VALUE)._value.get() == 2.0
+    assert dropped.labels(metric="requests")._value.get() == 2.0
+    assert b'route="/c"' not in generate_latest(requests)
+
+
+def test_guard_evicts_idle_label_sets_and_frees_room_under_the_cap() -> None:
+    now = [0.0]
+    guard, requests, dropped = _guarded_counter(max_children=2, idle_seconds=10.0, now=now)
+
+    guard.labels(requests, "/old").inc()
+    guard.labels(requests, "/busy").inc()
+    now[0] = 8.0
+    guard.labels(requests, "/busy").inc()
+    now[0] = 12.0
+    guard.labels(requests, "/new").inc()
+
+    assert guard.children(requests) == 2
+    assert 'route="/old"' not in _text(requests)
+    assert 'requests_total{route="/busy"} 2.0' in _text(requests)
+    assert 'requests_total{route="/new"} 1.0' in _text(requests)
+    assert dropped.labels(metric="requests")._value.get() == 0.0
+
+
+def test_guard_without_limits_passes_labels_through() -> None:
+    guard, requests, dropped = _guarded_counter(max_children=0)
+
+    for index in range(50):
+        guard.labels(requests, f"/{index}").inc()
+
+    assert guard.children(requests) == 0
+    assert requests.labels(route="/49")._value.get() == 1.0
+    assert dropped.labels(metric="requests")._value.get() == 0.0
+
+
+def test_metrics_bound_label_values_from_data() -> None:
+    metrics = app_metrics.Metrics(Settings(metrics_max_label_sets=3))
+    tenants = Gauge(
+        "tenant_backlog",
+        "Backlog per tenant.",
+        labelnames=("tenant",),
+        registry=metrics.registry,
+    )
+
+    for index in range(10):
+        metrics.mark_cache_event(f"cache-{index}", "hit")
+        metrics.labels(tenants, f"tenant-{index}").set(index)
+
+    text = generate_latest(metrics.registry).decode("utf-8")
+    assert text.count("cache_hits_total{") == 4
+    assert f'cache_hits_total{{cache="{OVERFLOW_LABEL_VALUE}"}} 7.0' in text
+    assert f'tenant_backlog{{tenant="{OVERFLOW_LABEL_VALUE}"}} 9.0' in text
+    assert 'metrics_label_sets_dropped_total{metric="cache_hits"} 7.0' in text
+    assert 'metrics_label_sets_dropped_total{metric="tenant_backlog"} 7.0' in text
+
+
+def test_metrics_disable_idle_eviction_in_multiprocess_mode(tmp_path: Path) -> None:
+    settings = Settings(metrics_label_idle_seconds=10.0)
+
+    with app_metrics.multiprocess_metrics(str(tmp_path)):
+        shared = app_metrics.Metrics(settings)
+
+    assert app_metrics.Metrics(settings)._guard.idle_seconds == 10.0
+    assert shared._guard.idle_seconds == 0.0
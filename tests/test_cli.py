@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import os
+import subprocess
+import sys
 from argparse import Namespace
+from pathlib import Path
+from urllib.error import URLError
 
 import pytest
 
 from python_boilerplate import cli
+from python_boilerplate.config import Settings
 from python_boilerplate.runtime.health import HealthReport
 
 
 def test_main_dispatches_health(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(cli, "load_settings", lambda: object())
-    monkeypatch.setattr(cli, "build_parser", lambda: _parser_stub(Namespace(command="health")))
+    monkeypatch.setattr(
+        cli,
+        "build_parser",
+        lambda: _parser_stub(
+            Namespace(command="health", targets=[], targets_file=None, watch=False)
+        ),
+    )
     monkeypatch.setattr(
         cli,
         "check_health",
@@ -34,11 +46,147 @@ def test_main_dispatches_run(monkeypatch: pytest.MonkeyPatch) -> None:
         def run(self) -> int:
             return 0
 
-    monkeypatch.setattr(cli, "load_settings", lambda: object())
-    monkeypatch.setattr(cli, "build_parser", lambda: _parser_stub(Namespace(command="run")))
-    monkeypatch.setattr(cli, "create_worker_service", lambda: ServiceStub())
+    monkeypatch.setattr(cli, "load_settings", lambda: Settings())
+    monkeypatch.setattr(
+        cli,
+        "build_parser",
+        lambda: _parser_stub(Namespace(command="run", processes=None, iterations=None)),
+    )
+    monkeypatch.setattr(cli, "create_worker_service", lambda _settings: ServiceStub())
+
+    assert cli.main() == 0
+
+
+def test_main_runs_once_without_supervisor(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[Settings] = []
+
+    class ServiceStub:
+        def run(self) -> int:
+            return 0
+
+    def create_worker_service_stub(settings: Settings) -> ServiceStub:
+        created.append(settings)
+        return ServiceStub()
+
+    monkeypatch.setattr(cli, "load_settings", lambda: Settings())
+    monkeypatch.setattr(sys, "argv", ["boilerplate", "run", "--once"])
+    monkeypatch.setattr(cli, "create_worker_service", create_worker_service_stub)
 
     assert cli.main() == 0
+    assert [settings.max_iterations for settings in created] == [1]
+
+
+def test_main_rejects_iterations_with_processes(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setattr(cli, "load_settings", lambda: Settings())
+    monkeypatch.setattr(
+        sys, "argv", ["boilerplate", "run", "--iterations", "5", "--processes", "2"]
+    )
+
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main()
+
+    assert exc_info.value.code == 2
+    assert "single process" in capsys.readouterr().err
+
+
+def test_main_rejects_pushgateway_with_processes(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setattr(
+        cli, "load_settings", lambda: Settings(pushgateway_url="http://pushgateway:9091")
+    )
+    monkeypatch.setattr(sys, "argv", ["boilerplate", "run", "--processes", "2"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main()
+
+    assert exc_info.value.code == 2
+    assert "APP_PUSHGATEWAY_URL needs a single process" in capsys.readouterr().err
+
+
+def test_main_dispatches_run_with_processes_to_supervisor(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    supervised: list[int] = []
+
+    def run_supervisor_stub(_settings: Settings, processes: int, target: object) -> int:
+        supervised.append(processes)
+        return 0
+
+    monkeypatch.setattr(cli, "load_settings", lambda: Settings(worker_processes=2))
+    monkeypatch.setattr(
+        cli,
+        "build_parser",
+        lambda: _parser_stub(Namespace(command="run", processes=4, iterations=None)),
+    )
+    monkeypatch.setattr(cli, "run_supervisor", run_supervisor_stub)
+
+    assert cli.main() == 0
+    assert supervised == [4]
+
+
+def test_build_parser_accepts_processes_for_run() -> None:
+    args = cli.build_parser().parse_args(["run", "--processes", "3"])
+
+    assert args.processes == 3
+
+
+def test_write_profile_stores_downloaded_profile(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    requested: list[tuple[float, str]] = []
+
+    def download_profile_stub(_settings: Settings, seconds: float, output_format: str) -> bytes:
+        requested.append((seconds, output_format))
+        return b"main;work 3\n"
+
+    monkeypatch.setattr(cli, "download_profile", download_profile_stub)
+    output = tmp_path / "worker.folded"
+
+    assert cli.write_profile(Settings(), 5.0, "folded", str(output)) == 0
+    assert requested == [(5.0, "folded")]
+    assert output.read_bytes() == b"main;work 3\n"
+    assert '"ok":true' in capsys.readouterr().out
+
+
+def test_write_profile_reports_unreachable_service(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    def download_profile_stub(_settings: Settings, _seconds: float, _format: str) -> bytes:
+        raise URLError("connection refused")
+
+    monkeypatch.setattr(cli, "download_profile", download_profile_stub)
+
+    assert cli.write_profile(Settings(), 5.0, "speedscope", None) == 1
+    assert '"reason":"metrics_unreachable"' in capsys.readouterr().out
+
+
+def test_health_command_does_not_import_the_worker_stack() -> None:
+    heavy_packages = ("opentelemetry", "prometheus_client", "sentry_sdk", "structlog")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "python_boilerplate.cli", "health"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "APP_METRICS_ENABLED": "false"},
+        timeout=60,
+        check=False,
+    )
+
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert completed.returncode == 0, completed.stderr
+    assert "python_boilerplate.runtime.health" in imported
+    assert sorted(module for module in imported if module.split(".")[0] in heavy_packages) == []
 
 
 def _parser_stub(namespace: Namespace) -> object:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pytest
 
-from python_boilerplate.config import load_settings, parse_bool
+from python_boilerplate.config import load_settings, parse_bool, parse_choice
 
 
 @pytest.mark.parametrize(
@@ -25,12 +25,30 @@ def test_parse_bool_rejects_invalid_values() -> None:
         parse_bool("maybe")
 
 
+def test_parse_choice_normalizes_and_rejects_unknown_values() -> None:
+    choices = frozenset({"fixed_delay", "fixed_rate"})
+
+    assert parse_choice(" Fixed_Rate ", choices) == "fixed_rate"
+    with pytest.raises(ValueError, match="fixed_delay, fixed_rate"):
+        parse_choice("cron", choices)
+
+
 def test_load_settings_reads_runtime_values_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("APP_NAME", "demo")
     monkeypatch.setenv("APP_ENV", "test")
     monkeypatch.setenv("APP_DEBUG", "yes")
     monkeypatch.setenv("APP_METRICS_PORT", "9100")
     monkeypatch.setenv("APP_TRACES_ENABLED", "false")
+    monkeypatch.setenv("APP_WORKER_CONCURRENCY", "4")
+    monkeypatch.setenv("APP_LOOP_SCHEDULE", "fixed_rate")
+    monkeypatch.setenv("APP_LOOP_OVERRUN_POLICY", "coalesce")
+    monkeypatch.setenv("APP_ITERATION_RESOURCES_ENABLED", "true")
+    monkeypatch.setenv("APP_RATE_LIMIT_PER_SECOND", "12.5")
+    monkeypatch.setenv("APP_ITERATION_DURATION_BUCKETS", "0.0002, 0.001,0.005")
+    monkeypatch.setenv("APP_LATENCY_WINDOWS_SECONDS", "30, 120")
+    monkeypatch.setenv("APP_MAX_ITERATIONS", "3")
+    monkeypatch.setenv("APP_PUSHGATEWAY_URL", "http://pushgateway:9091")
+    monkeypatch.setenv("APP_METRICS_LABEL_IDLE_SECONDS", "900")
 
     settings = load_settings()
 
@@ -39,3 +57,25 @@ def test_load_settings_reads_runtime_values_from_env(monkeypatch: pytest.MonkeyP
     assert settings.debug is True
     assert settings.metrics_port == 9100
     assert settings.traces_enabled is False
+    assert settings.worker_concurrency == 4
+    assert settings.loop_schedule == "fixed_rate"
+    assert settings.loop_overrun_policy == "coalesce"
+    assert settings.iteration_resources_enabled is True
+    assert settings.iteration_allocations_enabled is False
+    assert settings.rate_limit_per_second == 12.5
+    assert settings.concurrency_limit == 0
+    assert settings.iteration_duration_buckets == (0.0002, 0.001, 0.005)
+    assert settings.latency_windows_seconds == (30.0, 120.0)
+    assert settings.max_iterations == 3
+    assert settings.pushgateway_url == "http://pushgateway:9091"
+    assert settings.metrics_max_label_sets == 1000
+    assert settings.metrics_label_idle_seconds == 900.0
+
+
+def test_load_settings_rejects_non_positive_latency_windows(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("APP_LATENCY_WINDOWS_SECONDS", "0,60")
+
+    with pytest.raises(ValueError, match="positive"):
+        load_settings()
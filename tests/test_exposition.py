@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import gzip
+from collections.abc import Iterator
+from threading import Event, Thread
+from time import sleep
+
+from prometheus_client import CollectorRegistry, Counter
+from prometheus_client.core import GaugeMetricFamily, Metric
+
+from python_boilerplate.observability.exposition import CachedExposition
+
+
+class _CountingCollector:
+    def __init__(self, release: Event | None = None) -> None:
+        self.calls = 0
+        self.entered = Event()
+        self.release = release
+
+    def collect(self) -> Iterator[Metric]:
+        self.calls += 1
+        self.entered.set()
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        yield GaugeMetricFamily("renders", "Collect calls so far.", value=self.calls)
+
+
+def test_exposition_is_rendered_once_per_max_age() -> None:
+    now = [100.0]
+    registry = CollectorRegistry()
+    collector = _CountingCollector()
+    registry.register(collector)
+    exposition = CachedExposition(registry, max_age_seconds=5.0, clock=lambda: now[0])
+
+    first = exposition.render(None, compress=False)
+    now[0] += 4.0
+    second = exposition.render(None, compress=False)
+    now[0] += 2.0
+    third = exposition.render(None, compress=False)
+
+    assert first == second
+    assert b"renders 2.0" in third[1]
+    assert collector.calls == 2
+
+
+def test_concurrent_scrapes_share_one_render() -> None:
+    release = Event()
+    registry = CollectorRegistry()
+    collector = _CountingCollector(release)
+    registry.register(collector)
+    exposition = CachedExposition(registry)
+    bodies: list[bytes] = []
+
+    threads = [
+        Thread(target=lambda: bodies.append(exposition.render(None, compress=False)[1]))
+        for _ in range(5)
+    ]
+    threads[0].start()
+    assert collector.entered.wait(timeout=5)
+    for thread in threads[1:]:
+        thread.start()
+    sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert collector.calls == 1
+    assert len(set(bodies)) == 1
+
+
+def test_gzip_body_is_compressed_once_per_render() -> None:
+    registry = CollectorRegistry()
+    Counter("jobs", "Jobs.", registry=registry).inc()
+    exposition = CachedExposition(registry, max_age_seconds=60.0)
+    responses: list[tuple[str, list[tuple[str, str]]]] = []
+
+    def start_response(
+        status: str, headers: list[tuple[str, str]], exc_info: object = None
+    ) -> None:
+        responses.append((status, headers))
+
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/metrics", "HTTP_ACCEPT_ENCODING": "gzip"}
+    first = list(exposition.wsgi_app(environ, start_response))  # type: ignore[arg-type]
+    second = list(exposition.wsgi_app(environ, start_response))  # type: ignore[arg-type]
+
+    assert first[0] is second[0]
+    assert b"jobs_total 1.0" in gzip.decompress(first[0])
+    assert ("Content-Encoding", "gzip") in responses[0][1]
@@ -1,16 +1,46 @@
 from __future__ import annotations
 
+import io
 import json
-from urllib.error import URLError
+import math
+import socket
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict
+from email.message import Message
+from pathlib import Path
+from time import sleep
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+from wsgiref.types import StartResponse, WSGIEnvironment
 
 import pytest
 
 from python_boilerplate.config import Settings
+from python_boilerplate.observability import http as app_http
+from python_boilerplate.observability.heartbeat import (
+    HeartbeatState,
+    HeartbeatWriter,
+    read_heartbeat,
+)
+from python_boilerplate.observability.http import serve_wsgi
+from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.observability.status import (
+    HealthStatus,
+    evaluate_health,
+    evaluate_readiness,
+    status_app,
+)
 from python_boilerplate.runtime.health import (
     HealthReport,
+    HealthWatcher,
+    check_fleet,
     check_health,
     emit_health_report,
+    iter_prometheus_samples,
     parse_prometheus_text,
+    read_targets,
+    scan_prometheus,
+    watch_health,
 )
 
 
@@ -30,6 +60,74 @@ def test_parse_prometheus_text_ignores_comments_and_labels() -> None:
     }
 
 
+def test_iter_prometheus_samples_handles_openmetrics_syntax() -> None:
+    lines = [
+        b'requests_total{path="/a\\"b\\\\c\\nd",code="200"} 3 1700000000000\n',
+        b"temperature NaN\n",
+        b'latency_bucket{le="+Inf"} +Inf # {trace_id="abc"} 0.5\n',
+        b"# EOF\n",
+        b"after_eof 1\n",
+    ]
+
+    samples = list(iter_prometheus_samples(lines))
+
+    assert [sample.name for sample in samples] == [
+        "requests_total",
+        "temperature",
+        "latency_bucket",
+    ]
+    assert samples[0].labels == {"path": '/a"b\\c\nd', "code": "200"}
+    assert samples[0].timestamp == 1700000000000.0
+    assert math.isnan(samples[1].value)
+    assert samples[2].labels == {"le": "+Inf"}
+    assert samples[2].value == math.inf
+
+
+def test_scan_prometheus_stops_after_last_wanted_series() -> None:
+    consumed: list[str] = []
+
+    def lines() -> Iterator[str]:
+        for line in [
+            'app_info{env="prod",version="1.2"} 1',
+            "app_up 1",
+            'app_info{env="dev"} 1',
+            "unparsed{ 1",
+        ]:
+            consumed.append(line)
+            yield line
+
+    values = scan_prometheus(lines(), {"app_up", "app_info"}, matchers={"app_info": {"env": "dev"}})
+
+    assert values == {"app_up": 1.0, "app_info": 1.0}
+    assert len(consumed) == 3
+
+
+def test_iter_prometheus_samples_skips_other_names_without_parsing_them() -> None:
+    lines = [
+        b"broken_metric{ 1\n",
+        b"\xff not utf-8\n",
+        b"app_up_total 5\n",
+        b"app_up 1\n",
+        b"# EOF\n",
+        b"app_up 0\n",
+    ]
+
+    samples = list(iter_prometheus_samples(lines, {"app_up"}))
+
+    assert [(sample.name, sample.value) for sample in samples] == [("app_up", 1.0)]
+
+
+def test_parse_prometheus_text_skips_labeled_lines_before_parsing() -> None:
+    payload = 'broken{label="x 1\napp_up 1 1700000000000\n# EOF\nafter_eof 1'
+
+    assert parse_prometheus_text(payload) == {"app_up": 1.0}
+
+
+def test_scan_prometheus_rejects_malformed_wanted_series() -> None:
+    with pytest.raises(ValueError):
+        scan_prometheus(['app_up{broken="x} 1'], {"app_up"})
+
+
 def test_emit_health_report_prints_json(capsys: pytest.CaptureFixture[str]) -> None:
     report = HealthReport(
         service="demo",
@@ -66,27 +164,19 @@ def test_check_health_returns_unhealthy_when_metrics_are_disabled() -> None:
 def test_check_health_uses_configured_metrics_host(monkeypatch: pytest.MonkeyPatch) -> None:
     requested_urls: list[str] = []
 
-    class ResponseStub:
-        def __enter__(self) -> ResponseStub:
-            return self
-
-        def __exit__(self, *_args: object) -> None:
-            return None
+    payload = b"app_up 1.0\nlast_progress_timestamp_seconds 9999999999.0\n"
 
-        def read(self) -> bytes:
-            return b"app_up 1.0\nlast_progress_timestamp_seconds 9999999999.0\n"
-
-    def urlopen_stub(url: str, timeout: int) -> ResponseStub:
+    def urlopen_stub(url: str, timeout: int) -> io.BytesIO:
         requested_urls.append(url)
         assert timeout == 2
-        return ResponseStub()
+        return io.BytesIO(payload)
 
     monkeypatch.setattr("python_boilerplate.runtime.health.urlopen", urlopen_stub)
 
     report = check_health(Settings(metrics_host="127.0.0.2", metrics_port=9100))
 
     assert report.ok is True
-    assert requested_urls == ["http://127.0.0.2:9100/metrics"]
+    assert requested_urls == ["http://127.0.0.2:9100/healthz"]
 
 
 def test_check_health_maps_wildcard_host_to_loopback(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -102,23 +192,15 @@ def test_check_health_maps_wildcard_host_to_loopback(monkeypatch: pytest.MonkeyP
 
     assert report.ok is False
     assert report.reason == "metrics_unreachable"
-    assert requested_urls == ["http://127.0.0.1:9100/metrics"]
+    assert requested_urls == ["http://127.0.0.1:9100/healthz"]
 
 
 def test_check_health_accepts_missing_progress_metric(monkeypatch: pytest.MonkeyPatch) -> None:
-    class ResponseStub:
-        def __enter__(self) -> ResponseStub:
-            return self
-
-        def __exit__(self, *_args: object) -> None:
-            return None
-
-        def read(self) -> bytes:
-            return b"app_up 1.0\n"
+    payload = b"app_up 1.0\n"
 
     monkeypatch.setattr(
         "python_boilerplate.runtime.health.urlopen",
-        lambda _url, timeout: ResponseStub(),
+        lambda _url, timeout: io.BytesIO(payload),
     )
 
     report = check_health(Settings())
@@ -130,19 +212,11 @@ def test_check_health_accepts_missing_progress_metric(monkeypatch: pytest.Monkey
 def test_check_health_returns_structured_failure_for_invalid_metrics_payload(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    class ResponseStub:
-        def __enter__(self) -> ResponseStub:
-            return self
-
-        def __exit__(self, *_args: object) -> None:
-            return None
-
-        def read(self) -> bytes:
-            return b"app_up definitely-not-a-number\n"
+    payload = b"app_up definitely-not-a-number\n"
 
     monkeypatch.setattr(
         "python_boilerplate.runtime.health.urlopen",
-        lambda _url, timeout: ResponseStub(),
+        lambda _url, timeout: io.BytesIO(payload),
     )
 
     report = check_health(Settings())
@@ -154,23 +228,15 @@ def test_check_health_returns_structured_failure_for_invalid_metrics_payload(
 def test_check_health_prefers_last_success_for_freshness(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    class ResponseStub:
-        def __enter__(self) -> ResponseStub:
-            return self
-
-        def __exit__(self, *_args: object) -> None:
-            return None
-
-        def read(self) -> bytes:
-            return (
-                b"app_up 1.0\n"
-                b"last_progress_timestamp_seconds 9999999999.0\n"
-                b"last_success_timestamp_seconds 1.0\n"
-            )
+    payload = (
+        b"app_up 1.0\n"
+        b"last_progress_timestamp_seconds 9999999999.0\n"
+        b"last_success_timestamp_seconds 1.0\n"
+    )
 
     monkeypatch.setattr(
         "python_boilerplate.runtime.health.urlopen",
-        lambda _url, timeout: ResponseStub(),
+        lambda _url, timeout: io.BytesIO(payload),
     )
     monkeypatch.setattr("python_boilerplate.runtime.health.time", lambda: 100.0)
 
@@ -178,3 +244,200 @@ def test_check_health_prefers_last_success_for_freshness(
 
     assert report.ok is False
     assert report.reason == "stale"
+
+
+def test_evaluate_health_reports_age_of_freshness_signal() -> None:
+    settings = Settings(health_max_age_seconds=10.0)
+
+    fresh = evaluate_health(settings, app_up=1.0, last_success=95.0, last_progress=99.0, now=100.0)
+    stale = evaluate_health(settings, app_up=1.0, last_success=None, last_progress=80.0, now=100.0)
+    down = evaluate_health(settings, app_up=0.0, last_success=95.0, last_progress=99.0, now=100.0)
+
+    assert (fresh.ok, fresh.reason, fresh.age_seconds) == (True, "ok", 5.0)
+    assert (stale.ok, stale.reason, stale.age_seconds) == (False, "stale", 20.0)
+    assert (down.ok, down.reason) == (False, "app_down")
+
+
+def test_evaluate_readiness_waits_for_first_success() -> None:
+    assert evaluate_readiness(app_up=1.0, last_success=0.0).reason == "starting"
+    assert evaluate_readiness(app_up=1.0, last_success=42.0).ok is True
+    assert evaluate_readiness(app_up=0.0, last_success=42.0).reason == "app_down"
+
+
+def test_check_health_uses_reason_from_unhealthy_healthz_response(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def urlopen_stub(url: str, timeout: int) -> object:
+        raise HTTPError(
+            url,
+            503,
+            "Service Unavailable",
+            Message(),
+            io.BytesIO(b'{"ok":false,"reason":"stale","age_seconds":75.0}'),
+        )
+
+    monkeypatch.setattr("python_boilerplate.runtime.health.urlopen", urlopen_stub)
+
+    report = check_health(Settings())
+
+    assert report.ok is False
+    assert report.reason == "stale"
+
+
+def test_metrics_server_serves_healthz_and_readyz_from_memory() -> None:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    settings = Settings(metrics_host="127.0.0.1", metrics_port=port, health_max_age_seconds=60.0)
+    metrics = Metrics(settings)
+    metrics.start()
+
+    with pytest.raises(HTTPError) as not_ready:
+        urlopen(f"http://127.0.0.1:{port}/readyz", timeout=2)
+    assert json.loads(not_ready.value.read()) == {"ok": False, "reason": "starting"}
+
+    metrics.mark_success(0.1)
+    with urlopen(f"http://127.0.0.1:{port}/readyz", timeout=2) as response:
+        assert json.loads(response.read()) == {"ok": True, "reason": "ok"}
+    report = check_health(settings)
+    assert (report.ok, report.reason) == (True, "ok")
+
+    metrics.mark_shutdown()
+    report = check_health(settings)
+    assert (report.ok, report.reason) == (False, "app_down")
+
+
+def test_check_health_reads_heartbeat_without_http(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    def urlopen_stub(url: str, timeout: int) -> object:
+        raise AssertionError(url)
+
+    monkeypatch.setattr("python_boilerplate.runtime.health.urlopen", urlopen_stub)
+    settings = Settings(
+        metrics_enabled=False,
+        heartbeat_path=str(tmp_path / "heartbeat"),
+        health_max_age_seconds=60.0,
+    )
+
+    assert check_health(settings).reason == "heartbeat_missing"
+
+    metrics = Metrics(settings)
+    metrics.start()
+    metrics.mark_success(0.1)
+    report = check_health(settings)
+    assert (report.ok, report.reason) == (True, "ok")
+
+    metrics.mark_shutdown()
+    metrics.mark_success(0.1)
+    assert check_health(settings).reason == "app_down"
+    assert (tmp_path / "heartbeat").stat().st_mode & 0o777 == 0o600
+
+
+def test_read_heartbeat_rejects_foreign_files(tmp_path: Path) -> None:
+    path = tmp_path / "heartbeat"
+    path.write_bytes(b"not a heartbeat file at all, but long enough to map")
+
+    with pytest.raises(ValueError):
+        read_heartbeat(str(path))
+
+    writer = HeartbeatWriter(str(path))
+    writer.open()
+    writer.publish(1.0, 20.0, 10.0)
+    writer.close()
+    assert read_heartbeat(str(path)) == HeartbeatState(1.0, 20.0, 10.0)
+
+
+def test_check_fleet_probes_targets_concurrently_and_summarizes(tmp_path: Path) -> None:
+    healthy = serve_wsgi(status_app(lambda: HealthStatus(ok=True, reason="ok")), "127.0.0.1", 0)
+    stale = serve_wsgi(status_app(lambda: HealthStatus(ok=False, reason="stale")), "127.0.0.1", 0)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text(
+        f"# fleet\n127.0.0.1:{healthy.server_port}\n\n"
+        f"http://127.0.0.1:{stale.server_port}/  # canary\n"
+        f"127.0.0.1:{closed_port}\n",
+        encoding="utf-8",
+    )
+    try:
+        targets = read_targets(str(targets_file))
+        report = check_fleet(Settings(), targets, timeout=1.0)
+    finally:
+        healthy.shutdown()
+        stale.shutdown()
+
+    assert targets[1] == f"http://127.0.0.1:{stale.server_port}/"
+    assert report.ok is False
+    assert (report.total, report.healthy) == (3, 1)
+    assert report.reasons == {"ok": 1, "stale": 1, "metrics_unreachable": 1}
+    assert [result.reason for result in report.targets] == ["ok", "stale", "metrics_unreachable"]
+    assert len(report.slowest) == 3
+    assert json.loads(json.dumps(asdict(report)))["reasons"]["stale"] == 1
+
+
+def test_health_watcher_reuses_connection_and_reports_transitions() -> None:
+    # wsgi.input is the connection's read buffer, so one object means one connection.
+    connection_inputs: list[object] = []
+    statuses = [
+        HealthStatus(ok=True, reason="ok", age_seconds=1.0),
+        HealthStatus(ok=True, reason="ok", age_seconds=2.0),
+        HealthStatus(ok=False, reason="stale", age_seconds=90.0),
+    ]
+
+    def app(environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        connection_inputs.append(environ["wsgi.input"])
+        return status_app(lambda: statuses.pop(0) if len(statuses) > 1 else statuses[0])(
+            environ, start_response
+        )
+
+    server = serve_wsgi(app, "127.0.0.1", 0)
+    watcher = HealthWatcher(Settings(), target=f"127.0.0.1:{server.server_port}")
+    try:
+        events = [watcher.poll() for _ in range(4)]
+    finally:
+        watcher.close()
+        server.shutdown()
+
+    assert events[0] is not None
+    assert (events[0]["reason"], events[0]["previous_reason"]) == ("ok", None)
+    assert events[1] is None
+    assert events[2] is not None
+    assert (events[2]["ok"], events[2]["previous_reason"]) == (False, "ok")
+    assert events[2]["ages"] == [1.0, 2.0, 90.0]
+    assert events[3] is None
+    assert len(connection_inputs) == 4
+    assert all(item is connection_inputs[0] for item in connection_inputs)
+
+
+def test_health_watcher_reconnects_after_server_idle_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_http._SilentHandler, "timeout", 0.2)
+    server = serve_wsgi(
+        status_app(lambda: HealthStatus(ok=True, reason="ok", age_seconds=1.0)), "127.0.0.1", 0
+    )
+    watcher = HealthWatcher(Settings(), target=f"127.0.0.1:{server.server_port}")
+    try:
+        events: list[dict[str, object] | None] = []
+        for _ in range(3):
+            events.append(watcher.poll())
+            sleep(0.5)
+    finally:
+        watcher.close()
+        server.shutdown()
+
+    assert events[0] is not None
+    assert events[0]["reason"] == "ok"
+    assert events[1:] == [None, None]
+
+
+def test_watch_health_exits_with_last_state(capsys: pytest.CaptureFixture[str]) -> None:
+    exit_code = watch_health(Settings(metrics_enabled=False), interval=0.0, max_polls=3)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert exit_code == 0
+    assert len(lines) == 1
+    assert json.loads(lines[0])["reason"] == "metrics_disabled"
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Any, cast
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.bootstrap import ObservabilityRuntime
+from python_boilerplate.observability.iteration import (
+    CounterRequestIds,
+    IterationInstrumentation,
+    IterationSampler,
+)
+from python_boilerplate.observability.metrics import Metrics
+
+
+class LoggerStub:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict[str, object]]] = []
+        self.bound: dict[str, object] = {}
+
+    def bind(self, **kwargs: object) -> LoggerStub:
+        self.bound = kwargs
+        return self
+
+    def info(self, event: str, **kwargs: object) -> None:
+        self.events.append((event, kwargs))
+
+    def warning(self, event: str, **kwargs: object) -> None:
+        self.events.append((event, kwargs))
+
+
+def _instrumentation(
+    settings: Settings,
+) -> tuple[IterationInstrumentation, LoggerStub, Metrics, InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    logger = LoggerStub()
+    metrics = Metrics(settings)
+    runtime = ObservabilityRuntime(
+        logger=cast(Any, logger),
+        metrics=metrics,
+        tracer=provider.get_tracer("test"),
+        shutdown=lambda _timeout_seconds: None,
+    )
+    return IterationInstrumentation(settings, runtime), logger, metrics, exporter
+
+
+def test_sampler_records_every_nth_iteration_and_applies_rate() -> None:
+    every_third = IterationSampler(every=3)
+    coin_flips = iter([0.1, 0.9])
+    half = IterationSampler(rate=0.5, random=lambda: next(coin_flips))
+
+    assert [every_third.should_record() for _ in range(6)] == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert [half.should_record(), half.should_record()] == [True, False]
+
+
+def test_counter_request_ids_are_unique_per_process() -> None:
+    request_ids = CounterRequestIds(prefix="abc")
+
+    assert [request_ids(), request_ids(), request_ids()] == ["abc-1", "abc-2", "abc-3"]
+    assert CounterRequestIds().prefix != CounterRequestIds().prefix
+
+
+def test_unsampled_iteration_records_metrics_without_logs_or_spans() -> None:
+    instrumentation, logger, metrics, exporter = _instrumentation(
+        Settings(iteration_sample_every=1000, iteration_request_ids="counter")
+    )
+    tracer = instrumentation.runtime.tracer
+
+    for _ in range(3):
+        with instrumentation.iteration() as iteration:
+            iteration.started()
+            with tracer.start_as_current_span("child"):
+                pass
+            iteration.succeeded()
+
+    assert [event for event, _kwargs in logger.events] == [
+        "iteration_started",
+        "iteration_completed",
+    ]
+    assert [span.name for span in exporter.get_finished_spans()] == [
+        "child",
+        "service.iteration",
+    ]
+    assert str(logger.bound["request_id"]).endswith("-1")
+    assert metrics.iterations_total.labels(outcome="success")._value.get() == 3.0
+
+
+def test_unsampled_failure_is_always_logged_and_traced() -> None:
+    instrumentation, logger, metrics, exporter = _instrumentation(
+        Settings(iteration_sample_every=1000)
+    )
+    with instrumentation.iteration():
+        pass
+    logger.events.clear()
+    exporter.clear()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        with instrumentation.iteration():
+            raise RuntimeError("boom")
+
+    assert logger.events == [
+        (
+            "iteration_failed",
+            {"outcome": "failure", "error": "boom", "exception_type": "RuntimeError"},
+        )
+    ]
+    assert logger.bound["request_id"]
+    spans = exporter.get_finished_spans()
+    assert [span.name for span in spans] == ["service.iteration"]
+    assert spans[0].parent is None
+    assert spans[0].attributes is not None
+    assert spans[0].attributes["request_id"] == logger.bound["request_id"]
+    assert not spans[0].status.is_ok
+    assert metrics.failures_total._value.get() == 1.0
+
+
+def test_span_setup_failure_still_counts_as_failed_iteration(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from python_boilerplate.observability import iteration as app_iteration
+
+    instrumentation, logger, metrics, _exporter = _instrumentation(Settings())
+
+    def broken_root_span(*_args: object, **_kwargs: object) -> Any:
+        raise RuntimeError("exporter misconfigured")
+
+    monkeypatch.setattr(app_iteration, "root_span", broken_root_span)
+
+    with pytest.raises(RuntimeError, match="exporter misconfigured"):
+        with instrumentation.iteration():
+            pass
+
+    assert metrics.failures_total._value.get() == 1.0
+    assert [event for event, _kwargs in logger.events] == ["iteration_failed"]
+
+
+def test_allocations_are_only_measured_without_concurrent_iterations() -> None:
+    single, *_ = _instrumentation(Settings(iteration_allocations_enabled=True))
+    concurrent, *_ = _instrumentation(
+        Settings(iteration_allocations_enabled=True, worker_concurrency=4)
+    )
+
+    assert single.allocations is True
+    assert concurrent.allocations is False
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import math
+import tracemalloc
+from threading import Barrier, Event
+from time import perf_counter, sleep
 from typing import Any, cast
 
 import pytest
+from prometheus_client import generate_latest
+from structlog.stdlib import BoundLogger
 
 from python_boilerplate.config import Settings
 from python_boilerplate.observability import logging as app_logging
 from python_boilerplate.observability import metrics as app_metrics
 from python_boilerplate.observability import tracing
 from python_boilerplate.observability.bootstrap import ObservabilityRuntime
+from python_boilerplate.observability.http import serve_wsgi
 from python_boilerplate.services.worker import WorkerService
 
 
@@ -152,6 +159,150 @@ def test_metrics_mark_failure_updates_progress_timestamp() -> None:
     assert metrics.failures_total._value.get() == 1.0
 
 
+def test_ddsketch_quantiles_stay_within_relative_accuracy() -> None:
+    values = [index * 1e-5 for index in range(1, 20_001)]
+    sketch = app_metrics.DDSketch(relative_accuracy=0.01)
+    halves = (app_metrics.DDSketch(), app_metrics.DDSketch())
+    for index, value in enumerate(values):
+        sketch.add(value)
+        halves[index % 2].add(value)
+    halves[0].merge(halves[1])
+
+    for quantile in (0.5, 0.9, 0.99, 0.999):
+        expected = values[int(quantile * (len(values) - 1))]
+        assert sketch.quantile(quantile) == pytest.approx(expected, rel=0.01)
+        assert halves[0].quantile(quantile) == sketch.quantile(quantile)
+    assert app_metrics.DDSketch().quantile(0.5) is None
+
+
+def test_ddsketch_memory_is_bounded_by_collapsing_lowest_bins() -> None:
+    sketch = app_metrics.DDSketch(max_bins=64)
+    for exponent in range(-8, 8):
+        for step in range(1, 100):
+            sketch.add(step * 10.0**exponent)
+
+    assert len(sketch._bins) == 64
+    assert sketch.quantile(1.0) == pytest.approx(9.9e8, rel=0.01)
+
+
+def test_latency_windows_slide_and_are_exposed_as_gauges() -> None:
+    now = [0.0]
+    windows = app_metrics.LatencyWindows((60.0, 300.0), clock=lambda: now[0])
+    for _ in range(100):
+        windows.add(0.004)
+    now[0] = 120.0
+    windows.add(0.0002)
+
+    assert windows.quantile(0.99) == pytest.approx(0.0002, rel=0.01)
+    assert windows.quantile(0.99, window_seconds=300.0) == pytest.approx(0.004, rel=0.01)
+    now[0] = 1000.0
+    assert windows.quantile(0.5, window_seconds=300.0) is None
+
+    samples = {
+        (sample.labels["window"], sample.labels["quantile"]): sample.value
+        for sample in next(iter(windows.collect())).samples
+    }
+    assert len(samples) == 8
+    assert math.isnan(samples[("60s", "0.999")])
+
+
+def test_metrics_record_latency_quantiles_and_custom_buckets() -> None:
+    metrics = app_metrics.Metrics(
+        Settings(iteration_duration_buckets=(0.0005, 0.001, 0.005), latency_windows_seconds=(60,))
+    )
+    for _ in range(90):
+        metrics.mark_success(0.0003)
+    for _ in range(10):
+        metrics.mark_failure(0.004)
+
+    exposition = generate_latest(metrics.registry).decode("utf-8")
+    assert metrics.latency_quantile(0.5) == pytest.approx(0.0003, rel=0.01)
+    assert metrics.latency_quantile(0.99) == pytest.approx(0.004, rel=0.01)
+    assert 'iteration_duration_seconds_bucket{le="0.0005"} 90.0' in exposition
+    assert 'iteration_duration_quantile_seconds{quantile="0.5",window="60s"}' in exposition
+    assert app_metrics.Metrics(Settings()).latency_quantile(0.5) is None
+    with pytest.raises(ValueError, match="positive"):
+        app_metrics.LatencyWindows((0.0, 60.0))
+
+
+def test_iteration_timer_records_resource_usage_when_enabled() -> None:
+    metrics = app_metrics.Metrics(Settings())
+    timer = app_metrics.start_iteration(metrics, resources=True, allocations=True)
+
+    try:
+        payload = [bytearray(1024) for _ in range(256)]
+        usage = timer.observe_success()
+        del payload
+    finally:
+        tracemalloc.stop()
+
+    assert usage.process_cpu_seconds is not None
+    assert usage.thread_cpu_seconds is not None
+    assert usage.allocated_bytes is not None
+    assert usage.allocated_bytes >= 256 * 1024
+    assert "iteration.memory.allocated_bytes" in usage.span_attributes()
+    assert metrics.iteration_allocated_bytes._sum.get() == usage.allocated_bytes
+    assert metrics.iteration_cpu_seconds.labels(scope="thread")._sum.get() >= 0.0
+
+
+def test_iteration_timer_measures_duration_before_reading_resources(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    reads: list[int] = []
+
+    def slow_rss_bytes() -> int:
+        reads.append(1)
+        if len(reads) > 1:
+            sleep(0.2)
+        return 0
+
+    monkeypatch.setattr(app_metrics, "current_rss_bytes", slow_rss_bytes)
+    metrics = app_metrics.Metrics(Settings())
+
+    app_metrics.start_iteration(metrics, resources=True).observe_success()
+
+    assert len(reads) == 2
+    assert metrics.iteration_duration_seconds._sum.get() < 0.2
+
+
+def test_iteration_timer_skips_resource_usage_by_default() -> None:
+    metrics = app_metrics.Metrics(Settings())
+
+    usage = app_metrics.start_iteration(metrics).observe_failure()
+
+    assert usage.span_attributes() == {}
+    assert metrics.iteration_allocated_bytes._sum.get() == 0.0
+    assert metrics.failures_total._value.get() == 1.0
+
+
+def test_error_tracking_uses_sentry_initialized_by_host_application() -> None:
+    import sentry_sdk
+    from sentry_sdk.envelope import Envelope
+    from sentry_sdk.transport import Transport
+
+    from python_boilerplate.observability import errors
+
+    envelopes: list[Envelope] = []
+
+    class RecordingTransport(Transport):
+        def capture_envelope(self, envelope: Envelope) -> None:
+            envelopes.append(envelope)
+
+    errors.report_exception(RuntimeError("before init"))
+    sentry_sdk.init(
+        dsn="https://public@example.invalid/1",
+        transport=RecordingTransport,
+        default_integrations=False,
+    )
+    try:
+        errors.report_exception(RuntimeError("boom"))
+        errors.flush_error_tracking(1.0)
+    finally:
+        sentry_sdk.get_global_scope().set_client(None)
+
+    assert len(envelopes) == 1
+
+
 def test_worker_reports_exception_once_at_process_boundary(monkeypatch: pytest.MonkeyPatch) -> None:
     reported: list[BaseException] = []
     warnings: list[tuple[str, dict[str, object]]] = []
@@ -176,6 +327,12 @@ def test_worker_reports_exception_once_at_process_boundary(monkeypatch: pytest.M
         def mark_failure(self, _duration_seconds: float) -> None:
             return None
 
+        def mark_iteration_started(self) -> None:
+            return None
+
+        def mark_iteration_finished(self) -> None:
+            return None
+
         def mark_shutdown(self) -> None:
             shutdown_calls.append("shutdown")
 
@@ -189,6 +346,9 @@ def test_worker_reports_exception_once_at_process_boundary(monkeypatch: pytest.M
         def set_attribute(self, _key: str, _value: str) -> None:
             return None
 
+        def set_attributes(self, _attributes: dict[str, float | int]) -> None:
+            return None
+
     class TracerStub:
         def start_as_current_span(self, _name: str) -> SpanContextStub:
             return SpanContextStub()
@@ -209,7 +369,9 @@ def test_worker_reports_exception_once_at_process_boundary(monkeypatch: pytest.M
                 "logger": LoggerStub(),
                 "metrics": MetricsStub(),
                 "tracer": TracerStub(),
-                "shutdown": staticmethod(lambda: runtime_shutdown_calls.append("runtime")),
+                "shutdown": staticmethod(
+                    lambda _timeout_seconds: runtime_shutdown_calls.append("runtime")
+                ),
             },
         )(),
     )
@@ -250,6 +412,12 @@ def test_worker_flushes_observability_on_clean_shutdown() -> None:
             info_events.append(event)
 
     class MetricsStub:
+        def mark_iteration_started(self) -> None:
+            return None
+
+        def mark_iteration_finished(self) -> None:
+            return None
+
         def mark_shutdown(self) -> None:
             shutdown_calls.append("shutdown")
 
@@ -269,7 +437,9 @@ def test_worker_flushes_observability_on_clean_shutdown() -> None:
                 "logger": LoggerStub(),
                 "metrics": MetricsStub(),
                 "tracer": object(),
-                "shutdown": staticmethod(lambda: runtime_shutdown_calls.append("runtime")),
+                "shutdown": staticmethod(
+                    lambda _timeout_seconds: runtime_shutdown_calls.append("runtime")
+                ),
             },
         )(),
     )
@@ -310,6 +480,9 @@ def test_worker_passes_stop_event_into_iteration() -> None:
         def set_attribute(self, _key: str, _value: str) -> None:
             return None
 
+        def set_attributes(self, _attributes: dict[str, float | int]) -> None:
+            return None
+
     class TracerStub:
         def start_as_current_span(self, _name: str) -> SpanContextStub:
             return SpanContextStub()
@@ -327,30 +500,291 @@ def test_worker_passes_stop_event_into_iteration() -> None:
                 "logger": LoggerStub(),
                 "metrics": MetricsStub(),
                 "tracer": TracerStub(),
-                "shutdown": staticmethod(lambda: None),
+                "shutdown": staticmethod(lambda _timeout_seconds: None),
             },
         )(),
     )
 
     service = ServiceStub(settings=Settings(), runtime=runtime)
 
-    service.run_iteration()
+    found_work = service.run_iteration()
 
     assert received_stop_events == [service.stop_event]
+    assert found_work is None
+
+
+def test_worker_runs_iterations_concurrently_up_to_configured_limit() -> None:
+    metrics = app_metrics.Metrics(Settings())
+    barrier = Barrier(3, timeout=5)
+    observed_in_flight: list[float] = []
+
+    class LoggerStub:
+        def bind(self, **_kwargs: object) -> LoggerStub:
+            return self
+
+        def info(self, *_args: object, **_kwargs: object) -> None:
+            return None
+
+    class SpanContextStub:
+        def __enter__(self) -> SpanContextStub:
+            return self
+
+        def __exit__(self, *_args: object) -> None:
+            return None
+
+        def set_attribute(self, _key: str, _value: str) -> None:
+            return None
+
+        def set_attributes(self, _attributes: dict[str, float | int]) -> None:
+            return None
+
+    class TracerStub:
+        def start_as_current_span(self, _name: str) -> SpanContextStub:
+            return SpanContextStub()
+
+    class ServiceStub(WorkerService):
+        def install_signal_handlers(self) -> None:
+            return None
+
+        def execute_iteration(self, stop_event: Event) -> None:
+            barrier.wait()
+            observed_in_flight.append(metrics.iterations_in_flight._value.get())
+            barrier.wait()
+            stop_event.set()
+
+    runtime = cast(
+        ObservabilityRuntime,
+        type(
+            "RuntimeStub",
+            (),
+            {
+                "logger": LoggerStub(),
+                "metrics": metrics,
+                "tracer": TracerStub(),
+                "shutdown": staticmethod(lambda _timeout_seconds: None),
+            },
+        )(),
+    )
+    service = ServiceStub(settings=Settings(worker_concurrency=3), runtime=runtime)
+
+    exit_code = service.run()
+
+    assert exit_code == 0
+    assert observed_in_flight == [3.0, 3.0, 3.0]
+    assert metrics.iterations_in_flight._value.get() == 0.0
+    assert metrics.iterations_total.labels(outcome="success")._value.get() == 3.0
+
+
+def test_worker_stops_after_max_iterations_across_lanes() -> None:
+    metrics = app_metrics.Metrics(Settings())
+    events: list[str] = []
+
+    class LoggerStub:
+        def bind(self, **_kwargs: object) -> LoggerStub:
+            return self
+
+        def info(self, event: str, **_kwargs: object) -> None:
+            events.append(event)
+
+    class SpanContextStub:
+        def __enter__(self) -> SpanContextStub:
+            return self
+
+        def __exit__(self, *_args: object) -> None:
+            return None
+
+        def set_attribute(self, _key: str, _value: str) -> None:
+            return None
+
+        def set_attributes(self, _attributes: dict[str, float | int]) -> None:
+            return None
+
+    class TracerStub:
+        def start_as_current_span(self, _name: str) -> SpanContextStub:
+            return SpanContextStub()
+
+    class ServiceStub(WorkerService):
+        def install_signal_handlers(self) -> None:
+            return None
+
+        def execute_iteration(self, _stop_event: Event) -> bool:
+            return True
+
+    runtime = cast(
+        ObservabilityRuntime,
+        type(
+            "RuntimeStub",
+            (),
+            {
+                "logger": LoggerStub(),
+                "metrics": metrics,
+                "tracer": TracerStub(),
+                "shutdown": staticmethod(lambda _timeout_seconds: None),
+            },
+        )(),
+    )
+    service = ServiceStub(
+        settings=Settings(worker_concurrency=6, max_iterations=5, loop_interval_seconds=30.0),
+        runtime=runtime,
+    )
+
+    started_at = perf_counter()
+    exit_code = service.run()
+
+    assert exit_code == 0
+    assert perf_counter() - started_at < 5.0
+    assert metrics.iterations_total.labels(outcome="success")._value.get() == 5.0
+    assert events.count("iteration_limit_reached") == 1
+
+
+def test_metrics_push_replaces_instance_group_instead_of_serving(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pushed: list[tuple[str, str, bytes]] = []
+
+    def pushgateway(environ: dict[str, Any], start_response: Any) -> list[bytes]:
+        body = environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+        pushed.append((environ["REQUEST_METHOD"], environ["PATH_INFO"], body))
+        start_response("200 OK", [("Content-Length", "0")])
+        return [b""]
+
+    served: list[object] = []
+    monkeypatch.setattr(app_metrics, "serve_wsgi", lambda *args: served.append(args))
+    server = serve_wsgi(pushgateway, "127.0.0.1", 0)
+    try:
+        metrics = app_metrics.Metrics(
+            Settings(
+                service_name="nightly-export",
+                instance="job-1",
+                pushgateway_url=f"http://127.0.0.1:{server.server_port}",
+            )
+        )
+        metrics.start()
+        metrics.mark_success(0.5)
+        metrics.push(timeout_seconds=2.0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert served == []
+    assert [(method, path) for method, path, _body in pushed] == [
+        ("PUT", "/metrics/job/nightly-export/instance/job-1")
+    ]
+    assert b'iterations_total{outcome="success"} 1.0' in pushed[0][2]
+
+
+def test_shutdown_observability_logs_failed_push(monkeypatch: pytest.MonkeyPatch) -> None:
+    from python_boilerplate.observability import bootstrap
+
+    warnings: list[tuple[str, dict[str, object]]] = []
+
+    class LoggerStub:
+        def warning(self, event: str, **kwargs: object) -> None:
+            warnings.append((event, kwargs))
+
+    monkeypatch.setattr(bootstrap, "shutdown_tracing", lambda _timeout_seconds: None)
+    monkeypatch.setattr(bootstrap, "flush_error_tracking", lambda _timeout_seconds: None)
+    metrics = app_metrics.Metrics(Settings(pushgateway_url="http://127.0.0.1:9"))
+
+    bootstrap._shutdown_observability(1.0, metrics=metrics, logger=cast(BoundLogger, LoggerStub()))
+
+    assert warnings == [("metrics_push_failed", {"pushgateway_url": "http://127.0.0.1:9"})]
 
 
-def test_shutdown_observability_flushes_tracing_before_error_tracking(
+def test_shutdown_observability_flushes_exporters_in_parallel_within_budget(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     from python_boilerplate.observability import bootstrap
 
-    calls: list[str] = []
-    monkeypatch.setattr(bootstrap, "shutdown_tracing", lambda: calls.append("tracing"))
-    monkeypatch.setattr(bootstrap, "flush_error_tracking", lambda: calls.append("errors"))
+    calls: list[tuple[str, float]] = []
+    release = Event()
 
-    bootstrap._shutdown_observability()
+    def slow_tracing_shutdown(timeout_seconds: float) -> None:
+        calls.append(("tracing", timeout_seconds))
+        release.wait(timeout=5)
 
-    assert calls == ["tracing", "errors"]
+    def flush_errors(timeout_seconds: float) -> None:
+        calls.append(("errors", timeout_seconds))
+
+    monkeypatch.setattr(bootstrap, "shutdown_tracing", slow_tracing_shutdown)
+    monkeypatch.setattr(bootstrap, "flush_error_tracking", flush_errors)
+
+    started_at = perf_counter()
+    bootstrap._shutdown_observability(0.2)
+    elapsed = perf_counter() - started_at
+    release.set()
+
+    assert sorted(calls) == [("errors", 0.2), ("tracing", 0.2)]
+    assert elapsed < 1.0
+
+
+def test_worker_gives_up_on_iterations_that_outlive_shutdown_deadline() -> None:
+    warnings: list[str] = []
+    shutdown_budgets: list[float] = []
+    release = Event()
+    started = Event()
+
+    class LoggerStub:
+        def bind(self, **_kwargs: object) -> LoggerStub:
+            return self
+
+        def info(self, *_args: object, **_kwargs: object) -> None:
+            return None
+
+        def warning(self, event: str, **_kwargs: object) -> None:
+            warnings.append(event)
+
+    class SpanContextStub:
+        def __enter__(self) -> SpanContextStub:
+            return self
+
+        def __exit__(self, *_args: object) -> None:
+            return None
+
+        def set_attribute(self, _key: str, _value: str) -> None:
+            return None
+
+        def set_attributes(self, _attributes: dict[str, float | int]) -> None:
+            return None
+
+    class TracerStub:
+        def start_as_current_span(self, _name: str) -> SpanContextStub:
+            return SpanContextStub()
+
+    class ServiceStub(WorkerService):
+        def install_signal_handlers(self) -> None:
+            return None
+
+        def execute_iteration(self, stop_event: Event) -> None:
+            started.set()
+            self.shutdown_coordinator.request_stop()
+            release.wait(timeout=5)
+
+    runtime = cast(
+        ObservabilityRuntime,
+        type(
+            "RuntimeStub",
+            (),
+            {
+                "logger": LoggerStub(),
+                "metrics": app_metrics.Metrics(Settings()),
+                "tracer": TracerStub(),
+                "shutdown": staticmethod(shutdown_budgets.append),
+            },
+        )(),
+    )
+    service = ServiceStub(settings=Settings(shutdown_timeout_seconds=0.2), runtime=runtime)
+
+    started_at = perf_counter()
+    exit_code = service.run()
+    elapsed = perf_counter() - started_at
+    release.set()
+
+    assert started.is_set()
+    assert exit_code == 0
+    assert elapsed < 1.0
+    assert warnings == ["shutdown_deadline_exceeded"]
+    assert shutdown_budgets == [0.0]
 
 
 def test_logging_adds_trace_context_when_span_is_active(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -360,6 +794,9 @@ def test_logging_adds_trace_context_when_span_is_active(monkeypatch: pytest.Monk
         span_id = int("abcd", 16)
 
     class SpanStub:
+        def is_recording(self) -> bool:
+            return True
+
         def get_span_context(self) -> SpanContextStub:
             return SpanContextStub()
 
@@ -370,3 +807,10 @@ def test_logging_adds_trace_context_when_span_is_active(monkeypatch: pytest.Monk
 
     assert event_dict["trace_id"] == "00000000000000000000000000001234"
     assert event_dict["span_id"] == "000000000000abcd"
+
+
+def test_logging_skips_trace_context_of_unsampled_iterations() -> None:
+    with tracing.unsampled_span():
+        event_dict = app_logging._add_trace_context(None, "info", {"event": "test"})
+
+    assert event_dict == {"event": "test"}
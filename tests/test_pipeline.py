@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import batched
+from threading import Event
+from typing import Any
+
+import pytest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.services.pipeline import (
+    Pipeline,
+    PipelineStage,
+    create_pipeline,
+)
+
+
+def _double(items: Iterable[Any]) -> Iterator[Any]:
+    for item in items:
+        yield item * 2
+
+
+def _keep_multiples_of_four(items: Iterable[Any]) -> Iterator[Any]:
+    return (item for item in items if item % 4 == 0)
+
+
+def test_pipeline_moves_batches_through_stages_into_sink() -> None:
+    metrics = Metrics(Settings())
+    delivered: list[Sequence[Any]] = []
+    pipeline = create_pipeline(
+        Settings(pipeline_batch_size=3, pipeline_queue_size=1),
+        metrics,
+        name="demo",
+        source=lambda batch_size: batched(range(7), batch_size),
+        sink=delivered.append,
+        stages=[PipelineStage("double", _double), PipelineStage("filter", _keep_multiples_of_four)],
+    )
+
+    count = pipeline.run(Event())
+
+    assert [list(batch) for batch in delivered] == [[0, 4], [8], [12]]
+    assert count == 4
+    items_total = metrics.pipeline_items_total
+    assert items_total.labels(pipeline="demo", stage="source")._value.get() == 7.0
+    assert items_total.labels(pipeline="demo", stage="double")._value.get() == 7.0
+    assert items_total.labels(pipeline="demo", stage="filter")._value.get() == 4.0
+    assert items_total.labels(pipeline="demo", stage="sink")._value.get() == 4.0
+
+
+def test_pipeline_stops_pulling_from_source_once_stop_is_requested() -> None:
+    stop_event = Event()
+    pulled: list[int] = []
+
+    def source(batch_size: int) -> Iterator[list[int]]:
+        for start in range(0, 1000, batch_size):
+            pulled.append(start)
+            yield list(range(start, start + batch_size))
+
+    def sink(_batch: Sequence[Any]) -> None:
+        stop_event.set()
+
+    pipeline = Pipeline(
+        name="demo",
+        source=source,
+        sink=sink,
+        metrics=Metrics(Settings()),
+        batch_size=10,
+        queue_size=1,
+    )
+
+    pipeline.run(stop_event)
+
+    assert len(pulled) < 10
+
+
+def test_pipeline_reraises_stage_failure() -> None:
+    def explode(_items: Iterable[Any]) -> Iterator[Any]:
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline(
+        name="demo",
+        source=lambda batch_size: batched(range(100), batch_size),
+        sink=lambda _batch: None,
+        metrics=Metrics(Settings()),
+        stages=[PipelineStage("explode", explode)],
+        batch_size=5,
+        queue_size=1,
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(Event())
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from threading import Event, Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, make_wsgi_app
+
+from python_boilerplate.observability.http import route_requests, serve_wsgi
+from python_boilerplate.observability.profiling import (
+    PROFILE_PATH,
+    StackSampler,
+    format_folded,
+    format_speedscope,
+)
+
+
+def _blocked_in_marker_function(release: Event) -> None:
+    release.wait(timeout=5)
+
+
+def test_sampler_collapses_stacks_per_thread() -> None:
+    release = Event()
+    thread = Thread(target=_blocked_in_marker_function, args=(release,), name="marker-thread")
+    thread.start()
+    try:
+        sampler = StackSampler()
+        sampler.sample()
+        sampler.sample()
+    finally:
+        release.set()
+        thread.join()
+
+    stacks = [
+        (stack, count)
+        for stack, count in sampler.snapshot().items()
+        if stack.startswith("marker-thread;")
+    ]
+    assert len(stacks) == 1
+    stack, count = stacks[0]
+    assert count == 2
+    assert "_blocked_in_marker_function" in stack.split(";")[-3]
+    assert f"{stack} 2\n" in format_folded(sampler.snapshot())
+
+
+def test_sampler_counts_stacks_beyond_limit_as_truncated() -> None:
+    release = Event()
+    thread = Thread(target=_blocked_in_marker_function, args=(release,), name="marker-thread")
+    thread.start()
+    try:
+        sampler = StackSampler(max_stacks=0)
+        sampler.sample()
+    finally:
+        release.set()
+        thread.join()
+
+    assert list(sampler.snapshot()) == ["[truncated]"]
+
+
+def test_format_speedscope_shares_frames_between_samples() -> None:
+    document = json.loads(format_speedscope({"main;a;b": 3, "main;a;c": 1}, name="demo"))
+
+    frames = [frame["name"] for frame in document["shared"]["frames"]]
+    profile = document["profiles"][0]
+    assert frames == ["main", "a", "b", "c"]
+    assert profile["samples"] == [[0, 1, 2], [0, 1, 3]]
+    assert profile["weights"] == [3, 1]
+    assert profile["endValue"] == 4
+
+
+def test_metrics_server_serves_profile_next_to_metrics() -> None:
+    registry = CollectorRegistry()
+    Counter("demo_total", "Demo counter.", registry=registry).inc()
+    sampler = StackSampler(hz=200.0)
+    routes = {PROFILE_PATH: sampler.wsgi_app}
+    server = serve_wsgi(route_requests(make_wsgi_app(registry), routes), "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    sampler.start()
+    try:
+        with urlopen(f"{base_url}{PROFILE_PATH}?seconds=0.2", timeout=5) as response:
+            folded = response.read().decode("utf-8")
+        with urlopen(f"{base_url}/metrics", timeout=5) as response:
+            metrics = response.read().decode("utf-8")
+        with pytest.raises(HTTPError) as rejected:
+            urlopen(f"{base_url}{PROFILE_PATH}?format=pprof", timeout=5)
+    finally:
+        sampler.stop()
+        server.shutdown()
+        server.server_close()
+
+    assert "metrics-http" in folded
+    assert "demo_total 1.0" in metrics
+    assert rejected.value.code == 400
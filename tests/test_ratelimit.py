@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from threading import Event, Thread
+
+import pytest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.runtime.ratelimit import (
+    ConcurrencyLimiter,
+    ThrottledError,
+    TokenBucket,
+)
+
+
+class ClockStub:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_paces_calls_after_burst() -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    bucket = TokenBucket(
+        name="api",
+        rate_per_second=10.0,
+        burst=2.0,
+        metrics=metrics,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, pytest.approx(0.1), pytest.approx(0.1)]
+    assert clock.now == pytest.approx(0.2)
+    assert metrics.rate_limit_wait_seconds.labels(limiter="api")._sum.get() == pytest.approx(0.2)
+
+
+def test_token_bucket_throttles_when_wait_exceeds_timeout() -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    bucket = TokenBucket(
+        name="api",
+        rate_per_second=1.0,
+        metrics=metrics,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    assert bucket.try_acquire() is True
+    assert bucket.try_acquire() is False
+    with pytest.raises(ThrottledError, match="'api'"):
+        bucket.acquire(timeout=0.5)
+    clock.now = 1.0
+    assert bucket.acquire(timeout=0.5) == 0.0
+    assert metrics.rate_limit_throttled_total.labels(limiter="api")._value.get() == 2.0
+
+
+def test_token_bucket_without_rate_never_waits() -> None:
+    bucket = TokenBucket(name="api")
+
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+    assert asyncio.run(bucket.acquire_async()) == 0.0
+
+
+def test_token_bucket_paces_async_callers() -> None:
+    bucket = TokenBucket(name="api", rate_per_second=100.0)
+
+    async def acquire_all() -> list[float]:
+        return list(await asyncio.gather(*(bucket.acquire_async() for _ in range(3))))
+
+    waits = asyncio.run(acquire_all())
+
+    assert sorted(waits) == [0.0, pytest.approx(0.01, abs=0.005), pytest.approx(0.02, abs=0.005)]
+
+
+def test_concurrency_limiter_bounds_threads() -> None:
+    metrics = Metrics(Settings())
+    limiter = ConcurrencyLimiter(name="api", limit=2, metrics=metrics)
+    release = Event()
+    observed: list[int] = []
+
+    def call() -> None:
+        with limiter.slot():
+            observed.append(limiter.in_use)
+            release.wait(timeout=5)
+
+    threads = [Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while len(observed) < 2:
+        release.wait(timeout=0.001)
+    with pytest.raises(ThrottledError):
+        with limiter.slot(timeout=0.01):
+            pass
+    assert len(observed) == 2
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(observed) == 3
+    assert max(observed) == 2
+    assert limiter.in_use == 0
+    assert metrics.rate_limit_throttled_total.labels(limiter="api")._value.get() == 1.0
+    assert metrics.concurrency_limit_in_use.labels(limiter="api")._value.get() == 0.0
+
+
+def test_concurrency_limiter_bounds_async_tasks_and_hands_over_slots() -> None:
+    limiter = ConcurrencyLimiter(name="api", limit=1)
+    in_flight: list[int] = []
+
+    async def call() -> None:
+        async with limiter.slot_async():
+            in_flight.append(limiter.in_use)
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(*(call() for _ in range(4)))
+        async with limiter.slot_async():
+            with pytest.raises(ThrottledError):
+                async with limiter.slot_async(timeout=0.01):
+                    pass
+
+    asyncio.run(main())
+
+    assert in_flight == [1, 1, 1, 1]
+    assert limiter.in_use == 0
+
+
+def test_concurrency_limiter_wakes_async_waiters_on_thread_release() -> None:
+    limiter = ConcurrencyLimiter(name="api", limit=1)
+    release = Event()
+    held = Event()
+
+    def hold_slot() -> None:
+        with limiter.slot():
+            held.set()
+            release.wait(timeout=5)
+
+    async def main() -> float:
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, release.set)
+        started_at = loop.time()
+        async with limiter.slot_async(timeout=5):
+            return loop.time() - started_at
+
+    thread = Thread(target=hold_slot)
+    thread.start()
+    held.wait(timeout=5)
+    waited = asyncio.run(main())
+    thread.join(timeout=5)
+
+    assert 0.03 < waited < 2
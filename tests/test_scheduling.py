@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from contextvars import copy_context
+
+import pytest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.services.scheduling import (
+    AdaptiveSchedule,
+    FixedDelaySchedule,
+    FixedRateSchedule,
+    build_loop_schedule,
+)
+
+
+class ClockStub:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _schedule(policy: str, clock: ClockStub, metrics: Metrics) -> FixedRateSchedule:
+    return FixedRateSchedule(
+        interval_seconds=10.0,
+        overrun_policy=policy,
+        metrics=metrics,
+        clock=clock,
+    )
+
+
+def test_fixed_rate_schedule_subtracts_iteration_duration_from_wait() -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    schedule = _schedule("skip", clock, metrics)
+
+    schedule.tick_started()
+    clock.now += 3.0
+
+    assert schedule.next_delay(None) == 7.0
+    assert metrics.schedule_missed_ticks_total._value.get() == 0.0
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected_delay", "expected_missed", "expected_lag"),
+    [
+        ("skip", 5.0, 3.0, 0.0),
+        ("catch_up", 0.0, 0.0, 25.0),
+        ("coalesce", 0.0, 2.0, 5.0),
+    ],
+)
+def test_fixed_rate_schedule_applies_overrun_policy(
+    policy: str,
+    expected_delay: float,
+    expected_missed: float,
+    expected_lag: float,
+) -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    schedule = _schedule(policy, clock, metrics)
+
+    schedule.tick_started()
+    clock.now += 35.0
+    delay = schedule.next_delay(None)
+    clock.now += delay
+    schedule.tick_started()
+
+    assert delay == expected_delay
+    assert metrics.schedule_missed_ticks_total._value.get() == expected_missed
+    assert metrics.schedule_lag_seconds._sum.get() == expected_lag
+
+
+def test_fixed_rate_schedule_treats_finishing_on_the_tick_as_on_time() -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    schedule = _schedule("skip", clock, metrics)
+
+    schedule.tick_started()
+    clock.now += 10.0
+    delay = schedule.next_delay(None)
+    clock.now += 20.0
+
+    assert delay == 0.0
+    assert schedule.next_delay(None) == 0.0
+    assert metrics.schedule_missed_ticks_total._value.get() == 1.0
+
+
+def test_fixed_rate_schedule_shares_one_grid_between_lanes() -> None:
+    clock = ClockStub()
+    metrics = Metrics(Settings())
+    schedule = _schedule("skip", clock, metrics)
+    first_lane, second_lane = copy_context(), copy_context()
+
+    assert first_lane.run(schedule.start_delay) == 0.0
+    assert second_lane.run(schedule.start_delay) == 10.0
+    first_lane.run(schedule.tick_started)
+    clock.now += 4.0
+    assert first_lane.run(schedule.next_delay, None) == 16.0
+    clock.now += 6.0
+    second_lane.run(schedule.tick_started)
+
+    assert metrics.schedule_missed_ticks_total._value.get() == 0.0
+    assert metrics.schedule_lag_seconds._sum.get() == 0.0
+
+
+def test_adaptive_schedule_polls_immediately_with_work_and_backs_off_when_idle() -> None:
+    metrics = Metrics(Settings())
+    schedule = AdaptiveSchedule(
+        interval_seconds=1.0,
+        max_interval_seconds=5.0,
+        backoff_factor=2.0,
+        metrics=metrics,
+    )
+
+    idle_delays = [schedule.next_delay(False) for _ in range(5)]
+    assert idle_delays == [1.0, 2.0, 4.0, 5.0, 5.0]
+    assert metrics.loop_effective_interval_seconds._value.get() == 5.0
+
+    assert schedule.next_delay(True) == 0.0
+    assert metrics.loop_effective_interval_seconds._value.get() == 0.0
+    assert schedule.next_delay(False) == 1.0
+    assert schedule.next_delay(None) == 1.0
+
+
+def test_adaptive_schedule_shares_backoff_between_lanes() -> None:
+    metrics = Metrics(Settings())
+    schedule = AdaptiveSchedule(
+        interval_seconds=1.0,
+        max_interval_seconds=8.0,
+        backoff_factor=2.0,
+        metrics=metrics,
+    )
+    first_lane, second_lane = copy_context(), copy_context()
+
+    assert [first_lane.run(schedule.next_delay, False) for _ in range(2)] == [1.0, 2.0]
+    assert second_lane.run(schedule.next_delay, False) == 4.0
+    assert metrics.loop_effective_interval_seconds._value.get() == 4.0
+    assert second_lane.run(schedule.next_delay, True) == 0.0
+    assert first_lane.run(schedule.next_delay, False) == 1.0
+
+
+def test_build_loop_schedule_defaults_to_fixed_delay() -> None:
+    metrics = Metrics(Settings())
+
+    assert isinstance(build_loop_schedule(Settings(), metrics), FixedDelaySchedule)
+    assert isinstance(
+        build_loop_schedule(Settings(loop_schedule="fixed_rate"), metrics),
+        FixedRateSchedule,
+    )
+    assert isinstance(
+        build_loop_schedule(Settings(loop_schedule="adaptive"), metrics),
+        AdaptiveSchedule,
+    )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import gc
+from threading import Thread
+
+import pytest
+from prometheus_client import generate_latest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability import metrics as app_metrics
+from python_boilerplate.observability.sharded import ShardedIterationMetrics
+from python_boilerplate.runtime.health import parse_prometheus_text
+
+
+def _record(metrics: app_metrics.Metrics) -> None:
+    for index in range(100):
+        metrics.mark_iteration_started()
+        if index % 4:
+            metrics.mark_success(0.02)
+        else:
+            metrics.mark_failure(3.0)
+        metrics.mark_iteration_finished()
+
+
+def _exposition(metrics: app_metrics.Metrics) -> dict[str, float]:
+    text = generate_latest(metrics.registry).decode("utf-8")
+    return {
+        name: value
+        for name, value in parse_prometheus_text(text).items()
+        if not name.endswith(("_created", "_timestamp_seconds", "_start_time_seconds"))
+    }
+
+
+def test_sharded_metrics_expose_the_same_series_as_regular_metrics() -> None:
+    regular = app_metrics.Metrics(Settings())
+    sharded = app_metrics.Metrics(Settings(metrics_sharded=True))
+
+    for metrics in (regular, sharded):
+        threads = [Thread(target=_record, args=(metrics,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    regular_text = generate_latest(regular.registry).decode("utf-8")
+    sharded_text = generate_latest(sharded.registry).decode("utf-8")
+    assert _exposition(sharded) == pytest.approx(_exposition(regular))
+    assert 'iterations_total{outcome="failure"} 100.0' in sharded_text
+    assert 'iteration_duration_seconds_bucket{le="0.025"} 300.0' in sharded_text
+    assert 'iteration_duration_seconds_bucket{le="0.025"} 300.0' in regular_text
+    assert "iterations_in_flight 0.0" in sharded_text
+
+
+def test_sharded_metrics_merge_shards_of_finished_threads() -> None:
+    accumulators = ShardedIterationMetrics(buckets=(1.0,))
+
+    thread = Thread(target=accumulators.success, args=(0.5, 42.0))
+    thread.start()
+    thread.join()
+    accumulators.failure(2.0, 43.0)
+
+    families = {family.name: family for family in accumulators.collect()}
+    buckets = {
+        sample.labels["le"]: sample.value
+        for sample in families["iteration_duration_seconds"].samples
+        if sample.name.endswith("_bucket")
+    }
+    assert buckets == {"1.0": 1.0, "+Inf": 2.0}
+    assert families["last_success_timestamp_seconds"].samples[0].value == 42.0
+    assert families["last_progress_timestamp_seconds"].samples[0].value == 43.0
+
+
+def test_sharded_metrics_retire_shards_of_exited_threads() -> None:
+    accumulators = ShardedIterationMetrics(buckets=(1.0,))
+
+    for index in range(50):
+        thread = Thread(target=accumulators.success, args=(0.5, float(index)))
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    families = {family.name: family for family in accumulators.collect()}
+    assert accumulators.shards == 0
+    assert families["iterations"].samples[0].value == 50.0
+    assert families["last_success_timestamp_seconds"].samples[0].value == 49.0
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from threading import Event
+
+from python_boilerplate.runtime.shutdown import ShutdownCoordinator, run_with_deadline
+
+
+class ClockStub:
+    def __init__(self) -> None:
+        self.now = 10.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_shutdown_coordinator_stops_admitting_and_tracks_deadline() -> None:
+    clock = ClockStub()
+    coordinator = ShutdownCoordinator(stop_event=Event(), timeout_seconds=5.0, clock=clock)
+
+    with coordinator.admit() as admitted:
+        assert admitted is True
+        assert coordinator.in_flight == 1
+        coordinator.request_stop()
+        clock.now += 2.0
+        assert coordinator.remaining_seconds() == 3.0
+        with coordinator.admit() as admitted_after_stop:
+            assert admitted_after_stop is False
+
+    assert coordinator.in_flight == 0
+    assert coordinator.wait_for_drain() is True
+
+
+def test_run_with_deadline_reports_failed_and_unfinished_tasks() -> None:
+    release = Event()
+
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    def slow() -> None:
+        release.wait(timeout=5)
+
+    pending = run_with_deadline(
+        {"ok": lambda: None, "failing": fail, "slow": slow},
+        0.1,
+    )
+    release.set()
+
+    assert pending == ["failing", "slow"]
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import threading
+from pathlib import Path
+from threading import Event
+from typing import cast
+from urllib.request import urlopen
+
+import pytest
+from structlog.stdlib import BoundLogger
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.metrics import (
+    Metrics,
+    build_multiprocess_registry,
+    multiprocess_metrics,
+)
+from python_boilerplate.runtime.supervisor import ProcessSupervisor, run_supervisor
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+class LoggerStub:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict[str, object]]] = []
+
+    def info(self, event: str, **kwargs: object) -> None:
+        self.events.append((event, kwargs))
+
+
+class FileLoggerStub(LoggerStub):
+    """Also record events logged by forked children, which only the file survives."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self.path = path
+
+    def exception(self, event: str, **_kwargs: object) -> None:
+        with self.path.open("a") as log:
+            log.write(f"{event}\n")
+
+
+def _wait_for_sigterm_then_stop_supervisor() -> int:
+    stopped = Event()
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: stopped.set())
+    os.kill(os.getppid(), signal.SIGTERM)
+    return 0 if stopped.wait(timeout=10) else 3
+
+
+def test_supervisor_restarts_crashed_child_and_drains_on_sigterm(tmp_path: Path) -> None:
+    marker = tmp_path / "crashed-once"
+
+    def target() -> int:
+        if not marker.exists():
+            marker.touch()
+            return 1
+        return _wait_for_sigterm_then_stop_supervisor()
+
+    logger = LoggerStub()
+    supervisor = ProcessSupervisor(
+        settings=Settings(metrics_enabled=False),
+        processes=1,
+        target=target,
+        logger=cast(BoundLogger, logger),
+        restart_delay_seconds=0.0,
+    )
+
+    with multiprocess_metrics(str(tmp_path)):
+        exit_code = supervisor.run(str(tmp_path))
+
+    exit_codes = [
+        kwargs["exit_code"] for event, kwargs in logger.events if event == "worker_process_exited"
+    ]
+    started = [event for event, _kwargs in logger.events if event == "worker_process_started"]
+    assert exit_code == 0
+    assert exit_codes == [1, 0]
+    assert len(started) == 2
+    assert logger.events[-1][0] == "shutdown_complete"
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+
+def test_supervisor_does_not_restart_children_that_finish(tmp_path: Path) -> None:
+    logger = LoggerStub()
+    supervisor = ProcessSupervisor(
+        settings=Settings(metrics_enabled=False),
+        processes=2,
+        target=lambda: 0,
+        logger=cast(BoundLogger, logger),
+        restart_delay_seconds=0.0,
+    )
+
+    with multiprocess_metrics(str(tmp_path)):
+        exit_code = supervisor.run(str(tmp_path))
+
+    events = [event for event, _kwargs in logger.events]
+    assert exit_code == 0
+    assert events.count("worker_process_started") == 2
+    assert events.count("worker_process_exited") == 2
+    assert "worker_process_restart_scheduled" not in events
+
+
+def test_supervisor_logs_exceptions_raised_in_children(tmp_path: Path) -> None:
+    marker = tmp_path / "raised-once"
+
+    def target() -> int:
+        if not marker.exists():
+            marker.touch()
+            raise RuntimeError("boom")
+        return 0
+
+    logger = FileLoggerStub(tmp_path / "child.log")
+    supervisor = ProcessSupervisor(
+        settings=Settings(metrics_enabled=False),
+        processes=1,
+        target=target,
+        logger=cast(BoundLogger, logger),
+        restart_delay_seconds=0.0,
+    )
+
+    with multiprocess_metrics(str(tmp_path)):
+        exit_code = supervisor.run(str(tmp_path))
+
+    exit_codes = [
+        kwargs["exit_code"] for event, kwargs in logger.events if event == "worker_process_exited"
+    ]
+    assert exit_code == 0
+    assert exit_codes == [1, 0]
+    assert logger.path.read_text() == "worker_process_failed\n"
+
+
+def test_run_supervisor_serves_metrics_without_threads_in_supervisor(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    threads_at_fork: list[int] = []
+    fork = os.fork
+
+    def counting_fork() -> int:
+        threads_at_fork.append(threading.active_count())
+        return fork()
+
+    def target() -> int:
+        with urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            return 0 if response.status == 200 else 3
+
+    monkeypatch.setattr(os, "fork", counting_fork)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    threads_before = threading.active_count()
+
+    exit_code = run_supervisor(
+        Settings(metrics_host="127.0.0.1", metrics_port=port), processes=2, target=target
+    )
+
+    assert exit_code == 0
+    assert threads_at_fork == [threads_before] * 3
+    assert threading.active_count() == threads_before
+
+
+def test_supervisor_backs_off_crash_loops_and_resets_after_stable_uptime() -> None:
+    now = [0.0]
+    logger = LoggerStub()
+    supervisor = ProcessSupervisor(
+        settings=Settings(metrics_enabled=False),
+        processes=1,
+        target=lambda: 1,
+        logger=cast(BoundLogger, logger),
+        restart_delay_seconds=1.0,
+        max_restart_delay_seconds=5.0,
+        stable_uptime_seconds=30.0,
+        clock=lambda: now[0],
+    )
+
+    supervisor._started_at[0] = 0.0
+    for _ in range(5):
+        supervisor._schedule_restart(0)
+    now[0] = 100.0
+    supervisor._schedule_restart(0)
+
+    delays = [
+        kwargs["delay_seconds"]
+        for event, kwargs in logger.events
+        if event == "worker_process_restart_scheduled"
+    ]
+    assert delays == [1.0, 2.0, 4.0, 5.0, 5.0, 1.0]
+
+
+def test_multiprocess_metrics_aggregates_child_values(tmp_path: Path) -> None:
+    with multiprocess_metrics(str(tmp_path)):
+        for _ in range(2):
+            pid = os.fork()
+            if pid == 0:
+                metrics = Metrics(Settings(metrics_enabled=False))
+                metrics.start()
+                metrics.mark_success(0.1)
+                os._exit(0)
+            os.waitpid(pid, 0)
+
+        registry = build_multiprocess_registry(str(tmp_path))
+
+        assert registry.get_sample_value("iterations_total", {"outcome": "success"}) == 2.0
+        assert registry.get_sample_value("app_up") == 1.0
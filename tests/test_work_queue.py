@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+from threading import Event
+from typing import cast
+
+import pytest
+
+from python_boilerplate.config import Settings
+from python_boilerplate.observability.bootstrap import ObservabilityRuntime
+from python_boilerplate.observability.metrics import Metrics
+from python_boilerplate.services.queue_worker import QueueWorkerService
+from python_boilerplate.services.work_queue import (
+    InMemoryWorkQueue,
+    SqliteWorkQueue,
+    WorkItem,
+    WorkQueue,
+    create_work_queue,
+)
+
+
+class ClockStub:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue_with_clock(request: pytest.FixtureRequest, tmp_path: Path) -> tuple[WorkQueue, ClockStub]:
+    clock = ClockStub()
+    if request.param == "memory":
+        return InMemoryWorkQueue(visibility_timeout_seconds=10.0, clock=clock), clock
+    return (
+        SqliteWorkQueue(
+            path=str(tmp_path / "queue.db"),
+            visibility_timeout_seconds=10.0,
+            clock=clock,
+        ),
+        clock,
+    )
+
+
+def test_queue_leases_batches_and_acks_them(queue_with_clock: tuple[WorkQueue, ClockStub]) -> None:
+    queue, _clock = queue_with_clock
+    queue.enqueue(f"item-{index}" for index in range(5))
+
+    first = queue.dequeue(3)
+    second = queue.dequeue(3)
+
+    assert [item.payload for item in first] == ["item-0", "item-1", "item-2"]
+    assert [item.payload for item in second] == ["item-3", "item-4"]
+    assert queue.dequeue(3) == []
+    assert queue.ack(first + second) == 5
+    assert queue.size() == 0
+
+
+def test_queue_redelivers_unacked_items_after_visibility_timeout(
+    queue_with_clock: tuple[WorkQueue, ClockStub],
+) -> None:
+    queue, clock = queue_with_clock
+    queue.enqueue(["a", "b"])
+    leased = queue.dequeue(10)
+
+    clock.now += 11.0
+    redelivered = queue.dequeue(10)
+
+    assert [item.deliveries for item in redelivered] == [2, 2]
+    assert all(item.redelivered for item in redelivered)
+    assert queue.ack(leased) == 0
+    assert queue.ack(redelivered) == 2
+
+
+def test_queue_release_makes_items_visible_again(
+    queue_with_clock: tuple[WorkQueue, ClockStub],
+) -> None:
+    queue, _clock = queue_with_clock
+    queue.enqueue(["a"])
+
+    assert queue.release(queue.dequeue(1)) == 1
+    assert [item.deliveries for item in queue.dequeue(1)] == [2]
+
+
+def test_queue_leases_lowest_ids_first_after_acks_and_releases(
+    queue_with_clock: tuple[WorkQueue, ClockStub],
+) -> None:
+    queue, clock = queue_with_clock
+    queue.enqueue(["a", "b", "c", "d"])
+    first = queue.dequeue(2)
+    queue.ack(first[:1])
+    clock.now += 1.0
+    queue.enqueue(["e"])
+    clock.now += 1.0
+    queue.release(first[1:])
+
+    assert [item.payload for item in queue.dequeue(10)] == ["b", "c", "d", "e"]
+    assert queue.dequeue(10) == []
+    clock.now += 11.0
+    assert [item.payload for item in queue.dequeue(10)] == ["b", "c", "d", "e"]
+    assert queue.size() == 4
+
+
+def test_sqlite_queue_survives_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "queue.db")
+    queue = SqliteWorkQueue(path=path)
+    queue.enqueue(["persisted"])
+    queue.close()
+
+    reopened = create_work_queue(Settings(queue_path=path))
+
+    assert [item.payload for item in reopened.dequeue(10)] == ["persisted"]
+    reopened.close()
+
+
+def test_queue_worker_acks_processed_batch_and_reports_found_work() -> None:
+    processed: list[list[str]] = []
+    metrics = Metrics(Settings())
+
+    class ServiceStub(QueueWorkerService):
+        def process_items(self, items: Sequence[WorkItem], _stop_event: Event) -> None:
+            processed.append([item.payload for item in items])
+
+    runtime = cast(
+        ObservabilityRuntime,
+        type("RuntimeStub", (), {"metrics": metrics})(),
+    )
+    queue = InMemoryWorkQueue()
+    queue.enqueue(["a", "b", "c"])
+    service = ServiceStub(
+        settings=Settings(queue_batch_size=2),
+        runtime=runtime,
+        work_queue=queue,
+        depth_sample_seconds=0.0,
+    )
+
+    assert service.execute_iteration(service.stop_event) is True
+    assert service.execute_iteration(service.stop_event) is True
+    assert service.execute_iteration(service.stop_event) is False
+    assert processed == [["a", "b"], ["c"]]
+    assert metrics.queue_items_acked_total._value.get() == 3.0
+    assert metrics.queue_depth._value.get() == 0.0
+
+
+def test_queue_worker_samples_depth_instead_of_counting_every_iteration() -> None:
+    metrics = Metrics(Settings())
+    runtime = cast(
+        ObservabilityRuntime,
+        type("RuntimeStub", (), {"metrics": metrics})(),
+    )
+    sizes: list[int] = []
+
+    class CountingQueue(InMemoryWorkQueue):
+        def size(self) -> int:
+            sizes.append(InMemoryWorkQueue.size(self))
+            return sizes[-1]
+
+    queue = CountingQueue()
+    queue.enqueue(["a", "b", "c"])
+    service = QueueWorkerService(
+        settings=Settings(queue_batch_size=1),
+        runtime=runtime,
+        work_queue=queue,
+    )
+
+    for _ in range(4):
+        service.execute_iteration(service.stop_event)
+
+    assert sizes == [3]
+    assert metrics.queue_depth._value.get() == 3.0
+    assert metrics.queue_items_acked_total._value.get() == 3.0